@@ -1,19 +1,23 @@
 #!/usr/bin/env python3
 
+# Only light modules are imported here, so that `--help` and the offline
+# commands start fast. The clients of Snipe-IT, RTE, Sonoff and Zabbix, and
+# their dependencies (requests, paramiko, pexpect, yaml, voluptuous), are
+# imported by the commands which need them.
 import argparse
+import itertools
 import json
+import os
+import shlex
+import sys
+import threading
+from contextlib import contextmanager
 from copy import copy
-from importlib import metadata
-from time import sleep
+from time import monotonic
 
 import osfv.libs.utils as utils
-import pexpect
-import requests
-from osfv.libs.models import Models
-from osfv.libs.rte import RTE
-from osfv.libs.snipeit_api import SnipeIT
-from osfv.libs.sonoff_api import SonoffDevice
-from osfv.libs.zabbix import Zabbix
+from osfv.cli.client import SOCKET_PATH
+from osfv.libs.snipeit_asset import AssetRecord
 
 
 def check_out_asset(snipeit_api, asset_id):
@@ -74,6 +78,179 @@ def check_in_asset(snipeit_api, asset_id):
         return False
 
 
+def check_out_assets(snipeit_api, args):
+    """
+    Checks out the assets given by asset IDs or RTE IPs.
+
+    A single asset is checked out the usual way. Multiple assets are checked
+    out concurrently, see `run_bulk_operation()`.
+
+    Args:
+        snipeit_api: The API client used to interact with the Snipe-IT API.
+        args (object): Parsed arguments with `asset_id` or `rte_ip` lists.
+
+    Returns:
+        None
+    """
+    targets = args.asset_id or args.rte_ip
+    if len(targets) > 1:
+        if not run_bulk_operation(
+            snipeit_api, "check_out", targets, by_rte_ip=not args.asset_id
+        ):
+            exit(1)
+    elif args.asset_id:
+        check_out_asset(snipeit_api, args.asset_id[0])
+    else:
+        asset_id = snipeit_api.get_asset_id_by_rte_ip(args.rte_ip[0])
+        if asset_id:
+            check_out_asset(snipeit_api, asset_id)
+        else:
+            print(f"No asset found with RTE IP: {args.rte_ip[0]}")
+
+
+def check_in_assets(snipeit_api, args):
+    """
+    Checks in the assets given by asset IDs or RTE IPs.
+
+    A single asset is checked in the usual way. Multiple assets are checked
+    in concurrently, see `run_bulk_operation()`.
+
+    Args:
+        snipeit_api: The API client used to interact with the Snipe-IT API.
+        args (object): Parsed arguments with `asset_id` or `rte_ip` lists.
+
+    Returns:
+        None
+    """
+    targets = args.asset_id or args.rte_ip
+    if len(targets) > 1:
+        if not run_bulk_operation(
+            snipeit_api, "check_in", targets, by_rte_ip=not args.asset_id
+        ):
+            exit(1)
+    elif args.asset_id:
+        check_in_asset(snipeit_api, args.asset_id[0])
+    else:
+        asset_id = snipeit_api.get_asset_id_by_rte_ip(args.rte_ip[0])
+        if asset_id:
+            check_in_asset(snipeit_api, asset_id)
+        else:
+            print(f"No asset found with RTE IP: {args.rte_ip[0]}")
+
+
+def run_bulk_operation(snipeit_api, operation, targets, by_rte_ip=False):
+    """
+    Checks out or checks in many assets concurrently and prints a summary.
+
+    If RTE IPs are looked up, or IP exclusivity is checked (check out), the
+    asset snapshot is loaded once first and shared by all of them. The
+    requests are sent by a bounded pool of `max_workers` workers, the on-disk
+    snapshot is written once at the end.
+
+    Args:
+        snipeit_api: The API client used to interact with the Snipe-IT API.
+        operation (str): Either "check_out" or "check_in".
+        targets (list): Asset IDs, or RTE IPs if `by_rte_ip` is set.
+        by_rte_ip (bool): Whether the targets are RTE IPs.
+
+    Returns:
+        Boolean: True if the operation succeeded for all the assets.
+    """
+    import asyncio
+
+    start = monotonic()
+    if by_rte_ip or operation == "check_out":
+        snipeit_api.get_all_assets()
+    with snipeit_api.deferred_snapshot_save():
+        results = asyncio.run(
+            _run_bulk_operation(snipeit_api, operation, targets, by_rte_ip)
+        )
+    print_bulk_results(results, monotonic() - start)
+    return all(result[2] for result in results)
+
+
+async def _run_bulk_operation(snipeit_api, operation, targets, by_rte_ip):
+    import asyncio
+
+    from osfv.libs.snipeit_threaded import ThreadedSnipeIT
+
+    async with ThreadedSnipeIT(snipeit_api) as async_api:
+        return await asyncio.gather(
+            *(
+                _bulk_operation_task(async_api, operation, target, by_rte_ip)
+                for target in targets
+            )
+        )
+
+
+async def _bulk_operation_task(async_api, operation, target, by_rte_ip):
+    asset_id = None if by_rte_ip else target
+    try:
+        if by_rte_ip:
+            asset_id = await async_api.get_asset_id_by_rte_ip(target)
+            if not asset_id:
+                return target, None, False, "No asset found with this RTE IP"
+
+        if operation == "check_out":
+            success, data, already_checked_out = (
+                await async_api.check_out_asset(asset_id)
+            )
+            if already_checked_out:
+                return target, asset_id, True, "Already checked out by you"
+        else:
+            success, data = await async_api.check_in_asset(asset_id)
+    except async_api.snipeit_api.DuplicatedIpException as e:
+        return target, asset_id, False, e.message
+    except Exception as e:
+        # Report the asset as failed, without aborting the other ones
+        return target, asset_id, False, f"Error: {type(e).__name__}: {e}"
+
+    if success:
+        details = "Checked out" if operation == "check_out" else "Checked in"
+        return target, asset_id, True, details
+    if data is None:
+        return target, asset_id, False, "Error: could not retrieve the asset"
+    if isinstance(data, dict) and data.get("messages"):
+        data = data["messages"]
+    return target, asset_id, False, f"Error: {data}"
+
+
+def print_bulk_results(results, elapsed):
+    """
+    Prints a per-asset result table of a bulk operation.
+
+    Args:
+        results (list): Tuples of (target, asset ID, success, details).
+        elapsed (float): Wall time of the operation in seconds.
+
+    Returns:
+        None
+    """
+    rows = [("Target", "Asset ID", "Result", "Details")]
+    for target, asset_id, success, details in results:
+        rows.append(
+            (
+                str(target),
+                "-" if asset_id is None else str(asset_id),
+                "OK" if success else "FAILED",
+                str(details),
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(3)]
+    for row in rows:
+        print(
+            "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            + "  "
+            + row[3]
+        )
+
+    failed = sum(1 for result in results if not result[2])
+    print(
+        f"{len(results)} assets processed, {failed} failed, "
+        f"total time {elapsed:.2f}s"
+    )
+
+
 def list_used_assets(snipeit_api, args):
     """
     Retrieves and displays all used assets.
@@ -85,10 +262,7 @@ def list_used_assets(snipeit_api, args):
     Returns:
         None
     """
-    all_assets = snipeit_api.get_all_assets()
-    used_assets = [
-        asset for asset in all_assets if asset["assigned_to"] is not None
-    ]
+    used_assets = snipeit_api.get_assets(status="Deployed")
 
     if not used_assets:
         print("No used assets found.")
@@ -111,15 +285,7 @@ def get_my_assets(snipeit_api):
     Returns:
         List of assets assigned to the current user
     """
-    all_assets = snipeit_api.get_all_assets()
-    used_assets = [
-        asset for asset in all_assets if asset["assigned_to"] is not None
-    ]
-    return [
-        asset
-        for asset in used_assets
-        if asset["assigned_to"]["id"] is snipeit_api.cfg_user_id
-    ]
+    return snipeit_api.get_user_assets()
 
 
 def list_my_assets(snipeit_api, args):
@@ -133,8 +299,20 @@ def list_my_assets(snipeit_api, args):
     Returns:
         Boolean: False if no assets were assigned to the user, True otherwise
     """
-    my_assets = get_my_assets(snipeit_api)
+    return print_my_assets(get_my_assets(snipeit_api), args)
 
+
+def print_my_assets(my_assets, args):
+    """
+    Prints assets assigned to the current user.
+
+    Args:
+        my_assets (list): Assets assigned to the current user.
+        args (object): Arguments that may contain additional parameters.
+
+    Returns:
+        Boolean: False if no assets were assigned to the user, True otherwise
+    """
     if not my_assets:
         print("No used assets found.")
         return False
@@ -161,14 +339,14 @@ def check_in_my(snipeit_api, args):
         None
     """
     categories_to_ignore = ["Employee Laptop"]
-    my_assets = get_my_assets(snipeit_api)
+    all_my_assets = get_my_assets(snipeit_api)
 
     my_assets = [
         asset
-        for asset in my_assets
+        for asset in all_my_assets
         if not set(asset["category"].values()) & set(categories_to_ignore)
     ]
-    if not list_my_assets(snipeit_api, args):
+    if not print_my_assets(all_my_assets, args):
         return
 
     if not args.yes:
@@ -179,20 +357,19 @@ def check_in_my(snipeit_api, args):
             print(f"Checking in {len(my_assets)} assets aborted.")
             return
 
-    failed = []
-    for asset in my_assets:
-        if not check_in_asset(snipeit_api, asset["id"]):
-            failed = failed.append(asset)
-
-    if failed:
-        print(f"Failed to check-in {len(failed)} assets:")
+    if not run_bulk_operation(
+        snipeit_api, "check_in", [asset["id"] for asset in my_assets]
+    ):
+        print("Failed to check-in some of the assets, see above.")
     else:
         print(f"{len(my_assets)} assets checked in successfully.")
 
 
 def list_unused_assets(snipeit_api, args):
     """
-    Retrieves all assets.
+    Retrieves and displays all assets not assigned to anyone. With
+    `ready_to_deploy` set, only the assets in the "Ready to Deploy" status
+    are listed, filtered by the Snipe-IT server.
 
     Args:
         snipeit_api: The API client used to interact with the Snipe-IT API.
@@ -201,17 +378,19 @@ def list_unused_assets(snipeit_api, args):
     Returns:
         None
     """
-    all_assets = snipeit_api.get_all_assets()
-    unused_assets = [
-        asset for asset in all_assets if asset["assigned_to"] is None
-    ]
+    if args.ready_to_deploy:
+        unused_assets = snipeit_api.get_assets(status="RTD")
+    else:
+        # The server can not select unassigned assets in any status, they
+        # are filtered from the asset store
+        unused_assets = snipeit_api.get_unassigned_assets()
 
     if not unused_assets:
         print("No unused assets found.")
         return
 
     if args.json:
-        print(json.dumps(unused_assets))
+        print(json.dumps(unused_assets, default=AssetRecord.json_default))
     else:
         for asset in unused_assets:
             print_asset_details(asset)
@@ -228,19 +407,72 @@ def list_all_assets(snipeit_api, args):
     Returns:
         None
     """
-    all_assets = snipeit_api.get_all_assets()
+    if args.stream:
+        all_assets = stream_assets(snipeit_api)
+    else:
+        all_assets = iter(snipeit_api.get_all_assets())
 
-    if not all_assets:
+    first_asset = next(all_assets, None)
+    if first_asset is None:
         print("No assets found.")
         return
 
     if args.json:
-        print(json.dumps(all_assets))
+        # Same output as json.dumps() of the whole list, written row by row
+        separator = "["
+        for asset in itertools.chain([first_asset], all_assets):
+            sys.stdout.write(separator)
+            sys.stdout.write(
+                json.dumps(asset, default=AssetRecord.json_default)
+            )
+            separator = ", "
+        sys.stdout.write("]\n")
     else:
-        for asset in all_assets:
+        for asset in itertools.chain([first_asset], all_assets):
             print_asset_details(asset)
 
 
+def stream_assets(snipeit_api):
+    """
+    Yields all assets as they are received from Snipe-IT, without loading
+    the whole inventory first. Exits if the assets cannot be retrieved.
+
+    Args:
+        snipeit_api: The API client used to interact with the Snipe-IT API.
+
+    Yields:
+        dict: Assets, in server order.
+    """
+    try:
+        yield from snipeit_api.iter_all_assets()
+    except snipeit_api.SnipeITStreamError as e:
+        sys.stdout.flush()
+        exit(f"Error retrieving assets: {e}")
+
+
+def serve_asset_cache(args):
+    """
+    Runs the asset cache daemon, shared by all osfv_cli processes and Robot
+    suites of the user, until interrupted.
+
+    Args:
+        args (object): Arguments that may contain additional parameters (not used in this function).
+
+    Returns:
+        None
+    """
+    from osfv.libs.snipeit_api import SnipeIT
+    from osfv.libs.snipeit_daemon import run_cache_daemon
+
+    snipeit_api = SnipeIT(use_cache_daemon=False)
+    if not snipeit_api.snapshot_cache:
+        exit("The asset cache is disabled in the Snipe-IT configuration")
+    if not run_cache_daemon(
+        snipeit_api, snipeit_api.snapshot_cache.socket_path
+    ):
+        exit(1)
+
+
 def list_for_zabbix(snipeit_api, args):
     """
     Print asset details as JSON with specific custom fields.
@@ -252,12 +484,16 @@ def list_for_zabbix(snipeit_api, args):
     Returns:
         None
     """
-    all_assets = snipeit_api.get_all_assets()
-
-    if all_assets:
-        for asset in all_assets:
-            print_asset_details_for_zabbix(asset)
+    if args.stream:
+        all_assets = stream_assets(snipeit_api)
     else:
+        all_assets = snipeit_api.get_all_assets()
+
+    found = False
+    for asset in all_assets:
+        print_asset_details_for_zabbix(asset)
+        found = True
+    if not found:
         print("No assets found.")
 
 
@@ -272,6 +508,7 @@ def print_asset_details(asset):
     Returns:
         None
     """
+    asset = AssetRecord.decode(asset)
 
     print(
         f'Asset Tag: {asset["asset_tag"]}, Asset ID: {asset["id"]},'
@@ -341,10 +578,10 @@ def relay_toggle(rte, args):
         None.
     """
     state_str = rte.relay_get()
-    if state_str == RTE.PSU_STATE_OFF:
-        new_state_str = RTE.PSU_STATE_ON
+    if state_str == rte.PSU_STATE_OFF:
+        new_state_str = rte.PSU_STATE_ON
     else:
-        new_state_str = RTE.PSU_STATE_OFF
+        new_state_str = rte.PSU_STATE_OFF
     rte.relay_set(new_state_str)
     state = rte.relay_get()
     print(f"Relay state toggled. New state: {state}")
@@ -419,25 +656,49 @@ def power_off(rte, args):
 
 
 def power_on_ex(rte, args):
+    """
+    Power on the DUT and wait for the power LED to turn on, for at most the
+    "pwr_led_on" time of the model.
+
+    Args:
+        rte (object): The object representing the relay control and power supply interface.
+        args (object): Arguments containing the power button press time.
+
+    Returns:
+        bool: True if the power LED turned on.
+    """
     power_on(rte, args)
-    for attempt in range(20):
-        if check_pwr_led(rte, args) == "high":
-            print("Power on successful.")
-            return True
-        sleep(0.25)
-    print("Power on failed.")
-    return False
+    edge_time = rte.wait_for_pwr_led("high")
+    if edge_time is None:
+        print("Power LED state: OFF")
+        print("Power on failed.")
+        return False
+    print(f"Power LED state: ON, {edge_time:.2f} s after the button release")
+    print("Power on successful.")
+    return True
 
 
 def power_off_ex(rte, args):
+    """
+    Power off the DUT and wait for the power LED to turn off, for at most the
+    "pwr_led_off" time of the model.
+
+    Args:
+        rte (object): The object representing the relay control and power supply interface.
+        args (object): Arguments containing the power button press time.
+
+    Returns:
+        bool: True if the power LED turned off.
+    """
     power_off(rte, args)
-    for attempt in range(20):
-        if check_pwr_led(rte, args) == "low":
-            print("Power off successful.")
-            return True
-        sleep(0.25)
-    print("Power off failed.")
-    return False
+    edge_time = rte.wait_for_pwr_led("low")
+    if edge_time is None:
+        print("Power LED state: ON")
+        print("Power off failed.")
+        return False
+    print(f"Power LED state: OFF, {edge_time:.2f} s after the button release")
+    print("Power off successful.")
+    return True
 
 
 def reset(rte, args):
@@ -516,14 +777,7 @@ def gpio_get(rte, args):
 
 
 def check_pwr_led(rte, args):
-    state = rte.gpio_get(RTE.GPIO_PWR_LED)
-    polarity = rte.dut_data.get("pwr_led", {}).get("polarity")
-    if polarity and polarity == "active low":
-        if state == "high":
-            state = "low"
-        else:
-            state = "high"
-
+    state = rte.pwr_led_get()
     print(f"Power LED state: {'ON' if state == 'high' else 'OFF'}")
     return state
 
@@ -587,6 +841,8 @@ def open_dut_serial(rte, args):
     Returns:
         None
     """
+    import pexpect
+
     host = args.rte_ip
     port = 13541
 
@@ -725,6 +981,8 @@ def sonoff_on(sonoff, args):
     Returns:
         None.
     """
+    import requests
+
     print("Turning on Sonoff power switch...")
     try:
         response = sonoff.turn_on()
@@ -744,6 +1002,8 @@ def sonoff_off(sonoff, args):
     Returns:
         None.
     """
+    import requests
+
     print("Turning off Sonoff power switch...")
     try:
         response = sonoff.turn_off()
@@ -763,6 +1023,8 @@ def sonoff_get(sonoff, args):
     Returns:
         None.
     """
+    import requests
+
     print("Getting Sonoff power switch state...")
     try:
         state = sonoff.get_state()
@@ -782,6 +1044,8 @@ def sonoff_tgl(sonoff, args):
     Returns:
         None.
     """
+    import requests
+
     print("Toggling Sonoff power switch state...")
     try:
         current_state = sonoff.get_state()
@@ -817,18 +1081,18 @@ def ask_to_proceed(message="Do you want to proceed (y/n): "):
             print("Invalid input. Please enter 'y' or 'n'.")
 
 
-def update_zabbix_assets(snipeit_api):
+def update_zabbix_assets(snipeit_api, zabbix):
     """
     Updates Zabbix with the latest asset data from Snipe-IT, ensuring the IP addresses
     are synchronized between Snipe-IT and Zabbix.
 
     Args:
         snipeit_api: The API client used to interact with the Snipe-IT API.
+        zabbix: The API client used to interact with the Zabbix API.
 
     Returns:
         None.
     """
-    zabbix = Zabbix()
     all_assets = snipeit_api.get_all_assets()
 
     current_zabbix_assets = zabbix.get_all_hosts()
@@ -992,10 +1256,49 @@ def update_zabbix_assets(snipeit_api):
 
 
 def list_models(args):
+    from osfv.libs.models import Models
+
     models = Models()
     models.list_models()
 
 
+def show_timings(args):
+    """
+    Prints the duration statistics of the power and SPI sequence steps
+    recorded in a timing profile, with a suggested maximum time for each.
+
+    Args:
+        args (object): Arguments containing the profile file path.
+
+    Returns:
+        None
+    """
+    from osfv.libs.timings import read_profile, summarize_profile
+
+    try:
+        summary = summarize_profile(read_profile(args.profile))
+    except (OSError, ValueError, KeyError) as e:
+        exit(f"Failed to read the timing profile: {e}")
+
+    if args.json:
+        print(json.dumps(summary, indent=4))
+        return
+
+    columns = ["runs", "timeouts", "min", "median", "max", "limit_max"]
+    columns.append("suggested_max")
+    for model, steps in summary.items():
+        print(f"{model}:")
+        print(f"  {'step':<14}" + "".join(f"{c:>15}" for c in columns))
+        for step, stats in steps.items():
+            cells = ""
+            for column in columns:
+                value = stats.get(column, "-")
+                if isinstance(value, float):
+                    value = f"{value:.2f}"
+                cells += f"{value:>15}"
+            print(f"  {step:<14}{cells}")
+
+
 def flash_image_check(args):
     """
     Checks for existence & sane content of ME region in flash image.
@@ -1051,14 +1354,490 @@ def reset_cmos(rte, args):
     rte.reset_cmos()
 
 
-# Main function
-def main():
+def fleet_operation(rte, args):
+    """
+    Runs the operation of a fleet command on one DUT.
+
+    Args:
+        rte (RTE): The RTE of the DUT.
+        args (object): Arguments selecting the operation.
+
+    Returns:
+        str: Short description of the outcome.
+    """
+    if args.fleet_cmd == "psu":
+        if args.psu_cmd == "on":
+            rte.psu_on()
+        elif args.psu_cmd == "off":
+            rte.psu_off()
+        return f"Power supply state: {rte.psu_get()}"
+    if args.fleet_cmd == "pwr":
+        if args.pwr_cmd == "on":
+            rte.power_on(args.time)
+            return "Power button pressed"
+        elif args.pwr_cmd == "off":
+            rte.power_off(args.time)
+            return "Power button pressed"
+        rte.reset(args.time)
+        return "Reset button pressed"
+    if args.fleet_cmd == "gpio":
+        if args.gpio_cmd == "set":
+            rte.gpio_set(args.gpio_no, args.state)
+        return f"GPIO {args.gpio_no} state: {rte.gpio_get(args.gpio_no)}"
+    flashrom_rc = rte.flash_probe()
+    if flashrom_rc:
+        raise RuntimeError(f"flashrom exited with {flashrom_rc}")
+    return "Flash chip probed"
+
+
+def run_fleet(clients, args):
+    """
+    Runs an RTE operation on many DUTs concurrently and prints a per-DUT
+    and an aggregate report.
+
+    The DUTs are selected from a single Snipe-IT asset snapshot. Every DUT is
+    checked out before the operation and checked in after it, unless it was
+    already checked out by the user. At most `args.parallel` DUTs are
+    operated at a time, each for at most `args.timeout` seconds. Timed out
+    DUTs are checked in once their operation has ended.
+
+    Args:
+        clients (Clients): Provider of the clients used by the operation.
+        args (object): Arguments selecting the DUTs and the operation.
+
+    Returns:
+        None
+    """
+    from osfv.libs import fleet
+
+    snipeit_api = clients.snipeit()
+    start = monotonic()
+    targets = fleet.resolve_targets(
+        snipeit_api,
+        rte_ips=args.rte_ip,
+        models=args.model,
+        user_id=snipeit_api.cfg_user_id if args.all_mine else None,
+    )
+    if not targets:
+        exit("No DUTs with an RTE IP match the selection")
+
+    @contextmanager
+    def checked_out(target):
+        success, data, already_checked_out = snipeit_api.check_out_asset(
+            target.asset_id
+        )
+        if not success and not already_checked_out:
+            raise RuntimeError(f"Check-out failed: {data}")
+        try:
+            yield
+        finally:
+            if not already_checked_out:
+                snipeit_api.check_in_asset(target.asset_id)
+
+    def operation(target):
+        sonoff = clients.sonoff(target.sonoff_ip)
+        rte = clients.rte(target.rte_ip, target.model, sonoff)
+        return fleet_operation(rte, args)
+
+    # Checked out and in outside of the timed operation, so that timed out
+    # DUTs are checked in too
+    results = fleet.run_fleet(
+        targets, operation, args.parallel, args.timeout, checked_out
+    )
+    summary = fleet.summarize_results(results, monotonic() - start)
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "results": [result.to_dict() for result in results],
+                    "summary": summary,
+                }
+            )
+        )
+    else:
+        print_fleet_results(results, summary)
+    if summary["failed"]:
+        exit(1)
+
+
+def print_fleet_results(results, summary):
+    """
+    Prints a per-DUT result table and the summary of a fleet operation.
+
+    Args:
+        results (list): FleetResult objects.
+        summary (dict): See `fleet.summarize_results()`.
+
+    Returns:
+        None
+    """
+    rows = [("RTE IP", "Asset ID", "Model", "Result", "Time [s]", "Details")]
+    for result in results:
+        target = result.target
+        if result.timed_out:
+            status = "TIMEOUT"
+        else:
+            status = "OK" if result.success else "FAILED"
+        rows.append(
+            (
+                str(target.rte_ip),
+                "-" if target.asset_id is None else str(target.asset_id),
+                target.model or "-",
+                status,
+                f"{result.elapsed:.2f}",
+                str(result.details),
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(5)]
+    for row in rows:
+        print(
+            "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            + "  "
+            + row[5]
+        )
+
+    print(
+        f"{summary['total']} DUTs processed, {summary['failed']} failed "
+        f"({summary['timed_out']} timed out), total time "
+        f"{summary['elapsed']:.2f}s"
+    )
+    if "latency_median" in summary:
+        print(
+            f"Latency: min {summary['latency_min']:.2f}s, median "
+            f"{summary['latency_median']:.2f}s, p95 "
+            f"{summary['latency_p95']:.2f}s, max "
+            f"{summary['latency_max']:.2f}s"
+        )
+
+
+def resolve_paths(args, cwd):
+    """
+    Makes the file paths in the arguments absolute, for commands run in
+    another working directory than the one they were given in (see
+    `osfv_cli serve`).
+
+    Args:
+        args (object): The parsed arguments, updated in place.
+        cwd (str): Directory the relative paths are relative to.
+
+    Returns:
+        None
+    """
+    if getattr(args, "rom", None):
+        args.rom = os.path.join(cwd, args.rom)
+    if args.command == "timings":
+        args.profile = os.path.join(cwd, args.profile)
+    if args.command == "batch":
+        if args.file != "-":
+            args.file = os.path.join(cwd, args.file)
+        # The paths in the steps are resolved as they are read
+        args.cwd = cwd
+
+
+def read_batch_steps(parser, batch_file, cwd=None):
+    """
+    Reads and parses the commands of a batch file. Every line holds one
+    osfv_cli command line, without the program name; empty lines and `#`
+    comments are skipped.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser, see `build_parser()`.
+        batch_file (str): Path of the batch file, "-" for standard input.
+        cwd (str, optional): Directory the relative paths in the steps are
+            relative to, if not the current one.
+
+    Returns:
+        list: (command line, parsed arguments) tuples of the steps.
+    """
+    if batch_file == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        try:
+            with open(batch_file) as file:
+                lines = file.read().splitlines()
+        except OSError as e:
+            exit(f"Failed to read batch file: {e}")
+
+    steps = []
+    for line_number, line in enumerate(lines, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            exit(f"Line {line_number}: {e}")
+        if argv[:1] == ["osfv_cli"]:
+            argv = argv[1:]
+        if not argv:
+            continue
+        try:
+            step_args = parser.parse_args(argv)
+        except SystemExit:
+            exit(f"Line {line_number}: invalid command: {line.strip()}")
+        if step_args.command in (None, "batch", "serve"):
+            exit(
+                f"Line {line_number}: {step_args.command} can not be run "
+                f"in a batch"
+            )
+        if cwd is not None:
+            resolve_paths(step_args, cwd)
+        steps.append((shlex.join(argv), step_args))
+    return steps
+
+
+def run_batch(parser, args, clients):
+    """
+    Runs the commands of a batch file one after another in this process,
+    stopping on the first failure.
+
+    The clients are shared by all the steps, so e.g. the assets are looked
+    up once. Assets are checked out by the first step which needs them and
+    checked in after the last step. Prints the run time of every step.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser, see `build_parser()`.
+        args (object): Arguments containing the batch file path.
+        clients (Clients): Provider of the clients used by the steps.
+
+    Returns:
+        None
+    """
+    # Every step is parsed before running the first one
+    steps = read_batch_steps(parser, args.file, getattr(args, "cwd", None))
+    clients = clients.holding()
+    timings = []
+    failed = None
+    try:
+        for number, (command, step_args) in enumerate(steps, 1):
+            print(f"[{number}/{len(steps)}] {command}", flush=True)
+            start = monotonic()
+            error = None
+            try:
+                run_command(parser, step_args, clients)
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    error = e.code
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            timings.append((number, monotonic() - start, command))
+            if error is not None:
+                if not isinstance(error, int):
+                    print(error)
+                failed = number
+                break
+    finally:
+        clients.release_assets()
+
+    print(f"{'step':<6}{'time [s]':>10}  command")
+    for number, duration, command in timings:
+        print(f"{number:<6}{duration:>10.3f}  {command}")
+    if failed is not None:
+        exit(
+            f"Step {failed} failed, {len(steps) - failed} remaining steps "
+            f"skipped"
+        )
+
+
+class Clients:
+    """
+    Provides the Snipe-IT, RTE, Sonoff and Zabbix clients to the commands.
+
+    A single osfv_cli run creates the clients it needs and exits. Long-lived
+    processes (see `osfv_cli serve`) set `keep`, so that the clients, with
+    their caches and connections, are created once and shared by all the
+    commands they run.
+
+    The provider also checks the assets out for the commands which need
+    them. Command sequences (see `osfv_cli batch`) set `hold_assets`, so that
+    an asset is checked out by the first command using it and checked in by
+    `release_assets()` after the last one.
+    """
+
+    def __init__(self, keep=False, hold_assets=False):
+        """
+        Initializes the provider.
+
+        Args:
+            keep (bool): Whether to keep the clients for later commands.
+            hold_assets (bool): Whether to keep the assets checked out for
+                later commands.
+        """
+        self.keep = keep
+        self.hold_assets = hold_assets
+        self.held_assets = {}
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def holding(self):
+        """
+        Returns a provider sharing the clients of this one, which keeps the
+        assets checked out until `release_assets()`.
+        """
+        clients = copy(self)
+        clients.keep = True
+        clients.hold_assets = True
+        clients.held_assets = {}
+        return clients
+
+    def _get(self, key, factory):
+        if not self.keep:
+            return factory()
+        with self.lock:
+            if key not in self.clients:
+                self.clients[key] = factory()
+            return self.clients[key]
+
+    def snipeit(self):
+        """
+        Returns the Snipe-IT API client, created from the Snipe-IT
+        configuration file.
+        """
+        from osfv.libs.snipeit_api import SnipeIT
+
+        snipeit_api = self._get("snipeit", SnipeIT)
+        if self.keep:
+            # Kept clients would otherwise never see changes of other users
+            snipeit_api.ensure_fresh_assets()
+        return snipeit_api
+
+    def rte(self, rte_ip, dut_model, sonoff):
+        """
+        Returns the RTE client for a DUT.
+        """
+        from osfv.libs.rte import RTE
+
+        return self._get(
+            ("rte", rte_ip, dut_model, sonoff.sonoff_ip),
+            lambda: RTE(rte_ip, dut_model, sonoff),
+        )
+
+    def sonoff(self, sonoff_ip):
+        """
+        Returns the Sonoff client for a Sonoff IP.
+        """
+        from osfv.libs.sonoff_api import SonoffDevice
+
+        return self._get(
+            ("sonoff", sonoff_ip), lambda: SonoffDevice(sonoff_ip)
+        )
+
+    def zabbix(self):
+        """
+        Returns the Zabbix API client, created from the Zabbix configuration
+        file.
+        """
+        from osfv.libs.zabbix import Zabbix
+
+        return self._get("zabbix", Zabbix)
+
+    def check_out(self, snipeit_api, asset_id):
+        """
+        Checks out an asset before a command uses it.
+
+        Args:
+            snipeit_api: The API client used to interact with the Snipe-IT API.
+            asset_id (str): The unique identifier of the asset.
+
+        Returns:
+            bool: True if the asset was already checked out by the user.
+        """
+        if asset_id in self.held_assets:
+            return self.held_assets[asset_id]
+        print(
+            f"Using rte command is invasive action, checking first if the "
+            f"device is not used..."
+        )
+        already_checked_out = check_out_asset(snipeit_api, asset_id)
+        if self.hold_assets:
+            self.held_assets[asset_id] = already_checked_out
+        return already_checked_out
+
+    def check_in(self, snipeit_api, asset_id, already_checked_out):
+        """
+        Checks in an asset after a command used it, unless it was checked out
+        manually or it is held for later commands.
+
+        Args:
+            snipeit_api: The API client used to interact with the Snipe-IT API.
+            asset_id (str): The unique identifier of the asset.
+            already_checked_out (bool): Result of `check_out()`.
+
+        Returns:
+            None
+        """
+        if self.hold_assets:
+            return
+        if already_checked_out:
+            print(
+                f"Since the asset {asset_id} has been checkout manually by "
+                f"you prior running this script, it will NOT be checked in "
+                f"automatically. Please return the device when work is "
+                f"finished."
+            )
+        else:
+            print(
+                f"Since the asset {asset_id} has been checkout automatically "
+                f"by this script, it is automatically checked in as well."
+            )
+            check_in_asset(snipeit_api, asset_id)
+
+    def release_assets(self):
+        """
+        Checks in the held assets, see `check_in()`.
+
+        Returns:
+            None
+        """
+        held_assets, self.held_assets = self.held_assets, {}
+        self.hold_assets = False
+        for asset_id, already_checked_out in held_assets.items():
+            self.check_in(self.snipeit(), asset_id, already_checked_out)
+
+
+def model_uses_sonoff(model_name):
+    """
+    Checks whether the DUT model is powered through a Sonoff switch.
+
+    Args:
+        model_name (str): DUT model name.
+
+    Returns:
+        bool: True if the model configuration enables Sonoff power control.
+    """
+    from osfv.libs.models import Models
+
+    model_data = Models().load_model_data(model_name)[1]
+    return model_data["pwr_ctrl"]["sonoff"] is True
+
+
+class VersionAction(argparse.Action):
+    """
+    Prints the osfv package version and exits. Unlike the "version" action of
+    argparse, the version is only looked up when the option is used.
+    """
+
+    def __init__(self, option_strings, dest, **kwargs):
+        kwargs.setdefault("help", "show program's version number and exit")
+        super().__init__(
+            option_strings, dest=argparse.SUPPRESS, nargs=0, **kwargs
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from importlib import metadata
+
+        print(metadata.version("osfv"))
+        parser.exit()
+
+
+def build_parser():
+    """
+    Builds the command line parser of osfv_cli.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
     parser = argparse.ArgumentParser(
         description="Open Source Firmware Validation CLI"
     )
-    parser.add_argument(
-        "-v", "--version", action="version", version=metadata.version("osfv")
-    )
+    parser.add_argument("-v", "--version", action=VersionAction)
 
     parser.add_argument(
         "-j",
@@ -1078,6 +1857,110 @@ def main():
     list_models_parser = subparsers.add_parser(
         "list_models", help="List of supported models"
     )
+    fleet_parser = subparsers.add_parser(
+        "fleet", help="Run an RTE operation on many DUTs in parallel"
+    )
+    # Selection of the DUTs, given after the operation
+    fleet_targets_parser = argparse.ArgumentParser(add_help=False)
+    fleet_group = fleet_targets_parser.add_mutually_exclusive_group(
+        required=True
+    )
+    fleet_group.add_argument(
+        "--rte_ip", type=str, nargs="+", help="RTE IP addresses of the DUTs"
+    )
+    fleet_group.add_argument(
+        "--model", type=str, nargs="+", help="All DUTs of these models"
+    )
+    fleet_group.add_argument(
+        "--all-mine",
+        action="store_true",
+        help="All DUTs assigned to you",
+    )
+    fleet_targets_parser.add_argument(
+        "--parallel",
+        type=int,
+        default=8,
+        help="Maximum number of DUTs operated at a time (default: 8)",
+    )
+    fleet_targets_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300,
+        help="Maximum time of the operation on a DUT in seconds "
+        "(default: 300)",
+    )
+    fleet_subparsers = fleet_parser.add_subparsers(
+        title="subcommands", dest="fleet_cmd", required=True
+    )
+    fleet_psu_parser = fleet_subparsers.add_parser(
+        "psu",
+        parents=[fleet_targets_parser],
+        help="Control the power supplies",
+    )
+    fleet_psu_parser.add_argument(
+        "psu_cmd", choices=["on", "off", "get"], help="Power supply command"
+    )
+    fleet_pwr_parser = fleet_subparsers.add_parser(
+        "pwr",
+        parents=[fleet_targets_parser],
+        help="Press the power or reset buttons",
+    )
+    fleet_pwr_parser.add_argument(
+        "pwr_cmd", choices=["on", "off", "reset"], help="Button press"
+    )
+    fleet_pwr_parser.add_argument(
+        "--time",
+        type=int,
+        help="Button press time in seconds (default: 1, 6 for off)",
+    )
+    fleet_gpio_parser = fleet_subparsers.add_parser(
+        "gpio", parents=[fleet_targets_parser], help="Get or set a GPIO"
+    )
+    fleet_gpio_parser.add_argument(
+        "gpio_cmd", choices=["get", "set"], help="GPIO command"
+    )
+    fleet_gpio_parser.add_argument("gpio_no", type=int, help="GPIO number")
+    fleet_gpio_parser.add_argument(
+        "state",
+        nargs="?",
+        choices=["high", "low", "high-z"],
+        help="GPIO state, for set",
+    )
+    fleet_flash_parser = fleet_subparsers.add_parser(
+        "flash", parents=[fleet_targets_parser], help="DUT flash operations"
+    )
+    fleet_flash_parser.add_argument(
+        "flash_cmd", choices=["probe"], help="Flash probe with flashrom"
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run the osfv_cli commands listed in a file, one per line, in a "
+        "single process",
+    )
+    batch_parser.add_argument(
+        "file", type=str, help="Batch file, '-' for standard input"
+    )
+    timings_parser = subparsers.add_parser(
+        "timings",
+        help="Summarize a timing profile of the power and SPI sequences",
+    )
+    timings_parser.add_argument(
+        "profile",
+        type=str,
+        help="File the profile was recorded to, see OSFV_TIMING_PROFILE",
+    )
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run commands sent by osfv_cli_client, keeping the clients "
+        "warm between them",
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=str,
+        default=SOCKET_PATH,
+        help=f"Unix socket to listen on (default: {SOCKET_PATH})",
+    )
 
     # Sonoff subcommands
     sonoff_group = sonoff_parser.add_mutually_exclusive_group(required=True)
@@ -1110,15 +1993,33 @@ def main():
     list_unused_parser = snipeit_subparsers.add_parser(
         "list_unused", help="List all unused assets"
     )
+    list_unused_parser.add_argument(
+        "--ready-to-deploy",
+        action="store_true",
+        help="List only the assets in the Ready to Deploy status, filtered "
+        "by the Snipe-IT server",
+    )
 
     list_all_parser = snipeit_subparsers.add_parser(
         "list_all", help="List all assets"
     )
+    list_all_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the assets as they are received from Snipe-IT, "
+        "bypassing the local asset cache",
+    )
 
     list_zabbix_parser = snipeit_subparsers.add_parser(
         "list_for_zabbix",
         help="List assets in a format suitable for Zabbix integration",
     )
+    list_zabbix_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the assets as they are received from Snipe-IT, "
+        "bypassing the local asset cache",
+    )
 
     update_zabbix_assets_parser = snipeit_subparsers.add_parser(
         "update_zabbix",
@@ -1127,13 +2028,17 @@ def main():
 
     check_out_parser = snipeit_subparsers.add_parser(
         "check_out",
-        help="Check out an asset by providing the Asset ID or RTE IP",
+        help="Check out assets by providing Asset IDs or RTE IPs",
     )
     check_out_group = check_out_parser.add_mutually_exclusive_group(
         required=True
     )
-    check_out_group.add_argument("--asset_id", type=int, help="Asset ID")
-    check_out_group.add_argument("--rte_ip", type=str, help="RTE IP")
+    check_out_group.add_argument(
+        "--asset_id", type=int, nargs="+", help="Asset ID(s)"
+    )
+    check_out_group.add_argument(
+        "--rte_ip", type=str, nargs="+", help="RTE IP(s)"
+    )
     check_out_parser = snipeit_subparsers.add_parser(
         "user_add",
         help="Add a new user by providing user First Name and Last Name",
@@ -1160,13 +2065,17 @@ def main():
 
     check_in_parser = snipeit_subparsers.add_parser(
         "check_in",
-        help="Check in an asset by providing the Asset ID or RTE IP",
+        help="Check in assets by providing Asset IDs or RTE IPs",
     )
     check_in_group = check_in_parser.add_mutually_exclusive_group(
         required=True
     )
-    check_in_group.add_argument("--asset_id", type=int, help="Asset ID")
-    check_in_group.add_argument("--rte_ip", type=str, help="RTE IP address")
+    check_in_group.add_argument(
+        "--asset_id", type=int, nargs="+", help="Asset ID(s)"
+    )
+    check_in_group.add_argument(
+        "--rte_ip", type=str, nargs="+", help="RTE IP address(es)"
+    )
 
     check_in_my_parser = snipeit_subparsers.add_parser(
         "check_in_my", help="Check in all my used assets, except work laptops"
@@ -1175,6 +2084,12 @@ def main():
         "-y", "--yes", action="store_true", help="Skips the confirmation"
     )
 
+    snipeit_subparsers.add_parser(
+        "cache_daemon",
+        help="Serve a shared, always warm asset cache to other osfv_cli "
+        "processes on this machine",
+    )
+
     # RTE subcommands
     rte_parser.add_argument(
         "--rte_ip", type=str, help="RTE IP address", required=True
@@ -1421,11 +2336,29 @@ def main():
         dest="regions_to_dump",
     )
 
-    args = parser.parse_args()
+    return parser
+
 
-    snipeit_api = SnipeIT()
+def run_command(parser, args, clients):
+    """
+    Runs the command given on the command line.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser, see `build_parser()`.
+        args (object): The parsed arguments.
+        clients (Clients): Provider of the clients used by the command.
 
+    Returns:
+        None
+    """
+    # Clients are created by the commands which use them, so that e.g.
+    # list_models does not need the Snipe-IT configuration
     if args.command == "snipeit":
+        if args.snipeit_cmd == "cache_daemon":
+            serve_asset_cache(args)
+            return
+
+        snipeit_api = clients.snipeit()
         if args.snipeit_cmd == "list_used":
             list_used_assets(snipeit_api, args)
         elif args.snipeit_cmd == "list_my":
@@ -1437,23 +2370,9 @@ def main():
         elif args.snipeit_cmd == "list_for_zabbix":
             list_for_zabbix(snipeit_api, args)
         elif args.snipeit_cmd == "check_out":
-            if args.asset_id:
-                check_out_asset(snipeit_api, args.asset_id)
-            elif args.rte_ip:
-                asset_id = snipeit_api.get_asset_id_by_rte_ip(args.rte_ip)
-                if asset_id:
-                    check_out_asset(snipeit_api, asset_id)
-                else:
-                    print(f"No asset found with RTE IP: {args.rte_ip}")
+            check_out_assets(snipeit_api, args)
         elif args.snipeit_cmd == "check_in":
-            if args.asset_id:
-                check_in_asset(snipeit_api, args.asset_id)
-            elif args.rte_ip:
-                asset_id = snipeit_api.get_asset_id_by_rte_ip(args.rte_ip)
-                if asset_id:
-                    check_in_asset(snipeit_api, asset_id)
-                else:
-                    print(f"No asset found with RTE IP: {args.rte_ip}")
+            check_in_assets(snipeit_api, args)
         elif args.snipeit_cmd == "check_in_my":
             check_in_my(snipeit_api, args)
         elif args.snipeit_cmd == "user_add":
@@ -1463,10 +2382,12 @@ def main():
         elif args.snipeit_cmd == "user_del":
             snipeit_api.user_del(args.first_name, args.last_name)
         elif args.snipeit_cmd == "update_zabbix":
-            update_zabbix_assets(snipeit_api)
+            update_zabbix_assets(snipeit_api, clients.zabbix())
 
     elif args.command == "rte":
+        snipeit_api = None
         if not args.skip_snipeit:
+            snipeit_api = clients.snipeit()
             asset_id = snipeit_api.get_asset_id_by_rte_ip(args.rte_ip)
             if not asset_id:
                 print(f"No asset found with RTE IP: {args.rte_ip}")
@@ -1490,15 +2411,14 @@ def main():
                     )
             else:
                 exit(f"model name not present. check again arguments.")
+        if snipeit_api is None and model_uses_sonoff(dut_model_name):
+            # The Sonoff IP is still looked up in Snipe-IT
+            snipeit_api = clients.snipeit()
         sonoff, sonoff_ip = utils.init_sonoff(None, args.rte_ip, snipeit_api)
-        rte = RTE(args.rte_ip, dut_model_name, sonoff)
+        rte = clients.rte(args.rte_ip, dut_model_name, sonoff)
 
         if not args.skip_snipeit:
-            print(
-                f"Using rte command is invasive action, checking first if the "
-                f"device is not used..."
-            )
-            already_checked_out = check_out_asset(snipeit_api, asset_id)
+            already_checked_out = clients.check_out(snipeit_api, asset_id)
 
         if args.rte_cmd == "rel":
             # Handle RTE relay related commands
@@ -1557,21 +2477,9 @@ def main():
                 flash_erase(rte, args)
 
         if not args.skip_snipeit:
-            if already_checked_out:
-                print(
-                    f"Since the asset {asset_id} has been checkout manually "
-                    f"by you prior running this script, it will NOT be checked "
-                    f"in automatically. Please return the device when work is "
-                    f"finished."
-                )
-            else:
-                print(
-                    f"Since the asset {asset_id} has been checkout "
-                    f"automatically by this script, it is automatically "
-                    f"checked in as well."
-                )
-                check_in_asset(snipeit_api, asset_id)
+            clients.check_in(snipeit_api, asset_id, already_checked_out)
     elif args.command == "sonoff":
+        snipeit_api = clients.snipeit()
         sonoff_ip = ""
 
         if args.sonoff_ip:
@@ -1585,13 +2493,9 @@ def main():
         if not asset_id:
             print(f"No asset found with RTE IP: {args.rte_ip}")
 
-        print(
-            f"Using rte command is invasive action, checking first if the "
-            f"device is not used..."
-        )
-        already_checked_out = check_out_asset(snipeit_api, asset_id)
+        already_checked_out = clients.check_out(snipeit_api, asset_id)
 
-        sonoff = SonoffDevice(sonoff_ip)
+        sonoff = clients.sonoff(sonoff_ip)
 
         if args.sonoff_cmd == "on":
             sonoff_on(sonoff, args)
@@ -1602,26 +2506,37 @@ def main():
         if args.sonoff_cmd == "tgl":
             sonoff_tgl(sonoff, args)
 
-        if already_checked_out:
-            print(
-                f"Since the asset {asset_id} has been checkout manually by "
-                f"you prior running this script, it will NOT be checked in "
-                f"automatically. Please return the device when work is "
-                f"finished."
-            )
-        else:
-            print(
-                f"Since the asset {asset_id} has been checkout automatically "
-                f"by this script, it is automatically checked in as well."
-            )
-            check_in_asset(snipeit_api, asset_id)
+        clients.check_in(snipeit_api, asset_id, already_checked_out)
     elif args.command == "flash_image_check":
         flash_image_check(args)
     elif args.command == "list_models":
         list_models(args)
+    elif args.command == "timings":
+        show_timings(args)
+    elif args.command == "fleet":
+        if args.fleet_cmd == "gpio" and args.gpio_cmd == "set":
+            if args.state is None:
+                parser.error("fleet gpio set: the state is required")
+        if args.fleet_cmd == "pwr" and args.time is None:
+            args.time = 6 if args.pwr_cmd == "off" else 1
+        run_fleet(clients, args)
+    elif args.command == "batch":
+        run_batch(parser, args, clients)
+    elif args.command == "serve":
+        from osfv.cli.server import serve
+
+        if not serve(args.socket):
+            exit(1)
     else:
         parser.print_help()
 
 
+# Main function
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    run_command(parser, args, Clients())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Thin front-end of `osfv_cli serve`.
+
+Sends the command line to the osfv_cli server and prints its output as it
+comes, then exits with the status of the command. Only the standard library
+is imported, so that a call costs little more than the interpreter startup.
+When no server is running, or for interactive commands, the command is run
+in this process instead, as `osfv_cli` would.
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_PATH = os.environ.get(
+    "OSFV_CLI_SOCKET", os.path.expanduser("~/.osfv/osfv_cli.sock")
+)
+
+# Commands which read from the terminal, or run a server themselves, are
+# never forwarded
+LOCAL_COMMANDS = [
+    ("serve",),
+    ("flash_image_check",),
+    ("rte", "serial"),
+    ("snipeit", "cache_daemon"),
+    ("snipeit", "update_zabbix"),
+]
+
+
+def is_local_command(argv):
+    """
+    Checks whether a command line must be run locally.
+
+    Args:
+        argv (list): Command line arguments, without the program name.
+
+    Returns:
+        bool: True if the command must not be sent to the server.
+    """
+    words = [arg for arg in argv if not arg.startswith("-")]
+    if words[:1] == ["batch"] and "-" in argv:
+        # The server can not read the standard input of the client
+        return True
+    if words[:2] == ["snipeit", "check_in_my"]:
+        # Asks for confirmation, unless told not to
+        return not {"-y", "--yes"} & set(argv)
+    for command in LOCAL_COMMANDS:
+        if words[:1] == [command[0]] and all(
+            word in words for word in command[1:]
+        ):
+            return True
+    return False
+
+
+def connect(socket_path):
+    """
+    Connects to the osfv_cli server.
+
+    Args:
+        socket_path (str): Path of the server Unix socket.
+
+    Returns:
+        socket.socket or None: The connection, or None if no server is
+            listening on the socket.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def run_remote(sock, argv):
+    """
+    Runs a command in the osfv_cli server.
+
+    Args:
+        sock (socket.socket): Connection to the server.
+        argv (list): Command line arguments, without the program name.
+
+    Returns:
+        int: Exit status of the command.
+    """
+    request = {"argv": argv, "cwd": os.getcwd()}
+    with sock, sock.makefile("rb") as responses:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        for line in responses:
+            message = json.loads(line)
+            if "exit" in message:
+                return message["exit"]
+            stream = sys.stderr if "stderr" in message else sys.stdout
+            stream.write(message.get("stderr", message.get("stdout")))
+            stream.flush()
+    print("Connection to the osfv_cli server lost", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    sock = None
+    if not is_local_command(argv):
+        sock = connect(SOCKET_PATH)
+    if sock is None:
+        from osfv.cli.cli import main as cli_main
+
+        cli_main(argv)
+        return
+
+    sys.exit(run_remote(sock, argv))
+
+
+if __name__ == "__main__":
+    main()
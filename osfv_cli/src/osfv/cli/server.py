@@ -0,0 +1,198 @@
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import traceback
+
+from osfv.cli.cli import Clients, build_parser, resolve_paths, run_command
+from osfv.cli.client import connect
+
+
+class CommandOutput:
+    """
+    Replacement of `sys.stdout` and `sys.stderr` routing the output of every
+    command to the client which sent it.
+
+    The output of a request handler thread goes to the writer attached to
+    the thread. The output of any other thread, e.g. a worker thread started
+    by a command, goes to the server's own stream.
+    """
+
+    def __init__(self, name, stream):
+        """
+        Initializes the stream.
+
+        Args:
+            name (str): "stdout" or "stderr", the key of the messages sent
+                to the client.
+            stream: The server's own stream.
+        """
+        self.name = name
+        self.stream = stream
+        self.local = threading.local()
+
+    def attach(self, writer):
+        self.local.writer = writer
+
+    def detach(self):
+        self.local.writer = None
+
+    def write(self, text):
+        writer = getattr(self.local, "writer", None)
+        if writer is None:
+            return self.stream.write(text)
+        if text:
+            writer({self.name: text})
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, "writer", None) is None:
+            self.stream.flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class CommandRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Runs one command per connection. The request is a JSON line with the
+    command line (`argv`) and the working directory of the client (`cwd`).
+    The response is a JSON line per piece of output, `{"stdout": text}` or
+    `{"stderr": text}`, and a final `{"exit": status}`.
+    """
+
+    def handle(self):
+        self.connected = True
+        try:
+            request = json.loads(self.rfile.readline())
+            argv = [str(arg) for arg in request["argv"]]
+            cwd = str(request["cwd"])
+        except (ValueError, KeyError, TypeError) as e:
+            self._send({"stderr": f"Invalid request: {e}\n"})
+            self._send({"exit": 2})
+            return
+
+        sys.stdout.attach(self._send)
+        sys.stderr.attach(self._send)
+        try:
+            status = self.server.run(argv, cwd)
+        finally:
+            sys.stdout.detach()
+            sys.stderr.detach()
+        self._send({"exit": status})
+
+    def _send(self, message):
+        if not self.connected:
+            return
+        try:
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+        except OSError:
+            # The client went away, let the command run to completion so
+            # that e.g. assets are still checked in
+            self.connected = False
+
+
+class CommandServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Runs osfv_cli commands sent by `osfv_cli_client`, in threads of a single
+    process, so that the Snipe-IT asset store, the HTTP sessions and the RTE
+    model data are loaded once and shared by all the commands.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        """
+        Initializes the server.
+
+        Args:
+            socket_path (str): Path of the Unix socket to listen on.
+        """
+        self.parser = build_parser()
+        self.clients = Clients(keep=True)
+        os.makedirs(os.path.dirname(socket_path), mode=0o700, exist_ok=True)
+        super().__init__(socket_path, CommandRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+    def run(self, argv, cwd):
+        """
+        Runs a command.
+
+        Args:
+            argv (list): Command line arguments, without the program name.
+            cwd (str): Working directory of the client, relative paths are
+                resolved against it.
+
+        Returns:
+            int: Exit status of the command.
+        """
+        try:
+            args = self.parser.parse_args(argv)
+            resolve_paths(args, cwd)
+            if args.command == "serve":
+                print("osfv_cli is already serving")
+                return 1
+            run_command(self.parser, args, self.clients)
+        except SystemExit as e:
+            if e.code is None:
+                return 0
+            if isinstance(e.code, int):
+                return e.code
+            print(e.code, file=sys.stderr)
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+        return 0
+
+
+def serve(socket_path):
+    """
+    Runs the osfv_cli server in the foreground until interrupted.
+
+    Args:
+        socket_path (str): Path of the Unix socket to listen on.
+
+    Returns:
+        bool: False if another server is already running, True otherwise.
+    """
+    if os.path.exists(socket_path):
+        sock = connect(socket_path)
+        if sock is not None:
+            sock.close()
+            print(f"osfv_cli is already serving on {socket_path}")
+            return False
+        # Left behind by a server which did not exit cleanly
+        os.remove(socket_path)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    server = CommandServer(socket_path)
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = CommandOutput("stdout", stdout)
+    sys.stderr = CommandOutput("stderr", stderr)
+    # Commands asking for confirmation get no answer instead of blocking
+    sys.stdin = open(os.devnull)
+    print(f"Serving osfv_cli on {socket_path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sys.stdout, sys.stderr = stdout, stderr
+    return True
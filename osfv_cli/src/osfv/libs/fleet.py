@@ -0,0 +1,277 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from osfv.libs.snipeit_index import AssetIPIndex
+
+
+def _model_name(asset):
+    """
+    Returns the model name of an asset, None if it has no model. Asset
+    records keep it decoded, so their JSON is not parsed.
+    """
+    if hasattr(asset, "model_name"):
+        return asset.model_name
+    return (asset.get("model") or {}).get("name")
+
+
+class FleetTarget:
+    """
+    A DUT selected for a fleet operation, as found in the Snipe-IT asset
+    snapshot.
+    """
+
+    __slots__ = ("rte_ip", "asset_id", "model", "sonoff_ip", "error")
+
+    def __init__(
+        self, rte_ip, asset_id=None, model=None, sonoff_ip=None, error=None
+    ):
+        """
+        Initializes the target.
+
+        Args:
+            rte_ip (str): IP address of the RTE of the DUT.
+            asset_id (int, optional): Snipe-IT asset ID of the DUT.
+            model (str, optional): Snipe-IT model name of the DUT.
+            sonoff_ip (str, optional): IP address of the Sonoff of the DUT.
+            error (str, optional): Why the target can not be used, if so.
+        """
+        self.rte_ip = rte_ip
+        self.asset_id = asset_id
+        self.model = model
+        self.sonoff_ip = sonoff_ip
+        self.error = error
+
+    @classmethod
+    def from_asset(cls, asset):
+        return cls(
+            AssetIPIndex.field_value(asset, "RTE IP"),
+            asset["id"],
+            _model_name(asset),
+            AssetIPIndex.field_value(asset, "Sonoff IP"),
+        )
+
+
+class FleetResult:
+    """
+    Outcome of a fleet operation on one DUT.
+    """
+
+    __slots__ = ("target", "success", "details", "elapsed", "timed_out")
+
+    def __init__(self, target, success, details, elapsed=0.0, timed_out=False):
+        self.target = target
+        self.success = success
+        self.details = details
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    def to_dict(self):
+        return {
+            "rte_ip": self.target.rte_ip,
+            "asset_id": self.target.asset_id,
+            "model": self.target.model,
+            "success": self.success,
+            "timed_out": self.timed_out,
+            "elapsed": self.elapsed,
+            "details": self.details,
+        }
+
+
+def resolve_targets(snipeit_api, rte_ips=None, models=None, user_id=None):
+    """
+    Selects the DUTs of a fleet operation from a single Snipe-IT asset
+    snapshot. Only assets with an RTE IP are selected by model or user.
+
+    Args:
+        snipeit_api (SnipeIT): The Snipe-IT API client.
+        rte_ips (list, optional): RTE IPs of the DUTs.
+        models (list, optional): Model names of the DUTs.
+        user_id (int, optional): ID of the user the DUTs are assigned to.
+
+    Returns:
+        list: FleetTarget objects, in the order of `rte_ips` or of the
+            assets. RTE IPs without an asset are returned as targets with
+            an error.
+    """
+    assets = snipeit_api.get_all_assets()
+    if rte_ips:
+        index = snipeit_api.get_ip_index()
+        targets = []
+        for rte_ip in dict.fromkeys(rte_ips):
+            found = index.find("RTE IP", rte_ip)
+            if not found:
+                targets.append(
+                    FleetTarget(
+                        rte_ip, error="No asset found with this RTE IP"
+                    )
+                )
+            elif len(found) > 1:
+                targets.append(
+                    FleetTarget(
+                        rte_ip,
+                        error=f"RTE IP used by {len(found)} assets",
+                    )
+                )
+            else:
+                targets.append(FleetTarget.from_asset(found[0]))
+        return targets
+
+    targets = []
+    for asset in assets:
+        if not AssetIPIndex.field_value(asset, "RTE IP"):
+            continue
+        if models and _model_name(asset) not in models:
+            continue
+        if user_id is not None:
+            assigned_to = asset["assigned_to"] or {}
+            if assigned_to.get("id") != user_id:
+                continue
+        targets.append(FleetTarget.from_asset(asset))
+    return targets
+
+
+def _run_with_timeout(operation, target, timeout):
+    """
+    Runs an operation on one target, giving up after `timeout` seconds. The
+    operation runs in a daemon thread, as threads can not be interrupted.
+
+    Returns:
+        tuple: The FleetResult, and the thread still running the operation
+            if it timed out, None otherwise.
+    """
+    outcome = []
+
+    def run():
+        try:
+            outcome.append((True, operation(target)))
+        except SystemExit as e:
+            outcome.append((False, str(e.code or "Exited")))
+        except Exception as e:
+            outcome.append((False, f"{type(e).__name__}: {e}"))
+
+    start = time.monotonic()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    elapsed = time.monotonic() - start
+    if not outcome:
+        result = FleetResult(
+            target,
+            False,
+            f"Timed out after {timeout:g} s",
+            elapsed,
+            timed_out=True,
+        )
+        return result, thread
+    success, details = outcome[0]
+    return FleetResult(target, success, details, elapsed), None
+
+
+def _run_target(operation, target, timeout, reserve):
+    """
+    Runs an operation on one target while it is reserved. Only the operation
+    is bound by the timeout. A timed out operation is still waited for before
+    the target is released, so that no DUT is released, or left reserved,
+    while it is being operated.
+    """
+    start = time.monotonic()
+    try:
+        with reserve(target):
+            result, thread = _run_with_timeout(operation, target, timeout)
+            if thread is not None:
+                thread.join()
+    except SystemExit as e:
+        result = FleetResult(
+            target, False, str(e.code or "Exited"), time.monotonic() - start
+        )
+    except Exception as e:
+        result = FleetResult(
+            target,
+            False,
+            f"{type(e).__name__}: {e}",
+            time.monotonic() - start,
+        )
+    return result
+
+
+def run_fleet(targets, operation, parallel, timeout, reserve=None):
+    """
+    Runs an operation on many DUTs concurrently.
+
+    Args:
+        targets (list): FleetTarget objects, see `resolve_targets()`.
+            Targets with an error are reported as failed without running the
+            operation.
+        operation (callable): Called with a target, returns a short
+            description of the outcome. Failures are reported by raising an
+            exception, or by calling exit().
+        parallel (int): Maximum number of DUTs operated at a time.
+        timeout (float): Maximum run time of the operation on a DUT, in
+            seconds. Timed out operations are reported as soon as the time
+            is up, but the function returns only once they have ended.
+        reserve (callable, optional): Called with a target, returns a
+            context manager holding the DUT for the operation, e.g. checking
+            it out from Snipe-IT. Failures to reserve or release the DUT are
+            reported like failures of the operation.
+
+    Returns:
+        list: FleetResult objects, in the order of `targets`.
+    """
+    if reserve is None:
+        reserve = nullcontext
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        futures = [
+            (
+                executor.submit(
+                    _run_target, operation, target, timeout, reserve
+                )
+                if target.error is None
+                else None
+            )
+            for target in targets
+        ]
+    return [
+        (
+            future.result()
+            if future is not None
+            else FleetResult(target, False, target.error)
+        )
+        for target, future in zip(targets, futures)
+    ]
+
+
+def summarize_results(results, elapsed):
+    """
+    Aggregates the results of a fleet operation.
+
+    Args:
+        results (list): FleetResult objects.
+        elapsed (float): Wall time of the whole operation in seconds.
+
+    Returns:
+        dict: Counts of the DUTs, latency statistics of the DUTs the
+            operation ran on, in seconds, and the wall time.
+    """
+    latencies = sorted(result.elapsed for result in results if result.elapsed)
+    summary = {
+        "total": len(results),
+        "succeeded": sum(result.success for result in results),
+        "failed": sum(not result.success for result in results),
+        "timed_out": sum(result.timed_out for result in results),
+        "elapsed": elapsed,
+    }
+    if latencies:
+        summary.update(
+            {
+                "latency_min": latencies[0],
+                "latency_median": statistics.median(latencies),
+                "latency_p95": latencies[
+                    min(len(latencies) - 1, int(len(latencies) * 0.95))
+                ],
+                "latency_max": latencies[-1],
+            }
+        )
+    return summary
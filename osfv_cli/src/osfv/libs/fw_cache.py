@@ -0,0 +1,137 @@
+import hashlib
+import os
+import secrets
+import shlex
+import threading
+
+# SHA-256 of local files, keyed by path, size and modification time, so that
+# an image flashed repeatedly is hashed once per process
+_local_digests = {}
+_local_digests_lock = threading.Lock()
+
+
+def file_sha256(path):
+    """
+    Computes the SHA-256 digest of a local file.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    info = os.stat(path)
+    key = (os.path.realpath(path), info.st_size, info.st_mtime_ns)
+    with _local_digests_lock:
+        if key in _local_digests:
+            return _local_digests[key]
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    with _local_digests_lock:
+        _local_digests[key] = digest
+    return digest
+
+
+class FirmwareCache:
+    """
+    Content-addressed store of firmware images on an RTE. Images are kept in
+    a directory on the RTE, named after their SHA-256 digest, so an image
+    which was uploaded already is only checked with `sha256sum` on the RTE
+    instead of being transferred again. The least recently used images are
+    removed to keep at most `size` of them.
+    """
+
+    # Age after which a partial upload is considered abandoned
+    STALE_PART_MINUTES = 60
+
+    def __init__(self, ssh, directory, size):
+        """
+        Initializes the cache.
+
+        Args:
+            ssh (RTESSH): The SSH connection to the RTE.
+            directory (str): Directory of the images on the RTE.
+            size (int): Maximum number of images kept.
+        """
+        self.ssh = ssh
+        self.directory = directory
+        self.size = size
+
+    def image_path(self, digest):
+        return f"{self.directory}/{digest}.rom"
+
+    def upload(self, local_path, remote_path):
+        """
+        Makes a local image available at a path on the RTE, uploading it
+        only if it is not in the cache yet. `remote_path` is a symbolic link
+        to the cached image afterwards.
+
+        Args:
+            local_path (str): Path of the image.
+            remote_path (str): Path the image is expected at on the RTE.
+
+        Returns:
+            bool: True if the image was in the cache, False if it was
+                uploaded.
+
+        Raises:
+            RuntimeError: If the image could not be stored on the RTE.
+        """
+        digest = file_sha256(local_path)
+        image = shlex.quote(self.image_path(digest))
+        link = f"ln -sf {image} {shlex.quote(remote_path)}"
+
+        # Mark the image as recently used, and link it, if it is valid
+        rc, output = self.ssh.run(
+            f"sha256sum {image} && touch {image} && {link}"
+        )
+        if rc == 0 and output.split()[:1] == [digest]:
+            return True
+
+        directory = shlex.quote(self.directory)
+        # Other processes may upload to the same RTE at the same time, the
+        # partial upload has a name of its own
+        partial_path = (
+            f"{self.directory}/{digest}.{os.getpid()}."
+            f"{secrets.token_hex(4)}.part"
+        )
+        partial = shlex.quote(partial_path)
+        # Make room first: the RTE storage is small. Only partial uploads
+        # left behind by processes which died long ago are removed.
+        rc, output = self.ssh.run(
+            f"mkdir -p {directory} && cd {directory} && "
+            f"find . -name '*.part' -mmin +{self.STALE_PART_MINUTES} "
+            f"-exec rm -f {{}} \\; && {self._evict_command(self.size - 1)}"
+        )
+        if rc != 0:
+            raise RuntimeError(f"Failed to prepare the image cache: {output}")
+
+        try:
+            self.ssh.sftp().put(local_path, partial_path)
+        except Exception:
+            self.ssh.run(f"rm -f {partial}")
+            raise
+        rc, output = self.ssh.run(
+            f'[ "$(sha256sum {partial} | cut -d " " -f 1)" = "{digest}" ] '
+            f"&& mv {partial} {image} && {link}"
+        )
+        if rc != 0:
+            self.ssh.run(f"rm -f {partial}")
+            raise RuntimeError(
+                f"Firmware image corrupted during the upload: {output}"
+            )
+        return False
+
+    def _evict_command(self, keep):
+        """
+        Returns a shell command removing all but the `keep` most recently
+        used images from the current directory.
+        """
+        return (
+            f"ls -t *.rom 2>/dev/null | tail -n +{max(keep, 0) + 1} | "
+            f'while read -r image; do rm -f "$image"; done'
+        )
@@ -0,0 +1,138 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class JSONObjectStream:
+    """
+    Incremental parser of a JSON object holding a large array, such as a
+    Snipe-IT collection page (`{"total": ..., "rows": [...]}`).
+
+    The elements of the array are decoded and yielded one by one, as the
+    response body arrives, so only one of them is held in memory at a time.
+    The other members of the object are decoded as a whole and collected in
+    `members`.
+    """
+
+    def __init__(self, chunks, array_key="rows"):
+        """
+        Initializes the parser.
+
+        Args:
+            chunks (iterable): Pieces of the UTF-8 encoded document, e.g.
+                `response.iter_content(chunk_size)`.
+            array_key (str): Name of the member holding the array to stream.
+        """
+        self.chunks = iter(chunks)
+        self.array_key = array_key
+        self.members = {}
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read(self):
+        """
+        Appends the next chunk to the buffer, dropping the parsed part.
+
+        Returns:
+            bool: False if the end of the document was reached.
+        """
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text_decoder.decode(b"", final=True)
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos :] + text
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """
+        Skips whitespace and returns the next character, "" at the end.
+        """
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in _WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._read():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def _expect(self, characters):
+        char = self._peek()
+        if not char or char not in characters:
+            raise JSONStreamError(
+                f"Expected one of {characters!r}, got {char or 'end'!r}"
+            )
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """
+        Decodes the next complete JSON value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Most likely cut in the middle, read on
+                if not self._read():
+                    raise JSONStreamError(str(e)) from e
+                continue
+            # A number is complete only once followed by a delimiter, the
+            # next chunk may continue it ("1" of "1.5")
+            if (
+                self.eof
+                or not isinstance(value, (int, float))
+                or isinstance(value, bool)
+                or (end < len(self.buffer) and self.buffer[end] in _DELIMITERS)
+            ):
+                self.pos = end
+                return value
+            self._read()
+
+    def __iter__(self):
+        """
+        Parses the document, yielding the elements of the streamed array.
+
+        Raises:
+            JSONStreamError: If the document is not a well-formed JSON object.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise JSONStreamError(f"Expected a member name, got {key!r}")
+            self._expect(":")
+            if key == self.array_key and self._peek() == "[":
+                self.pos += 1
+                yield from self._array()
+            else:
+                self.members[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _array(self):
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
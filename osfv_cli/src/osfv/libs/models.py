@@ -5,13 +5,38 @@ from pathlib import Path
 
 import yaml
 from importlib_resources import files
-from voluptuous import Any, Optional, Required, Schema
+from osfv.libs.timings import DEFAULT_TIMINGS
+from voluptuous import All, Any, Invalid, Optional, Range, Required, Schema
 
 
 class Models:
     def __init__(self):
         pass
 
+    @staticmethod
+    def ordered_limits(step):
+        """
+        Returns a validator checking that the timing limits of a step, merged
+        with the default ones, have `min` not greater than `max`.
+
+        Args:
+            step (str): Step name, see `osfv.libs.timings.DEFAULT_TIMINGS`.
+
+        Returns:
+            callable: The validator.
+        """
+
+        def validate(limits):
+            merged = dict(DEFAULT_TIMINGS[step], **limits)
+            if merged["min"] > merged["max"]:
+                raise Invalid(
+                    f"min ({merged['min']}) is greater than max "
+                    f"({merged['max']})"
+                )
+            return limits
+
+        return validate
+
     def list_models(self):
         print(f"Supported DUT models:")
         file_path = os.path.join(files("osfv"), "models")
@@ -61,6 +86,17 @@ class Models:
         )
         flashing_power_state_validator = Any("G3", "S5")
         pwr_led_validator = Any("active low", "active high")
+        seconds_validator = All(Any(int, float), Range(min=0))
+        timings_validator = {
+            Optional(step): All(
+                {
+                    Optional("min"): seconds_validator,
+                    Optional("max"): seconds_validator,
+                },
+                self.ordered_limits(step),
+            )
+            for step in DEFAULT_TIMINGS
+        }
 
         schema = Schema(
             {
@@ -87,6 +123,7 @@ class Models:
                 Optional("pwr_led"): {
                     Required("polarity"): pwr_led_validator,
                 },
+                Optional("timings"): timings_validator,
                 Optional("reset_cmos", default=False): bool,
                 Optional("disable_wp", default=False): bool,
             }
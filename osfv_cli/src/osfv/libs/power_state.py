@@ -0,0 +1,166 @@
+import time
+from collections import deque
+
+# ACPI power states of a DUT, as far as the RTE can tell them apart:
+#   G3 - main power supply disconnected
+#   S5 - power supply connected, platform off
+#   S0 - power supply connected, platform running
+POWER_STATES = ("G3", "S5", "S0")
+
+# Transitions between the power states: (from, to) mapped to the name of the
+# PowerStateMachine method performing it. The DUT is always shut down before
+# the power supply is disconnected.
+TRANSITIONS = {
+    ("G3", "S5"): "connect_psu",
+    ("S0", "S5"): "force_off",
+    ("S5", "S0"): "push_power",
+    ("S5", "G3"): "disconnect_psu",
+}
+
+# Transitions whose resulting state is not certain, e.g. some platforms boot
+# as soon as the power supply is connected. The state is read again after
+# them.
+UNCERTAIN_TRANSITIONS = {"connect_psu"}
+
+
+def shortest_path(current, target):
+    """
+    Finds the shortest sequence of transitions between two power states.
+
+    Args:
+        current (str): Current power state.
+        target (str): Requested power state.
+
+    Returns:
+        list: (from, to) pairs of the transitions, empty if the DUT is in
+            the target state already.
+
+    Raises:
+        ValueError: If the target state can not be reached.
+    """
+    previous = {current: None}
+    queue = deque([current])
+    while queue:
+        state = queue.popleft()
+        if state == target:
+            break
+        for source, destination in TRANSITIONS:
+            if source == state and destination not in previous:
+                previous[destination] = state
+                queue.append(destination)
+    if target not in previous:
+        raise ValueError(f"Power state {target} can not be reached")
+
+    path = []
+    state = target
+    while previous[state] is not None:
+        path.insert(0, (previous[state], state))
+        state = previous[state]
+    return path
+
+
+class PowerStateMachine:
+    """
+    Moves a DUT between the G3, S5 and S0 power states using its RTE,
+    through the shortest path of transitions from its current state. The
+    current state is read from the PSU state (relay or Sonoff) and the
+    power LED with a single GPIO snapshot, then kept up to date by the
+    transitions.
+    """
+
+    def __init__(self, rte):
+        """
+        Initializes the state machine.
+
+        Args:
+            rte (RTE): The RTE of the DUT.
+        """
+        self.rte = rte
+        self.state = None
+
+    def read_state(self):
+        """
+        Reads the current power state of the DUT. Without a power LED
+        defined in the model config, a DUT with the power supply connected is
+        assumed to be running.
+
+        Returns:
+            str: The power state.
+        """
+        pwr_led_known = "pwr_led" in self.rte.dut_data
+        snapshot = None
+        if pwr_led_known or self.rte.dut_data["pwr_ctrl"]["relay"] is True:
+            snapshot = self.rte.gpio_snapshot()
+        psu_state = self.rte.psu_get(snapshot)
+        if psu_state == self.rte.PSU_STATE_OFF:
+            self.state = "G3"
+        elif pwr_led_known and self.rte.pwr_led_get(snapshot) == "low":
+            self.state = "S5"
+        else:
+            self.state = "S0"
+        return self.state
+
+    def current_state(self):
+        """
+        Returns the current power state, read from the RTE if not known.
+
+        Returns:
+            str: The power state.
+        """
+        if self.state is None:
+            return self.read_state()
+        return self.state
+
+    def go_to(self, target):
+        """
+        Moves the DUT to a power state, skipping the transitions which are
+        not needed. Every transition is printed with its duration.
+
+        Args:
+            target (str): The requested power state, see `POWER_STATES`.
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError: If the target state is not supported.
+            RuntimeError: If the target state was not reached.
+        """
+        if target not in POWER_STATES:
+            raise ValueError(f"Unsupported power state: {target}")
+
+        # Every state is reachable in at most 3 transitions, more means a
+        # transition does not have the expected effect
+        for _ in range(2 * len(POWER_STATES)):
+            current = self.current_state()
+            if current == target:
+                print(f"Power state: {current}")
+                return
+            source, destination = shortest_path(current, target)[0]
+            action = TRANSITIONS[(source, destination)]
+            start = time.monotonic()
+            getattr(self, action)()
+            elapsed = time.monotonic() - start
+            print(
+                f"Power state: {source} -> {destination} ({action}) took "
+                f"{elapsed:.1f} s"
+            )
+            self.state = (
+                None if action in UNCERTAIN_TRANSITIONS else destination
+            )
+        raise RuntimeError(f"Failed to reach power state {target}")
+
+    def connect_psu(self):
+        self.rte.psu_on()
+
+    def force_off(self):
+        # Holding the power button forces the platform off
+        self.rte.power_off(6)
+        self.rte.wait_step("s5_entry", self.rte.pwr_led_off_condition())
+
+    def push_power(self):
+        self.rte.power_on()
+
+    def disconnect_psu(self):
+        self.rte.psu_off()
+        self.rte.discharge_psu()
@@ -0,0 +1,185 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class RateLimitScheduler:
+    """
+    Token bucket pacing the requests sent to a rate-limited API.
+
+    All threads of a process talking to the same API share one scheduler (see
+    `shared()`), and call `acquire()` before every request. The bucket is
+    sized from the `X-RateLimit-Limit` header, and its content is brought
+    down to `X-RateLimit-Remaining` after every response. The server counts
+    the requests of all clients using the same API token, so parallel
+    processes are paced as well. After a 429 response, nothing is sent until
+    the `Retry-After` delay (plus a random jitter, so that the waiting
+    clients do not all retry at once) has passed.
+    """
+
+    # Snipe-IT limits API requests per minute
+    WINDOW = 60
+    # Fraction of the Retry-After delay added at random
+    JITTER = 0.5
+    DEFAULT_RETRY_AFTER = 1
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, limit=None):
+        """
+        Initializes the scheduler.
+
+        Args:
+            limit (int, optional): Requests allowed per minute. If not given,
+                requests are not paced until the server reports its limit.
+        """
+        self.cond = threading.Condition()
+        self.limit = None
+        self.rate = None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.fixed_limit = limit
+        if limit:
+            self._set_limit(limit)
+
+    @classmethod
+    def shared(cls, key, limit=None):
+        """
+        Returns the scheduler shared by all clients of an API.
+
+        Args:
+            key (str): API identifier, e.g. its base URL.
+            limit (int, optional): Requests allowed per minute, see
+                `__init__()`.
+
+        Returns:
+            RateLimitScheduler: The scheduler for the given key.
+        """
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(limit)
+            return cls._shared[key]
+
+    def _set_limit(self, limit):
+        if limit == self.limit:
+            return
+        if self.limit is None:
+            self.tokens = float(limit)
+        self.limit = limit
+        self.rate = limit / self.WINDOW
+        self.tokens = min(self.tokens, float(limit))
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(
+                float(self.limit),
+                self.tokens + (now - self.updated) * self.rate,
+            )
+        self.updated = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+
+        Returns:
+            None.
+        """
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                self.cond.wait(wait)
+
+    def update(self, headers):
+        """
+        Adjusts the pace to the rate limit headers of a response.
+
+        Args:
+            headers (Mapping): Response headers.
+
+        Returns:
+            None.
+        """
+        limit = self._int_header(headers, "X-RateLimit-Limit")
+        remaining = self._int_header(headers, "X-RateLimit-Remaining")
+        with self.cond:
+            self._refill(time.monotonic())
+            if limit and not self.fixed_limit:
+                self._set_limit(limit)
+            if remaining is not None and self.rate is not None:
+                self.tokens = min(self.tokens, float(remaining))
+
+    def backoff(self, headers, attempt=0):
+        """
+        Pauses all requests after a 429 response.
+
+        Args:
+            headers (Mapping): Headers of the 429 response.
+            attempt (int): Number of rate-limited attempts of the request so
+                far, used to back off further if the server gives no delay.
+
+        Returns:
+            float: The pause in seconds.
+        """
+        delay = self.parse_retry_after(headers)
+        if delay is None:
+            delay = self.DEFAULT_RETRY_AFTER * 2**attempt
+        delay += random.uniform(0, max(delay, 1) * self.JITTER)
+        with self.cond:
+            self._refill(time.monotonic())
+            self.tokens = 0.0
+            self.paused_until = max(
+                self.paused_until, time.monotonic() + delay
+            )
+            self.cond.notify_all()
+        return delay
+
+    @staticmethod
+    def parse_retry_after(headers):
+        """
+        Reads the delay requested by the server.
+
+        Args:
+            headers (Mapping): Response headers.
+
+        Returns:
+            float or None: Delay in seconds from `Retry-After` (seconds or
+            HTTP date) or `X-RateLimit-Reset` (epoch time), None if neither is
+            present.
+        """
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                date = parsedate_to_datetime(retry_after)
+                now = datetime.now(timezone.utc)
+                return max(0.0, (date - now).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+        reset = RateLimitScheduler._int_header(headers, "X-RateLimit-Reset")
+        if reset is not None:
+            return max(0.0, reset - time.time())
+        return None
+
+    @staticmethod
+    def _int_header(headers, name):
+        try:
+            return int(headers.get(name))
+        except (TypeError, ValueError):
+            return None
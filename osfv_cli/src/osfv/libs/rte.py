@@ -2,12 +2,15 @@ import os
 import sys
 import time
 
-import paramiko
 import requests
 import yaml
 from importlib_resources import files
+from osfv.libs import rte_ssh
+from osfv.libs.fw_cache import FirmwareCache
 from osfv.libs.models import Models
+from osfv.libs.power_state import PowerStateMachine
 from osfv.libs.rtectrl_api import rtectrl
+from osfv.libs.timings import TimingProfile, load_timings, wait_until
 from voluptuous import Any, Optional, Required, Schema
 
 
@@ -29,7 +32,10 @@ class RTE(rtectrl):
 
     SSH_USER = "root"
     SSH_PWD = "meta-rte"
+    SSH_PORT = 22
     FW_PATH_WRITE = "/data/write.rom"
+    FW_CACHE_DIR = "/data/fw_cache"
+    FW_CACHE_SIZE = 4
     FW_PATH_READ = "/tmp/read.rom"
 
     PROGRAMMER_RTE = "linux_spi:dev=/dev/spidev1.0,spispeed=16000"
@@ -39,11 +45,13 @@ class RTE(rtectrl):
     FLASHROM_LAYOUT_PATH = "/tmp/board_layout.txt"
 
     def __init__(self, rte_ip, dut_model, sonoff):
+        super().__init__(rte_ip)
         self.models = Models()
-        self.rte_ip = rte_ip
         self.dut_model = dut_model
         self.dut_data = self.models.load_model_data(self.dut_model)[1]
         self.sonoff = sonoff
+        self.timings = load_timings(self.dut_data)
+        self.timing_profile = TimingProfile(self.dut_model, self.rte_ip)
         if not self.sonoff_sanity_check():
             raise SonoffNotFound(
                 exit(
@@ -97,15 +105,21 @@ class RTE(rtectrl):
         self.gpio_set(self.GPIO_RESET, "low", sleep)
         time.sleep(sleep)
 
-    def relay_get(self):
+    def relay_get(self, snapshot=None):
         """
         Retrieves the current state of the relay.
 
+        Args:
+            snapshot (dict, optional): GPIO states returned by
+                `gpio_snapshot()`. A new snapshot is taken if not given.
+
         Returns:
             str: The state of the relay, either "on" if the GPIO relay pin is
                  "high", or "off" if the GPIO relay pin is "low".
         """
-        gpio_state = self.gpio_get(self.GPIO_RELAY)
+        if snapshot is None:
+            snapshot = self.gpio_snapshot()
+        gpio_state = snapshot[self.GPIO_RELAY]
         relay_state = None
         if gpio_state == "high":
             relay_state = self.PSU_STATE_ON
@@ -167,12 +181,14 @@ class RTE(rtectrl):
         else:
             raise SPIWrongVoltage
 
+        # Reading the GPIOs back does not tell whether the SPI voltage has
+        # settled, only flashrom detecting the chip does
         self.gpio_set(self.GPIO_SPI_VOLTAGE, state)
-        time.sleep(2)
+        self.wait_step("spi_voltage")
         self.gpio_set(self.GPIO_SPI_VCC, "low")
-        time.sleep(2)
+        self.wait_step("spi_vcc")
         self.gpio_set(self.GPIO_SPI_ON, "low")
-        time.sleep(10)
+        self.wait_step("spi_on", self.flash_chip_detected)
 
     def spi_disable(self):
         """
@@ -208,7 +224,7 @@ class RTE(rtectrl):
             state = self.relay_get()
             if state != self.PSU_STATE_ON:
                 raise Exception("Failed to power control ON")
-        time.sleep(5)
+        self.wait_step("psu_on")
 
     def psu_off(self):
         """
@@ -232,14 +248,16 @@ class RTE(rtectrl):
             state = self.relay_get()
             if state != self.PSU_STATE_OFF:
                 raise Exception("Failed to power control OFF")
-        time.sleep(2)
+        self.wait_step("psu_off")
 
-    def psu_get(self):
+    def psu_get(self, snapshot=None):
         """
         Get the current state of the Power Supply Unit (PSU).
 
         Args:
-            None.
+            snapshot (dict, optional): GPIO states returned by
+                `gpio_snapshot()`, used if the PSU is controlled by the
+                relay. A new snapshot is taken if not given.
 
         Returns:
             str or None: The state of the PSU, which could be "ON", "OFF"
@@ -249,13 +267,38 @@ class RTE(rtectrl):
         if self.dut_data["pwr_ctrl"]["sonoff"] is True:
             state = self.sonoff.get_state()
         elif self.dut_data["pwr_ctrl"]["relay"] is True:
-            state = self.relay_get()
+            state = self.relay_get(snapshot)
+        return state
+
+    def pwr_led_get(self, snapshot=None):
+        """
+        Get the state of the DUT power LED, taking the LED polarity defined
+        in the model config into account.
+
+        Args:
+            snapshot (dict, optional): GPIO states returned by
+                `gpio_snapshot()`. A new snapshot is taken if not given.
+
+        Returns:
+            str: "high" if the LED is on, "low" otherwise.
+        """
+        if snapshot is None:
+            snapshot = self.gpio_snapshot()
+        state = snapshot[self.GPIO_PWR_LED]
+        polarity = self.dut_data.get("pwr_led", {}).get("polarity")
+        if polarity and polarity == "active low":
+            if state == "high":
+                state = "low"
+            else:
+                state = "high"
         return state
 
     def discharge_psu(self):
         """
-        Push power button 5 times in the loop to make sure
-        the charge from PSU is dissipated.
+        Push the power button repeatedly to make sure the charge from PSU is
+        dissipated. The button is pushed for 3 seconds at a time, until the
+        minimum time of the "discharge" step has passed (5 times by default),
+        as the charge left can not be observed.
 
         Args:
             None.
@@ -263,13 +306,93 @@ class RTE(rtectrl):
         Returns:
             None.
         """
-        for _ in range(5):
+        limits = self.timings["discharge"]
+        start = time.monotonic()
+        while True:
             self.power_off(3)
+            elapsed = time.monotonic() - start
+            if elapsed >= limits["min"]:
+                break
+        self.timing_profile.record("discharge", elapsed, True, limits)
+
+    def pwr_led_off_condition(self):
+        """
+        Returns a condition checking that the power LED is off, for
+        `wait_step()`.
+
+        Returns:
+            callable or None: The condition, or None if the power LED is not
+                defined in the model config, as its state is then unknown.
+        """
+        if "pwr_led" not in self.dut_data:
+            return None
+        return lambda: self.pwr_led_get() == "low"
+
+    def wait_step(self, step, condition=None):
+        """
+        Waits for a step of a power or SPI sequence to complete, within the
+        minimum and maximum time defined for it (see
+        `osfv.libs.timings.DEFAULT_TIMINGS` and the `timings` section of the
+        model config), and records its duration in the timing profile.
+
+        Args:
+            step (str): Step name.
+            condition (callable, optional): Returns True once the step is
+                complete. Without a condition, the maximum time is waited.
+
+        Returns:
+            bool: False if the condition did not hold in time.
+        """
+        satisfied, elapsed = self._timed_wait(step, condition)
+        if not satisfied:
+            print(
+                f"Step '{step}' did not complete in "
+                f"{self.timings[step]['max']} s, continuing"
+            )
+        return satisfied
+
+    def wait_for_pwr_led(self, state):
+        """
+        Waits for the power LED to reach a state, within the maximum time
+        of the "pwr_led_on" or "pwr_led_off" step (see `wait_step()`). The LED
+        is sampled every 100 ms at first, then less and less often, up to
+        once a second, and the wait time is recorded in the timing profile.
+
+        Args:
+            state (str): "high" to wait for the LED to turn on, "low" to
+                wait for it to turn off.
+
+        Returns:
+            float or None: Time in seconds until the LED was seen in the
+                requested state, or None if it did not reach it in time.
+        """
+        step = "pwr_led_on" if state == "high" else "pwr_led_off"
+        satisfied, elapsed = self._timed_wait(
+            step,
+            lambda: self.pwr_led_get() == state,
+            interval=0.1,
+            max_interval=1,
+        )
+        return elapsed if satisfied else None
+
+    def _timed_wait(self, step, condition, interval=0.25, max_interval=2):
+        limits = self.timings[step]
+        satisfied, elapsed = wait_until(
+            condition,
+            limits["min"],
+            limits["max"],
+            interval=interval,
+            max_interval=max_interval,
+        )
+        self.timing_profile.record(step, elapsed, satisfied, limits)
+        return satisfied, elapsed
 
     def pwr_ctrl_before_flash(self, programmer, power_state):
         """
         Move the DUT into specific power state required for external flashing
-        operation. Defined in the model config file.
+        operation. Defined in the model config file. Only the transitions
+        needed from the current power state are made, see
+        `osfv.libs.power_state`.
 
         Args:
             programmer (str): The programmer type, used to determine if SPI lines need to be enabled.
@@ -278,33 +401,22 @@ class RTE(rtectrl):
         Returns:
             None.
         """
-        # Always start from the same state (PSU active)
-        self.psu_on()
-        time.sleep(5)
-        # Put the device into S5 state
-        self.power_off(6)
-        time.sleep(10)
+        if power_state not in ("S5", "G3"):
+            exit(
+                f"Power state: '{power_state}' is not supported. Please check "
+                f"model config."
+            )
 
+        power = PowerStateMachine(self)
         # Some platforms need to enable SPI lines at this point
         # when PSU is active (e.g. VP6650). Otherwise the chip is not detected.
-        # So we must turn the PSU ON first in the middle of power cycle,
-        # even if we perform flashing with the PSU OFF (G3).
+        # So we must go through S5 first, even if we perform flashing with
+        # the PSU OFF (G3).
         if programmer == "rte_1_1":
+            power.go_to("S5")
             self.spi_enable()
-            time.sleep(3)
-
-        if power_state == "S5":
-            # Nothing to do, we just entered the S5 state
-            pass
-        elif power_state == "G3":
-            # Turn off the PSU/AC brick to put device into G3
-            self.psu_off()
-            self.discharge_psu()
-        else:
-            exit(
-                f"Power state: '{power_state}' is not supported. Please check "
-                f"model config."
-            )
+
+        power.go_to(power_state)
 
     def pwr_ctrl_after_flash(self, programmer):
         """
@@ -348,6 +460,67 @@ class RTE(rtectrl):
 
         return temp_file.name
 
+    @property
+    def ssh(self):
+        """
+        The SSH connection to the RTE, shared by all the flash operations
+        on it (see `osfv.libs.rte_ssh`).
+        """
+        return rte_ssh.connection(
+            self.rte_ip, self.SSH_USER, self.SSH_PWD, self.SSH_PORT
+        )
+
+    def flashrom_programmer(self):
+        """
+        Returns the flashrom programmer parameter of the DUT model.
+
+        Returns:
+            str: The value of the flashrom `-p` option.
+        """
+        if self.dut_data["programmer"]["name"] == "ch341a":
+            return self.PROGRAMMER_CH341A
+        elif self.dut_data["programmer"]["name"] == "dediprog":
+            return self.PROGRAMMER_DEDIPROG
+        return self.PROGRAMMER_RTE
+
+    def flash_chip_detected(self):
+        """
+        Checks over SSH whether flashrom detects the flash chip, without
+        reading it. Used to tell when the SPI lines are ready.
+
+        Returns:
+            bool: True if flashrom found the flash chip.
+        """
+        command = self.FLASHROM_CMD.format(
+            programmer=self.flashrom_programmer(),
+            args=self.flash_create_args(),
+        )
+        rc, _ = self.ssh.run(command)
+        return rc == 0
+
+    def upload_firmware(self, write_file):
+        """
+        Makes the firmware file available on the RTE at `FW_PATH_WRITE`.
+        The file is uploaded only if the same image is not in the image cache
+        on the RTE yet (see `osfv.libs.fw_cache`). If the cache can not be
+        used, the file is uploaded directly.
+
+        Args:
+            write_file (str): Path to the firmware file.
+
+        Returns:
+            None.
+        """
+        cache = FirmwareCache(self.ssh, self.FW_CACHE_DIR, self.FW_CACHE_SIZE)
+        try:
+            if cache.upload(write_file, self.FW_PATH_WRITE):
+                print("Firmware image found on the RTE, skipping the upload")
+            return
+        except (RuntimeError, OSError) as e:
+            print(f"Failed to use the firmware image cache: {e}")
+        self.ssh.run(f"rm -f {self.FW_PATH_WRITE}")
+        self.ssh.sftp().put(write_file, self.FW_PATH_WRITE)
+
     def flash_cmd(self, args, read_file=None, write_file=None):
         """
         Send the firmware file to RTE and execute flashrom command over SSH to flash the DUT.
@@ -369,93 +542,70 @@ class RTE(rtectrl):
             print(f"Failed to change power state while flashing: {e}")
             raise SystemExit
 
-        # Create SSH client
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # The connection is kept open for the next operations
+        ssh = self.ssh
 
         try:
-            # Connect to the SSH server
-            ssh.connect(
-                self.rte_ip,
-                username=self.SSH_USER,
-                password=self.SSH_PWD,
-                look_for_keys=False,
-            )
-
-            scp = ssh.open_sftp()
-
             # Transfer layout file if needed (only for write operations)
             layout_data = self.dut_data.get("flash_chip", {}).get("layout")
             if layout_data and write_file:
                 local_layout_path = self.create_layout_file()
                 remote_layout_path = self.FLASHROM_LAYOUT_PATH
-                scp.put(local_layout_path, remote_layout_path)
+                ssh.sftp().put(local_layout_path, remote_layout_path)
                 print(f"Layout file transferred to {remote_layout_path}")
                 os.remove(local_layout_path)
 
             # Transfer firmware file if provided
             if write_file:
-                scp.put(write_file, self.FW_PATH_WRITE)
-
-            scp.close()
+                self.upload_firmware(write_file)
 
             # Execute the flashrom command
-            if self.dut_data["programmer"]["name"] == "ch341a":
-                flashrom_programmer = self.PROGRAMMER_CH341A
-            elif self.dut_data["programmer"]["name"] == "dediprog":
-                flashrom_programmer = self.PROGRAMMER_DEDIPROG
-            else:
-                flashrom_programmer = self.PROGRAMMER_RTE
-
             command = self.FLASHROM_CMD.format(
-                programmer=flashrom_programmer, args=args
+                programmer=self.flashrom_programmer(), args=args
             )
             print(f"Executing command: {command}")
-            channel = ssh.get_transport().open_session()
-            channel.exec_command(command)
-
-            # Print the command output in real-time
-            while True:
-                # Sleep 100ms to prevent high CPU usage.
-                time.sleep(100 / 1000)
-
-                if channel.exit_status_ready():
-                    break
-                if channel.recv_ready():
+            # Closed even on errors, the connection is shared by the next
+            # operations
+            with ssh.open_session() as channel:
+                channel.exec_command(command)
+
+                # Print the command output in real-time
+                while True:
+                    # Sleep 100ms to prevent high CPU usage.
+                    time.sleep(100 / 1000)
+
+                    if channel.exit_status_ready():
+                        break
+                    if channel.recv_ready():
+                        stdout = channel.recv(1024).decode()
+                        if stdout:
+                            print(stdout, end="")
+
+                    if channel.recv_stderr_ready():
+                        stderr = channel.recv_stderr(1024).decode()
+                        if stderr:
+                            print(stderr, end="", file=sys.stderr)
+
+                # Ensure all remaining output is captured after the loop exits
+                while channel.recv_ready():
                     stdout = channel.recv(1024).decode()
                     if stdout:
                         print(stdout, end="")
 
-                if channel.recv_stderr_ready():
+                while channel.recv_stderr_ready():
                     stderr = channel.recv_stderr(1024).decode()
                     if stderr:
                         print(stderr, end="", file=sys.stderr)
 
-            # Ensure all remaining output is captured after the loop exits
-            while channel.recv_ready():
-                stdout = channel.recv(1024).decode()
-                if stdout:
-                    print(stdout, end="")
-
-            while channel.recv_stderr_ready():
-                stderr = channel.recv_stderr(1024).decode()
-                if stderr:
-                    print(stderr, end="", file=sys.stderr)
-
-            # Get the return code from flashrom process
-            flashrom_rc = channel.recv_exit_status()
+                # Get the return code from flashrom process
+                flashrom_rc = channel.recv_exit_status()
 
             if read_file:
-                scp = ssh.open_sftp()
-                scp.get(self.FW_PATH_READ, read_file)
-                scp.close()
+                ssh.sftp().get(self.FW_PATH_READ, read_file)
 
         finally:
             self.pwr_ctrl_after_flash(self.dut_data["programmer"]["name"])
 
-            # Close the SSH connection
-            ssh.close()
-
         return flashrom_rc
 
     def flash_create_args(self, extra_args=""):
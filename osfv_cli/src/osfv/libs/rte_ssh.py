@@ -0,0 +1,206 @@
+import atexit
+import socket
+import threading
+
+import paramiko
+
+
+class RTESSH:
+    """
+    A persistent SSH connection to an RTE. One authenticated transport is
+    kept open and shared by the exec and SFTP channels of all the flash
+    operations, so only the first one pays for the SSH handshake. The
+    connection is opened again if it was dropped.
+
+    Use `connection()` to get the shared connection of an RTE.
+    """
+
+    PORT = 22
+    KEEPALIVE = 30
+
+    def __init__(self, host, username, password, port=None):
+        """
+        Initializes the connection, without connecting yet.
+
+        Args:
+            host (str): IP address of the RTE.
+            username (str): SSH user name.
+            password (str): SSH password.
+            port (int, optional): SSH port. Defaults to 22.
+        """
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port or self.PORT
+        self.lock = threading.RLock()
+        self.client = None
+        self._sftp = None
+        self.connects = 0
+
+    def is_active(self):
+        """
+        Checks whether the connection is open.
+
+        Returns:
+            bool: True if the SSH transport is active.
+        """
+        if self.client is None:
+            return False
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def connect(self):
+        """
+        Opens the connection, closing the previous one if any.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.close()
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(
+                self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                look_for_keys=False,
+                allow_agent=False,
+            )
+            transport = client.get_transport()
+            transport.set_keepalive(self.KEEPALIVE)
+            # Commands and SFTP requests are small round trips, do not let
+            # them wait for the ACK of the previous packet
+            transport.sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+            )
+            self.client = client
+            self.connects += 1
+
+    def transport(self):
+        """
+        Returns the SSH transport, connecting first if needed.
+
+        Returns:
+            paramiko.Transport: The active transport.
+        """
+        with self.lock:
+            if not self.is_active():
+                self.connect()
+            return self.client.get_transport()
+
+    def open_session(self):
+        """
+        Opens a new exec channel. If the connection turns out to be broken,
+        it is opened again once.
+
+        Returns:
+            paramiko.Channel: The channel.
+        """
+        with self.lock:
+            try:
+                return self.transport().open_session()
+            except (paramiko.SSHException, EOFError, OSError):
+                self.connect()
+                return self.transport().open_session()
+
+    def sftp(self):
+        """
+        Returns the SFTP client of the connection, opened on first use and
+        kept for the next operations.
+
+        Returns:
+            paramiko.SFTPClient: The SFTP client.
+        """
+        with self.lock:
+            if self._sftp is not None and self.is_active():
+                if not self._sftp.get_channel().closed:
+                    return self._sftp
+            try:
+                self._sftp = paramiko.SFTPClient.from_transport(
+                    self.transport()
+                )
+            except (paramiko.SSHException, EOFError, OSError):
+                self.connect()
+                self._sftp = paramiko.SFTPClient.from_transport(
+                    self.transport()
+                )
+            return self._sftp
+
+    def run(self, command):
+        """
+        Runs a command on the RTE and waits for it to exit.
+
+        Args:
+            command (str): The command line.
+
+        Returns:
+            tuple: The exit status of the command, and its standard output
+                and standard error combined.
+        """
+        channel = self.open_session()
+        try:
+            channel.set_combine_stderr(True)
+            channel.exec_command(command)
+            output = channel.makefile("rb").read().decode(errors="replace")
+            rc = channel.recv_exit_status()
+        finally:
+            channel.close()
+        return rc, output
+
+    def close(self):
+        """
+        Closes the connection.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self._sftp is not None:
+                self._sftp.close()
+                self._sftp = None
+            if self.client is not None:
+                self.client.close()
+                self.client = None
+
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def connection(host, username, password, port=None):
+    """
+    Returns the shared SSH connection to an RTE, creating it on first use.
+    The connections are kept for the lifetime of the process.
+
+    Args:
+        host (str): IP address of the RTE.
+        username (str): SSH user name.
+        password (str): SSH password.
+        port (int, optional): SSH port. Defaults to 22.
+
+    Returns:
+        RTESSH: The connection.
+    """
+    key = (host, port or RTESSH.PORT, username)
+    with _connections_lock:
+        ssh = _connections.get(key)
+        if ssh is None or ssh.password != password:
+            ssh = RTESSH(host, username, password, port)
+            _connections[key] = ssh
+        return ssh
+
+
+@atexit.register
+def close_all():
+    """
+    Closes all the shared SSH connections.
+
+    Returns:
+        None
+    """
+    with _connections_lock:
+        for ssh in _connections.values():
+            ssh.close()
+        _connections.clear()
@@ -1,7 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
 from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
 
-BASE_URL_TEMPLATE = "http://{rte_ip}:8000/api/v1"
+BASE_URL_TEMPLATE = "http://{rte_ip}:{port}/api/v1"
 
 headers = {"Content-Type": "application/json", "Accept": "application/json"}
 
@@ -11,14 +13,27 @@ class rtectrl:
     A class to control and interact with GPIO pins on an RTE device
     using its REST API.
 
+    All requests to an RTE go through one keep-alive session, so that
+    sequences of GPIO operations reuse a single connection. GET requests,
+    which are idempotent, are retried on connection errors and server
+    errors; PATCH requests are not, as e.g. a button press must not be
+    repeated.
+
     Attributes:
         GPIO_MIN (int): Minimum valid GPIO number (0).
         GPIO_MAX (int): Maximum valid GPIO number (19).
+        API_PORT (int): Port of the RTE REST API (8000).
+        TIMEOUT (tuple): Connect and read timeouts of the requests, in
+            seconds.
     """
 
     GPIO_MIN = 0
     GPIO_MAX = 19
 
+    API_PORT = 8000
+    TIMEOUT = (5, 30)
+    GET_RETRIES = 3
+
     def __init__(self, rte_ip):
         """
         Initializes the `rtectrl` instance.
@@ -26,8 +41,49 @@ class rtectrl:
         Args:
             rte_ip (str): IP address of the RTE device.
         """
-        self.rte_ip
         self.rte_ip = rte_ip
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        The HTTP session of the RTE, created on first use.
+        """
+        # Subclasses may not call __init__()
+        if getattr(self, "_session", None) is None:
+            self._session = self._init_session()
+        return self._session
+
+    def _init_session(self):
+        session = requests.Session()
+        session.headers.update(headers)
+        retries = Retry(
+            total=self.GET_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=4)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """
+        Closes the connections to the RTE.
+
+        Returns:
+            None
+        """
+        if getattr(self, "_session", None) is not None:
+            self._session.close()
+            self._session = None
+
+    def _url(self, endpoint):
+        base_url = BASE_URL_TEMPLATE.format(
+            rte_ip=self.rte_ip, port=self.API_PORT
+        )
+        return f"{base_url}{endpoint}"
 
     def gpio_list(self):
         """
@@ -56,11 +112,43 @@ class rtectrl:
         if not self.GPIO_MIN <= gpio_no <= self.GPIO_MAX:
             raise GPIOWrongNumberError("Wrong GPIO number")
 
+        state = self._get_request(f"/gpio/{gpio_no}").json()["state"]
+        return self._decode_state(gpio_no, state)
+
+    def gpio_snapshot(self):
+        """
+        Retrieves the states of all GPIO pins with a single request.
+
+        Returns:
+            dict: GPIO pin numbers mapped to their states, as returned by
+                `gpio_get()`.
+        """
+        snapshot = {}
+        for index, gpio in enumerate(self.gpio_list()):
+            gpio_no = int(gpio.get("id", index))
+            if self.GPIO_MIN <= gpio_no <= self.GPIO_MAX:
+                snapshot[gpio_no] = self._decode_state(gpio_no, gpio["state"])
+        return snapshot
+
+    @staticmethod
+    def _decode_state(gpio_no, state):
+        """
+        Translates the raw state of a GPIO pin reported by the API into
+        its logical state.
+
+        Args:
+            gpio_no (int): GPIO pin number.
+            state (int): Raw state of the GPIO pin.
+
+        Returns:
+            str: For pins 1-12: "low" or "high-z". For pins 0, 13-19:
+                "high" or "low".
+        """
         # GPIOS:
         #   0 - relay (regular GPIO)
         #   1 - 12 - OC GPIOs
         #   13 - 19 - regular GPIOs
-        state = self._get_request(f"/gpio/{gpio_no}").json()["state"] % 2
+        state = int(state) % 2
         if 1 <= gpio_no <= 12:
             if state == 1:
                 state_str = "low"
@@ -139,10 +227,11 @@ class rtectrl:
             Response: The HTTP response object.
 
         Raises:
-            HTTPError: If the response contains an HTTP error status code.
+            HTTPError: If the response contains an HTTP error status code,
+                after retrying server errors.
+            Timeout: If the RTE did not answer in time, after retrying.
         """
-        url = BASE_URL_TEMPLATE.format(rte_ip=self.rte_ip)
-        response = requests.get(f"{url}{endpoint}", headers=headers)
+        response = self.session.get(self._url(endpoint), timeout=self.TIMEOUT)
         response.raise_for_status()
         return response
 
@@ -160,10 +249,10 @@ class rtectrl:
 
         Raises:
             HTTPError: If the response contains an HTTP error status code.
+            Timeout: If the RTE did not answer in time.
         """
-        url = BASE_URL_TEMPLATE.format(rte_ip=self.rte_ip)
-        response = requests.patch(
-            f"{url}{endpoint}", json=data, headers=headers
+        response = self.session.patch(
+            self._url(endpoint), json=data, timeout=self.TIMEOUT
         )
         response.raise_for_status()
         return response
@@ -1,12 +1,24 @@
 import os
+import random
 import secrets
 import string
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import requests
 import unidecode
 import yaml
+from osfv.libs import snipeit_daemon
+from osfv.libs.json_stream import JSONObjectStream, JSONStreamError
+from osfv.libs.rate_limit import RateLimitScheduler
+from osfv.libs.snipeit_asset import AssetRecord
+from osfv.libs.snipeit_cache import AssetSnapshotCache
+from osfv.libs.snipeit_daemon import AssetCacheClient, CacheDaemonError
+from osfv.libs.snipeit_index import AssetIPIndex
+from osfv.libs.ttl_cache import DiskTTLCache, TTLCache
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
@@ -33,18 +45,85 @@ class SnipeIT:
         def __str__(self):
             return self.message
 
-    def __init__(self):
+    class SnipeITStreamError(Exception):
+        def __init__(self, response):
+            # the error response, as returned by _request()
+            self.response = response
+            super().__init__(str(response))
+
+    def __init__(self, use_cache_daemon=True):
+        """
+        Initializes the client from the Snipe-IT configuration file.
+
+        Args:
+            use_cache_daemon (bool): Whether to use the asset cache daemon
+                when it is running, see `snipeit_daemon.AssetCacheDaemon`.
+        """
         snipeit_cfg = self.load_snipeit_config()
         self.cfg_api_url = snipeit_cfg["url"]
         self.cfg_api_token = snipeit_cfg["token"]
         self.cfg_user_id = snipeit_cfg["user_id"]
+        self.cfg_max_workers = snipeit_cfg["max_workers"]
+        self.cfg_reference_ttl = snipeit_cfg["reference_ttl"]
         self.headers = {
             "Accept": "application/json",
             "Authorization": f"Bearer {self.cfg_api_token}",
         }
         self.session = self._init_session()
+        self.rate_limiter = RateLimitScheduler.shared(
+            self.cfg_api_url, snipeit_cfg["rate_limit"]
+        )
         self.all_assets = None
-        self.assets_cache = {}
+        self.ip_index = None
+        self.sync_state = None
+        self.synced_at = None
+        # Guards the asset store, which may be shared by worker threads
+        self.store_lock = threading.RLock()
+        self.snapshot_save_deferred = 0
+        self.snapshot_dirty = False
+        self.snapshot_cache = None
+        if snipeit_cfg["cache_enabled"]:
+            self.snapshot_cache = AssetSnapshotCache(
+                self.cfg_api_url,
+                snipeit_cfg["cache_dir"],
+                snipeit_cfg["cache_ttl"],
+            )
+        self.asset_cache_positive_ttl = snipeit_cfg["asset_ttl"]
+        self.asset_cache_negative_ttl = snipeit_cfg["asset_negative_ttl"]
+        if snipeit_cfg["asset_backend"] == "disk":
+            self.assets_cache = DiskTTLCache(
+                self.snapshot_cache.entries_dir,
+                snipeit_cfg["asset_cache_size"],
+                json_default=AssetRecord.json_default,
+            )
+        else:
+            self.assets_cache = TTLCache(snipeit_cfg["asset_cache_size"])
+        self.cache_daemon = None
+        if self.snapshot_cache and use_cache_daemon:
+            client = AssetCacheClient(self.snapshot_cache.socket_path)
+            if client.is_available():
+                self.cache_daemon = client
+
+    ASSETS_PAGE_SIZE = 500
+    SYNC_PAGE_SIZE = 50
+    DEFAULT_MAX_WORKERS = 4
+    RATE_LIMIT_RETRIES = 10
+    STREAM_CHUNK_SIZE = 64 * 1024
+    REFERENCE_PAGE_SIZE = 500
+    DEFAULT_REFERENCE_TTL = 600
+    ASSET_CACHE_BACKENDS = ("memory", "disk")
+    DEFAULT_ASSET_TTL = 300
+    DEFAULT_ASSET_NEGATIVE_TTL = 30
+    DEFAULT_ASSET_CACHE_SIZE = 1024
+
+    # Collection name: (key field, description)
+    REFERENCE_COLLECTIONS = {
+        "companies": ("name", "companies"),
+        "groups": ("name", "user groups"),
+        "users": ("username", "users"),
+    }
+    # Reference data indexed by name, shared by all clients of the process
+    reference_cache = TTLCache(maxsize=16)
 
     SNIPEIT_CONFIG_FILE_PATH = os.getenv(
         "SNIPEIT_CONFIG_FILE_PATH", os.path.expanduser("~/.osfv/snipeit.yml")
@@ -59,7 +138,11 @@ class SnipeIT:
             allowed_methods=["GET"],
             raise_on_status=False,
         )
-        adapter = HTTPAdapter(max_retries=retries)
+        # One pooled connection per worker, so page fetches do not queue
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_maxsize=max(self.cfg_max_workers, 10),
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
@@ -74,9 +157,14 @@ class SnipeIT:
         headers=None,
         max_retries=3,
         timeout=10,
+        stream=False,
     ):
         delay = 2
-        for attempt in range(max_retries):
+        attempt = 0
+        rate_limited = 0
+        while attempt < max_retries:
+            # Paces the requests of all threads, see RateLimitScheduler
+            self.rate_limiter.acquire()
             try:
                 response = self.session.request(
                     method=method,
@@ -86,7 +174,22 @@ class SnipeIT:
                     data=data,
                     json=json,
                     timeout=timeout,
+                    stream=stream,
                 )
+                self.rate_limiter.update(response.headers)
+
+                if (
+                    response.status_code == 429
+                    and rate_limited < self.RATE_LIMIT_RETRIES
+                ):
+                    # Rate limited requests do not count as failed attempts
+                    self.rate_limiter.backoff(response.headers, rate_limited)
+                    rate_limited += 1
+                    continue
+
+                if stream and response.status_code == 200:
+                    # The body is parsed by the caller, see _iter_pages()
+                    return True, response
 
                 response_json = response.json()
 
@@ -99,10 +202,11 @@ class SnipeIT:
                     return False, response_json
 
             except requests.exceptions.Timeout:
+                attempt += 1
                 print(
-                    f"[Timeout] {method.upper()} {url} — retrying in {delay}s (attempt {attempt + 1}/{max_retries})"
+                    f"[Timeout] {method.upper()} {url} — retrying in {delay}s (attempt {attempt}/{max_retries})"
                 )
-                time.sleep(delay)
+                time.sleep(delay + random.uniform(0, delay / 2))
                 delay *= 2
 
             except requests.exceptions.RequestException as e:
@@ -134,6 +238,19 @@ class SnipeIT:
             - "url" (str): The API base URL.
             - "token" (str): The API authentication token.
             - "user_id" (int): The user ID.
+            - "max_workers" (int): Maximum number of concurrent requests.
+            - "rate_limit" (int or None): Requests allowed per minute.
+            - "cache_enabled" (bool): Whether the on-disk asset snapshot is used.
+            - "cache_dir" (str or None): Directory of the asset snapshot.
+            - "cache_ttl" (int or None): Asset snapshot lifetime in seconds.
+            - "reference_ttl" (int): Lifetime of the cached companies, groups
+              and users in seconds, 0 if they are not cached.
+            - "asset_backend" (str): Where `get_asset()` results are cached,
+              "memory" or "disk".
+            - "asset_ttl" (int): Lifetime of a cached asset in seconds.
+            - "asset_negative_ttl" (int): Lifetime of a cached failed asset
+              request in seconds.
+            - "asset_cache_size" (int): Maximum number of cached assets.
 
         Raises:
             FileNotFoundError: If the configuration file is not found.
@@ -163,14 +280,81 @@ class SnipeIT:
                 f'{cfg["user_id"]}'
             )
 
+        cfg["max_workers"] = config.get(
+            "max_workers", self.DEFAULT_MAX_WORKERS
+        )
+        if not isinstance(cfg["max_workers"], int) or cfg["max_workers"] < 1:
+            raise ValueError(
+                f"max_workers in the YAML file should be a positive int: "
+                f'{cfg["max_workers"]}'
+            )
+
+        cfg["rate_limit"] = config.get("rate_limit")
+        if cfg["rate_limit"] is not None and (
+            not isinstance(cfg["rate_limit"], int) or cfg["rate_limit"] < 1
+        ):
+            raise ValueError(
+                f"rate_limit in the YAML file should be a positive int: "
+                f'{cfg["rate_limit"]}'
+            )
+
+        cache_cfg = config.get("cache") or {}
+        if not isinstance(cache_cfg, dict):
+            raise ValueError("Cache configuration in the YAML file is invalid")
+        cfg["cache_enabled"] = cache_cfg.get("enabled", True)
+        cfg["cache_dir"] = cache_cfg.get("dir")
+        cfg["cache_ttl"] = cache_cfg.get("snapshot_ttl")
+        if cfg["cache_ttl"] is not None and not isinstance(
+            cfg["cache_ttl"], int
+        ):
+            raise ValueError(
+                f"Cache snapshot_ttl in the YAML file should be int: "
+                f'{cfg["cache_ttl"]}'
+            )
+        cfg["reference_ttl"] = cache_cfg.get(
+            "reference_ttl", self.DEFAULT_REFERENCE_TTL
+        )
+        if not cfg["cache_enabled"]:
+            cfg["reference_ttl"] = 0
+        if not isinstance(cfg["reference_ttl"], int):
+            raise ValueError(
+                f"Cache reference_ttl in the YAML file should be int: "
+                f'{cfg["reference_ttl"]}'
+            )
+
+        cfg["asset_backend"] = cache_cfg.get("asset_backend", "memory")
+        if cfg["asset_backend"] not in self.ASSET_CACHE_BACKENDS:
+            raise ValueError(
+                f"Cache asset_backend in the YAML file should be one of "
+                f"{', '.join(self.ASSET_CACHE_BACKENDS)}: "
+                f'{cfg["asset_backend"]}'
+            )
+        if not cfg["cache_enabled"]:
+            # Assets are still cached for the lifetime of the process
+            cfg["asset_backend"] = "memory"
+        for key, default in (
+            ("asset_ttl", self.DEFAULT_ASSET_TTL),
+            ("asset_negative_ttl", self.DEFAULT_ASSET_NEGATIVE_TTL),
+            ("asset_cache_size", self.DEFAULT_ASSET_CACHE_SIZE),
+        ):
+            cfg[key] = cache_cfg.get(key, default)
+            if not isinstance(cfg[key], int) or cfg[key] < 0:
+                raise ValueError(
+                    f"Cache {key} in the YAML file should be a non-negative "
+                    f"int: {cfg[key]}"
+                )
+
         return cfg
 
     def get_all_assets(self):
         """
         Retrieves all hardware assets from the Snipe-IT API.
 
-        This method makes paginated requests to the Snipe-IT API to fetch all available hardware assets.
-        It continues requesting data until all pages have been retrieved.
+        The assets are kept in a local asset store, persisted as an on-disk
+        snapshot. A fresh snapshot is used as is, a stale one is brought up
+        to date with `sync_assets()`. Only when there is no usable snapshot,
+        this method makes paginated requests to the Snipe-IT API to fetch all
+        available hardware assets.
 
         Args:
             None.
@@ -180,85 +364,532 @@ class SnipeIT:
         """
         if self.all_assets is not None:
             return self.all_assets
-        page = 1
-        all_assets = []
+
+        with self.store_lock:
+            if self.all_assets is not None:
+                return self.all_assets
+
+            result = self._daemon_assets()
+            if result is not None:
+                self._set_asset_store(*result)
+                return self.all_assets
+
+            snapshot = None
+            if self.snapshot_cache:
+                snapshot = self.snapshot_cache.load()
+
+            if snapshot is None:
+                self._fetch_all_assets()
+            else:
+                self._set_asset_store(
+                    snapshot["assets"],
+                    snapshot["fingerprint"],
+                    snapshot["fetched_at"],
+                )
+                if not self.snapshot_cache.is_fresh(snapshot):
+                    self.sync_assets()
+            return self.all_assets
+
+    def sync_assets(self):
+        """
+        Brings the local asset store up to date with the server.
+
+        Only the assets changed since the last sync are requested: the
+        `/hardware` endpoint is paged sorted by `updated_at`, newest first,
+        until the first already-known record older than the last sync. The
+        changes are merged into the store in place. If the number of assets
+        does not match the server afterwards (e.g. an asset was deleted), the
+        whole inventory is fetched again.
+
+        Args:
+            None.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        with self.store_lock:
+            success, _ = self._daemon_call("sync", requested_at=time.time())
+            if success:
+                self.all_assets = None
+                return self.get_all_assets()
+
+            if self.all_assets is None:
+                return self.get_all_assets()
+            if self.sync_state is None:
+                return self._fetch_all_assets()
+
+            in_sync = self._merge_changes()
+            if in_sync is False:
+                return self._fetch_all_assets()
+            if in_sync:
+                self.synced_at = time.time()
+                self._save_snapshot()
+            return self.all_assets
+
+    def ensure_fresh_assets(self):
+        """
+        Syncs the asset store if it was loaded and is older than the snapshot
+        TTL. Used by long-lived clients, which would otherwise keep answering
+        from the store they loaded first.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        if self.all_assets is None:
+            return
+        ttl = AssetSnapshotCache.DEFAULT_TTL
+        if self.snapshot_cache:
+            ttl = self.snapshot_cache.ttl
+        if time.time() - (self.synced_at or 0) >= ttl:
+            self.sync_assets()
+
+    def get_ip_index(self):
+        """
+        Returns the IP index built over the current asset snapshot.
+
+        Returns:
+            AssetIPIndex: Index of the IP-type custom fields of all assets.
+        """
+        if self.all_assets is None and self.cache_daemon:
+            return snipeit_daemon.RemoteAssetIPIndex(
+                self.cache_daemon, self._get_local_ip_index
+            )
+        self.get_all_assets()
+        return self.ip_index
+
+    def _get_local_ip_index(self):
+        # The cache daemon went away, continue with the local asset store
+        self.cache_daemon = None
+        return self.get_ip_index()
+
+    def get_unassigned_assets(self):
+        """
+        Retrieves the hardware assets which are not checked out.
+
+        If the asset store is not loaded, the cache daemon filters its own
+        store, so that only the unassigned assets are transferred.
+
+        Args:
+            None.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        if self.all_assets is None:
+            result = self._daemon_assets(unassigned=True)
+            if result is not None:
+                return result[0]
+        return [
+            asset
+            for asset in self.get_all_assets()
+            if asset["assigned_to"] is None
+        ]
+
+    def _daemon_assets(self, **filters):
+        """
+        Pages through the asset store of the cache daemon, if it is in use.
+
+        Args:
+            **filters: Filters of the "assets" request, see
+                `AssetCacheDaemon.assets_page()`.
+
+        Returns:
+            tuple or None: (assets, sync state, sync time) of the daemon
+                store, None if the daemon is not in use.
+        """
+        assets = []
+        sync_state = None
+        while True:
+            success, data = self._daemon_call(
+                "assets", offset=len(assets), **filters
+            )
+            if not success:
+                return None
+            if assets and data["sync_state"] != sync_state:
+                # Synced between two pages, the offsets no longer apply
+                assets = []
+                continue
+            assets.extend(data["rows"])
+            sync_state = data["sync_state"]
+            if not data["more"]:
+                return assets, sync_state, data["synced_at"]
+
+    def _daemon_call(self, op, **kwargs):
+        """
+        Sends a request to the asset cache daemon, if it is in use.
+
+        On failure, the daemon is not used any more by this client.
+
+        Args:
+            op (str): Request name, see `AssetCacheDaemon`.
+            **kwargs: Request arguments.
+
+        Returns:
+            success status with the result of the request.
+        """
+        cache_daemon = self.cache_daemon
+        if cache_daemon is None:
+            return False, None
+        try:
+            return True, cache_daemon.call(op, **kwargs)
+        except (OSError, CacheDaemonError) as e:
+            print(f"Asset cache daemon failed, using local cache: {e}")
+            self.cache_daemon = None
+            return False, None
+
+    def _set_asset_store(self, assets, sync_state, synced_at):
+        # Long-lived processes keep the store, hold it in compact records
+        assets = [AssetRecord.from_asset(asset) for asset in assets]
+        self.all_assets = assets
+        self.ip_index = AssetIPIndex(assets)
+        self.sync_state = sync_state
+        self.synced_at = synced_at
+
+    def _store_asset(self, asset_data):
+        """
+        Replaces or appends a single asset in the local asset store.
+
+        Args:
+            asset_data (dict): The asset, as returned by the server.
+
+        Returns:
+            None.
+        """
+        asset_data = AssetRecord.from_asset(asset_data)
+        position = self.ip_index.positions.get(asset_data["id"])
+        old_asset = None
+        if position is None:
+            self.all_assets.append(asset_data)
+        else:
+            old_asset = self.all_assets[position]
+            self.all_assets[position] = asset_data
+        self.ip_index.update(old_asset, asset_data)
+
+    def _get_stored_asset(self, asset_id):
+        """
+        Looks up an asset in the local asset store, if it is loaded.
+
+        Args:
+            asset_id (int): The unique identifier of the asset.
+
+        Returns:
+            dict or None: The asset, or None if it is not in the store.
+        """
+        with self.store_lock:
+            if self.all_assets is None:
+                return None
+            position = self.ip_index.positions.get(asset_id)
+            if position is None:
+                return None
+            return self.all_assets[position]
+
+    @contextmanager
+    def deferred_snapshot_save(self):
+        """
+        Defers writing the on-disk asset snapshot until the end of the block.
+
+        Bulk operations refresh many assets one by one. Within this block the
+        snapshot is written once at the end instead of after every asset.
+
+        Returns:
+            A context manager.
+        """
+        with self.store_lock:
+            self.snapshot_save_deferred += 1
+        try:
+            yield
+        finally:
+            with self.store_lock:
+                self.snapshot_save_deferred -= 1
+                if not self.snapshot_save_deferred and self.snapshot_dirty:
+                    self._save_snapshot()
+
+    def _save_snapshot(self):
+        if self.cache_daemon:
+            # The daemon owns the on-disk snapshot
+            return
+        if self.snapshot_save_deferred:
+            self.snapshot_dirty = True
+            return
+        self.snapshot_dirty = False
+        if self.snapshot_cache and self.sync_state is not None:
+            self.snapshot_cache.save(
+                self.all_assets, self.sync_state, self.synced_at
+            )
+
+    def _merge_changes(self):
+        """
+        Merges the assets changed since the last sync into the store.
+
+        Returns:
+            bool or None: True if the store is in sync with the server, False
+            if a full fetch is needed, None if the request failed.
+        """
+        mark = self.sync_state.get("updated_at") or ""
+        newest = mark
+        offset = 0
 
         while True:
             success, data = self._request_get(
                 f"{self.cfg_api_url}/hardware",
-                params={"limit": 500, "offset": (page - 1) * 500},
+                params={
+                    "sort": "updated_at",
+                    "order": "desc",
+                    "limit": self.SYNC_PAGE_SIZE,
+                    "offset": offset,
+                },
             )
-            if success:
-                all_assets.extend(data["rows"])
-                if "total_pages" not in data or data["total_pages"] <= page:
-                    break
-                page += 1
-            else:
+            if not success:
                 print(f"Error retrieving assets: {data}")
+                return None
+
+            rows = data["rows"]
+            reached_known = False
+            for asset in rows:
+                updated_at = AssetSnapshotCache.get_updated_at(asset) or ""
+                # Timestamps have one second resolution, so assets updated
+                # in the same second as the last sync are compared as well
+                if updated_at < mark:
+                    reached_known = True
+                    break
+                newest = max(newest, updated_at)
+                self._store_asset(asset)
+
+            if reached_known or len(rows) < self.SYNC_PAGE_SIZE:
                 break
-        self.all_assets = all_assets
-        for asset in all_assets:
-            self.assets_cache[asset["id"]] = (success, asset)
-        return all_assets
+            offset += self.SYNC_PAGE_SIZE
+
+        if data.get("total") != len(self.all_assets):
+            return False
+        self.sync_state = {"total": data["total"], "updated_at": newest}
+        return True
+
+    def _fetch_fingerprint(self):
+        """
+        Retrieves the inventory fingerprint with a single one-row request.
 
-    def __retieve_custom_field_value(self, custom_fields, expected_field_name):
-        my_field = next(
-            (
-                field_data["value"]
-                for field_name, field_data in custom_fields.items()
-                if field_name == expected_field_name
-            ),
-            None,
+        Returns:
+            dict or None: The fingerprint, or None if the request failed.
+        """
+        success, data = self._request_get(
+            f"{self.cfg_api_url}/hardware",
+            params={"limit": 1, "sort": "updated_at", "order": "desc"},
         )
-        if my_field:
-            return my_field
-        else:
+        if not success or "total" not in data:
             return None
+        rows = data.get("rows") or [None]
+        return AssetSnapshotCache.make_fingerprint(data["total"], rows[0])
 
-    def __count_customField(
-        self, custom_fields, counts, field_name, expected_ip
-    ):
-        my_field = self.__retieve_custom_field_value(custom_fields, field_name)
-
-        if my_field:
-            if my_field == expected_ip:
-                counts[field_name] += 1
-                if counts[field_name] > 1:
-                    raise self.DuplicatedIpException(
-                        counts, field_name, expected_ip
-                    )
-        return None
+    def _fetch_all_assets(self):
+        """
+        Pages through the `/hardware` endpoint and replaces the local asset
+        store and its snapshot.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        # Taken before the fetch, so changes made during it are not missed
+        fingerprint = None
+        if self.snapshot_cache:
+            fingerprint = self._fetch_fingerprint()
+        fetched_at = time.time()
+
+        all_assets, error = self._get_all_pages(
+            f"{self.cfg_api_url}/hardware", self.ASSETS_PAGE_SIZE
+        )
+        if error:
+            print(f"Error retrieving assets: {error}")
+            fingerprint = None
+
+        self._set_asset_store(all_assets, fingerprint, fetched_at)
+        self._save_snapshot()
+        return all_assets
+
+    def _get_all_pages(self, url, page_size, params=None):
+        """
+        Retrieves all rows of a paginated Snipe-IT collection.
+
+        The first page tells the total number of rows. The remaining pages
+        are then fetched concurrently, by up to `max_workers` threads sharing
+        the pooled session, and merged in order.
+
+        Args:
+            url (str): URL of the collection endpoint.
+            page_size (int): Number of rows requested per page.
+            params (dict, optional): Additional query parameters.
+
+        Returns:
+            tuple:
+                list: Rows retrieved, in server order. Stops at the first
+                    failed page.
+                dict or None: The error response of the failed request, or
+                    None if all pages were retrieved successfully.
+        """
+        params = dict(params or {})
+
+        def get_page(offset):
+            return self._request_get(
+                url, params={**params, "limit": page_size, "offset": offset}
+            )
+
+        success, data = get_page(0)
+        if not success:
+            return [], data
+
+        rows = list(data["rows"])
+        total = data.get("total", len(rows))
+        offsets = range(page_size, total, page_size)
+        if not offsets:
+            return rows, None
+
+        with ThreadPoolExecutor(max_workers=self.cfg_max_workers) as pool:
+            pages = list(pool.map(get_page, offsets))
+
+        for success, data in pages:
+            if not success:
+                return rows, data
+            rows.extend(data["rows"])
+        return rows, None
+
+    def _iter_pages(self, url, page_size, params=None):
+        """
+        Yields all rows of a paginated Snipe-IT collection as they arrive.
+
+        Unlike `_get_all_pages()`, the pages are requested one after another
+        and each of them is parsed incrementally from the response body, so
+        that the first rows are available right away and only one row is held
+        in memory at a time.
+
+        Args:
+            url (str): URL of the collection endpoint.
+            page_size (int): Number of rows requested per page.
+            params (dict, optional): Additional query parameters.
+
+        Yields:
+            dict: Rows, in server order.
+
+        Raises:
+            SnipeITStreamError: If a page could not be retrieved or parsed.
+                Rows of the previous pages have been yielded already.
+        """
+        params = dict(params or {})
+        offset = 0
+        while True:
+            success, response = self._request_get(
+                url,
+                params={**params, "limit": page_size, "offset": offset},
+                stream=True,
+            )
+            if not success:
+                raise self.SnipeITStreamError(response)
+
+            page = JSONObjectStream(
+                response.iter_content(self.STREAM_CHUNK_SIZE)
+            )
+            count = 0
+            try:
+                for row in page:
+                    count += 1
+                    yield row
+            except (
+                JSONStreamError,
+                requests.exceptions.RequestException,
+            ) as e:
+                raise self.SnipeITStreamError({"error": str(e)}) from e
+            finally:
+                response.close()
+
+            if page.members.get("status") == "error":
+                raise self.SnipeITStreamError(page.members)
+            offset += count
+            total = page.members.get("total")
+            if count < page_size or (total is not None and offset >= total):
+                return
+
+    def iter_all_assets(self):
+        """
+        Yields all hardware assets, streamed from the Snipe-IT API.
+
+        Meant for one-off scans of the whole inventory. The local asset store
+        and its snapshot are neither used nor updated, see `_iter_pages()`.
+
+        Yields:
+            dict: Assets, in server order.
+
+        Raises:
+            SnipeITStreamError: If the assets could not be retrieved.
+        """
+        yield from self._iter_pages(
+            f"{self.cfg_api_url}/hardware", self.ASSETS_PAGE_SIZE
+        )
+
+    def _refresh_asset(self, asset_id):
+        """
+        Fetches a single asset from the server and patches every cached copy
+        of it, including the on-disk snapshot.
 
-    # check by selected IP-fields (continue until second occurrence of any)
+        Args:
+            asset_id (int): The unique identifier of the asset.
+
+        Returns:
+            success status with a response object from server.
+        """
+        status, asset_data = self._request_get(
+            f"{self.cfg_api_url}/hardware/{asset_id}"
+        )
+        if not status:
+            self.assets_cache.delete(asset_id)
+            return status, asset_data
+
+        with self.store_lock:
+            self.assets_cache.set(
+                asset_id, (status, asset_data), self.asset_cache_positive_ttl
+            )
+            self._daemon_call("store", asset=asset_data)
+            if (
+                self.all_assets is None
+                and self.snapshot_cache
+                and not self.cache_daemon
+            ):
+                snapshot = self.snapshot_cache.load()
+                if snapshot is not None:
+                    self._set_asset_store(
+                        snapshot["assets"],
+                        snapshot["fingerprint"],
+                        snapshot["fetched_at"],
+                    )
+            if self.all_assets is not None:
+                # The sync mark is left as is: changes of other assets made
+                # since the last sync must still be picked up by the next one
+                self._store_asset(asset_data)
+                self._save_snapshot()
+        return status, asset_data
+
+    # check by selected IP-fields (fail on second occurrence of any)
     def check_asset_for_ip_exclusivity(
         self, all_assets, ip=None, rte_ip=None, sonoff_ip=None, pikvm_ip=None
     ):
-        # all IP-containing data fields
-        occurence_counts = {
-            "IP": 0,
-            "RTE IP": 0,
-            "Sonoff IP": 0,
-            "PiKVM IP": 0,
-        }
-        for asset in all_assets:
-            custom_fields = asset.get("custom_fields", {})
-            if custom_fields:
-                if ip:
-                    self.__count_customField(
-                        custom_fields, occurence_counts, "IP", ip
-                    )
-                if rte_ip:
-                    self.__count_customField(
-                        custom_fields, occurence_counts, "RTE IP", rte_ip
-                    )
-                if sonoff_ip:
-                    self.__count_customField(
-                        custom_fields, occurence_counts, "Sonoff IP", sonoff_ip
-                    )
-                if pikvm_ip:
-                    self.__count_customField(
-                        custom_fields, occurence_counts, "PiKVM IP", pikvm_ip
-                    )
+        if all_assets is None or all_assets is self.all_assets:
+            index = self.get_ip_index()
+        else:
+            index = AssetIPIndex(all_assets)
+
+        duplicate = index.first_duplicate(
+            {
+                "IP": ip,
+                "RTE IP": rte_ip,
+                "Sonoff IP": sonoff_ip,
+                "PiKVM IP": pikvm_ip,
+            }
+        )
+        if duplicate:
+            field_name, expected_ip, count = duplicate
+            raise self.DuplicatedIpException(
+                {field_name: count}, field_name, expected_ip
+            )
         return None
 
     # check by asset ID, on any non-empty IP field
@@ -267,20 +898,12 @@ class SnipeIT:
         if not status:
             return None
 
-        custom_fields = asset_data.get("custom_fields", {})
-        if custom_fields:
-            ip = self.__retieve_custom_field_value(custom_fields, "IP")
-            rte_ip = self.__retieve_custom_field_value(custom_fields, "RTE IP")
-            sonoff_ip = self.__retieve_custom_field_value(
-                custom_fields, "Sonoff IP"
-            )
-            pikvm_ip = self.__retieve_custom_field_value(
-                custom_fields, "PiKVM IP"
-            )
-
-            self.check_asset_for_ip_exclusivity(
-                self.get_all_assets(), ip, rte_ip, sonoff_ip, pikvm_ip
-            )
+        ip_values = [
+            AssetIPIndex.field_value(asset_data, field)
+            for field in AssetIPIndex.IP_FIELDS
+        ]
+        if any(ip_values):
+            self.check_asset_for_ip_exclusivity(None, *ip_values)
         return None
 
     def get_asset_id_by_rte_ip(self, rte_ip):
@@ -288,10 +911,10 @@ class SnipeIT:
         Retrieves the asset ID associated with a given RTE IP.
 
         This method first checks for duplicate occurrences of the provided RTE IP among all assets.
-        Then, it searches for the asset that contains the specified RTE IP in its custom fields.
+        Then, it looks up the asset that contains the specified RTE IP in its custom fields.
         If a matching asset is found, it performs a secondary exclusivity check by asset ID before returning the asset's ID.
 
-        Aegs:
+        Args:
             rte_ip (str): The RTE IP address to search for.
 
         Returns:
@@ -300,38 +923,26 @@ class SnipeIT:
         Raises:
             DuplicatedIpException: If the RTE IP appears more than once across all assets.
         """
-        all_assets = self.get_all_assets()
+        index = self.get_ip_index()
         self.check_asset_for_ip_exclusivity(
-            all_assets, None, rte_ip, None, None
+            self.all_assets, None, rte_ip, None, None
         )
 
-        # Search for asset with matching RTE IP
-        for asset in all_assets:
-            custom_fields = asset.get("custom_fields", {})
-            if custom_fields:
-                rte_ip_field = next(
-                    (
-                        field_data["value"]
-                        for field_name, field_data in custom_fields.items()
-                        if field_name == "RTE IP"
-                    ),
-                    None,
-                )
-                if rte_ip_field == rte_ip:
-                    # re-run exclusivty check by asset ID
-                    self.check_asset_for_ip_exclusivity_by_id(asset["id"])
-                    return asset["id"]
+        for asset in index.find("RTE IP", rte_ip):
+            # re-run exclusivty check by asset ID
+            self.check_asset_for_ip_exclusivity_by_id(asset["id"])
+            return asset["id"]
 
         # No asset found with matching RTE IP
         return None
 
-    def get_asset_id_by_sonoff_ip(self, rte_ip):
+    def get_asset_id_by_sonoff_ip(self, sonoff_ip):
         """
         Retrieves the asset ID associated with a given Sonoff IP.
 
         Firstly, this method checks for duplicate occurrences of the
         provided Sonoff IP among all assets.
-        Then, it searches for the asset that contains the specified
+        Then, it looks up the asset that contains the specified
         Sonoff IP in its custom fields.
         If a matching asset is found, it performs a secondary exclusivity
         check by asset ID before returning the asset's ID.
@@ -345,83 +956,39 @@ class SnipeIT:
         Raises:
         DuplicatedIpException: If the Sonoff IP appears more than once across all assets.
         """
-        # Retrieve all assets with matching rte_ip.
-        all_assets = self.get_all_assets()
+        index = self.get_ip_index()
         self.check_asset_for_ip_exclusivity(
-            all_assets, None, None, rte_ip, None
+            self.all_assets, None, None, sonoff_ip, None
         )
 
-        # Search for asset with matching RTE IP
-        for asset in all_assets:
-            custom_fields = asset.get("custom_fields", {})
-            if custom_fields:
-                rte_ip_field = next(
-                    (
-                        field_data["value"]
-                        for field_name, field_data in custom_fields.items()
-                        if field_name == "Sonoff IP"
-                    ),
-                    None,
-                )
-                if rte_ip_field == rte_ip:
-                    # re-run exclusivty check by asset ID
-                    self.check_asset_for_ip_exclusivity_by_id(asset["id"])
-                    return asset["id"]
+        for asset in index.find("Sonoff IP", sonoff_ip):
+            # re-run exclusivty check by asset ID
+            self.check_asset_for_ip_exclusivity_by_id(asset["id"])
+            return asset["id"]
 
-        # No asset found with a specified RTE IP
+        # No asset found with a specified Sonoff IP
         return None
 
-    def get_sonoff_ip_by_rte_ip(self, rte_ip):
-        # Retrieve all assets with matching rte_ip.
-        all_assets = self.get_all_assets()
+    def _get_field_by_rte_ip(self, rte_ip, field_name):
+        index = self.get_ip_index()
         self.check_asset_for_ip_exclusivity(
-            all_assets, None, rte_ip, None, None
+            self.all_assets, None, rte_ip, None, None
         )
 
-        # Search for asset with matching RTE IP
-        for asset in all_assets:
-            custom_fields = asset.get("custom_fields", {})
-            if custom_fields:
-                rte_ip_field = next(
-                    (
-                        field_data["value"]
-                        for field_name, field_data in custom_fields.items()
-                        if field_name == "RTE IP"
-                    ),
-                    None,
-                )
-                if rte_ip_field == rte_ip:
-                    if custom_fields["Sonoff IP"]:
-                        return custom_fields["Sonoff IP"]["value"]
+        for asset in index.find("RTE IP", rte_ip):
+            # Read from the decoded IP fields of asset records
+            value = AssetIPIndex.field_value(asset, field_name)
+            if value:
+                return value
 
         # No asset found with matching RTE IP
         return None
 
-    def get_pikvm_ip_by_rte_ip(self, rte_ip):
-        # Retrieve all assets with matching rte_ip.
-        all_assets = self.get_all_assets()
-        self.check_asset_for_ip_exclusivity(
-            all_assets, None, rte_ip, None, None
-        )
-
-        # Search for asset with matching RTE IP
-        for asset in all_assets:
-            custom_fields = asset.get("custom_fields", {})
-            if custom_fields:
-                rte_ip_field = next(
-                    (
-                        field_data["value"]
-                        for field_name, field_data in custom_fields.items()
-                        if field_name == "RTE IP"
-                    ),
-                    None,
-                )
-                if rte_ip_field == rte_ip:
-                    if custom_fields["PiKVM IP"]:
-                        return custom_fields["PiKVM IP"]["value"]
+    def get_sonoff_ip_by_rte_ip(self, rte_ip):
+        return self._get_field_by_rte_ip(rte_ip, "Sonoff IP")
 
-        # No asset found with matching PiKVM IP
-        return None
+    def get_pikvm_ip_by_rte_ip(self, rte_ip):
+        return self._get_field_by_rte_ip(rte_ip, "PiKVM IP")
 
     def check_out_asset(self, asset_id):
         """
@@ -444,7 +1011,8 @@ class SnipeIT:
         """
         self.check_asset_for_ip_exclusivity_by_id(asset_id)
 
-        status, asset_data = self.get_asset(asset_id)
+        # Always decide on up-to-date assignment data, not on the snapshot
+        status, asset_data = self._refresh_asset(asset_id)
 
         if not status:
             return False, None, False
@@ -464,6 +1032,7 @@ class SnipeIT:
             f"{self.cfg_api_url}/hardware/{asset_id}/checkout",
             json=data,
         )
+        self._refresh_asset(asset_id)
         return success, response, False
 
     def check_in_asset(self, asset_id):
@@ -476,26 +1045,124 @@ class SnipeIT:
         Returns:
             success status with a response object from server.
         """
-        return self._request_post(
+        success, response = self._request_post(
             f"{self.cfg_api_url}/hardware/{asset_id}/checkin"
         )
+        self._refresh_asset(asset_id)
+        return success, response
+
+    def get_assets(self, status=None, category_id=None, search=None):
+        """
+        Retrieves hardware assets matching the given filters. The filtering
+        is done by the Snipe-IT server, so only matching rows are transferred.
+
+        Args:
+            status (str, optional): Status type, e.g. "Deployed" for assets
+                assigned to someone, or "RTD" for assets ready to deploy.
+            category_id (int, optional): ID of the asset category.
+            search (str, optional): Text searched for in asset fields,
+                including custom fields.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        params = {}
+        if status:
+            params["status"] = status
+        if category_id:
+            params["category_id"] = category_id
+        if search:
+            params["search"] = search
+
+        assets, error = self._get_all_pages(
+            f"{self.cfg_api_url}/hardware", self.ASSETS_PAGE_SIZE, params
+        )
+        if error:
+            print(f"Error retrieving assets: {error}")
+        return assets
+
+    def get_user_assets(self, user_id=None):
+        """
+        Retrieves hardware assets assigned to a user.
+
+        Args:
+            user_id (int, optional): The user ID. Defaults to the user from the
+                configuration file.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        if user_id is None:
+            user_id = self.cfg_user_id
+
+        assets, error = self._get_all_pages(
+            f"{self.cfg_api_url}/users/{user_id}/assets",
+            self.ASSETS_PAGE_SIZE,
+        )
+        if error:
+            print(f"Error retrieving assets of user {user_id}: {error}")
+        return assets
+
+    def get_assets_by_custom_field(self, field_name, value):
+        """
+        Retrieves hardware assets with a custom field set to the given value.
+
+        The server-side search narrows the result down to assets containing
+        the value in any field, exact matches on the requested custom field
+        are then selected from these few rows.
+
+        Args:
+            field_name (str): Name of the custom field, e.g. "RTE IP".
+            value (str): Expected value of the custom field.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        return [
+            asset
+            for asset in self.get_assets(search=value)
+            if AssetIPIndex.field_value(asset, field_name) == value
+        ]
 
     def get_asset(self, asset_id):
         """
         Retrieve asset information from a hardware configuration API by sending
         a GET request with a specified asset_id.
 
+        Assets in the local asset store are returned from there. Other
+        results are cached in `assets_cache` (memory or disk, see the `cache`
+        section of the configuration file) for `asset_ttl` seconds, failed
+        requests for `asset_negative_ttl` seconds. Check out and check in
+        update the cached copy of the asset.
+
         Args:
             asset_id (str): The unique identifier of the asset to be checked out.
 
         Returns:
             success status with a response object from server.
         """
-        if asset_id not in self.assets_cache:
-            self.assets_cache[asset_id] = self._request_get(
+        # The store is kept up to date by sync_assets(), prefer it
+        asset_data = self._get_stored_asset(asset_id)
+        if asset_data is not None:
+            return True, asset_data
+
+        hit, result = self.assets_cache.get(asset_id)
+        if hit:
+            return tuple(result)
+
+        success, asset_data = self._daemon_call("get_asset", id=asset_id)
+        if success and asset_data:
+            result = (True, asset_data)
+        else:
+            result = self._request_get(
                 f"{self.cfg_api_url}/hardware/{asset_id}"
             )
-        return self.assets_cache[asset_id]
+        if result[0]:
+            ttl = self.asset_cache_positive_ttl
+        else:
+            ttl = self.asset_cache_negative_ttl
+        self.assets_cache.set(asset_id, result, ttl)
+        return result
 
     def get_asset_model_name(self, asset_id):
         """
@@ -517,7 +1184,7 @@ class SnipeIT:
 
     def get_company_id(self, company_name):
         """
-        Retrieve the ID of a company by sending a GET request to fetch all companies from the API.
+        Retrieve the ID of a company by looking up its name in the cached companies.
 
         Args:
             company_name (str): The name of the company for which to retrieve the ID.
@@ -526,19 +1193,14 @@ class SnipeIT:
             str or None: The company ID if found, otherwise None if the company
             doesn't exist or if there was an error retrieving the data.
         """
-        success, data = self._request_get(f"{self.cfg_api_url}/companies")
-        if success:
-            for company in data["rows"]:
-                if company["name"] == company_name:
-                    return company["id"]
-            return None
-        else:
-            print(f"Error retrieving companies: {data}")
+        companies = self._get_reference("companies")
+        if company_name not in companies:
             return None
+        return companies[company_name]["id"]
 
     def get_group_id(self, group_name):
         """
-        Retrieve the ID of a user group by sending a GET request to fetch all groups from the API.
+        Retrieve the ID of a user group by looking up its name in the cached groups.
 
         Args:
             group_name (str): The name of the group for which to retrieve the ID.
@@ -547,15 +1209,10 @@ class SnipeIT:
             str or None: The group ID if found, otherwise None if the group doesn't exist
             or if there was an error retrieving the data.
         """
-        success, data = self._request_get(f"{self.cfg_api_url}/groups")
-        if success:
-            for group in data["rows"]:
-                if group["name"] == group_name:
-                    return group["id"]
-            return None
-        else:
-            print(f"Error retrieving user groups: {data}")
+        groups = self._get_reference("groups")
+        if group_name not in groups:
             return None
+        return groups[group_name]["id"]
 
     def generate_password(self, length=16):
         """
@@ -571,9 +1228,49 @@ class SnipeIT:
         password = "".join(secrets.choice(characters) for i in range(length))
         return password
 
+    def _get_reference(self, collection):
+        """
+        Retrieves a collection of reference data (companies, user groups or
+        users) indexed by name.
+
+        The whole collection is fetched with `_get_all_pages()` and kept in
+        `reference_cache` for `reference_ttl` seconds, so that the lookups of
+        all commands run by the process are answered from memory.
+
+        Args:
+            collection (str): One of `REFERENCE_COLLECTIONS`.
+
+        Returns:
+            dict: Rows of the collection by name (username for users). Empty
+                if the collection could not be retrieved.
+        """
+        key_field, description = self.REFERENCE_COLLECTIONS[collection]
+        cache_key = (self.cfg_api_url, collection)
+        hit, index = self.reference_cache.get(cache_key)
+        if hit:
+            return index
+
+        rows, error = self._get_all_pages(
+            f"{self.cfg_api_url}/{collection}", self.REFERENCE_PAGE_SIZE
+        )
+        if error:
+            print(f"Error retrieving {description}: {error}")
+            return {}
+
+        index = {row[key_field]: row for row in rows}
+        if self.cfg_reference_ttl > 0:
+            self.reference_cache.set(
+                cache_key, index, ttl=self.cfg_reference_ttl
+            )
+        return index
+
+    def _invalidate_reference(self, collection):
+        self.reference_cache.delete((self.cfg_api_url, collection))
+
     def get_users(self):
         """
-        Retrieve a list of users from the API, fetching results in paginated chunks of 50 users per request.
+        Retrieve a list of users from the API. The pages of the collection are
+        fetched concurrently, and the result is cached, see `_get_reference()`.
 
         Args:
             None.
@@ -581,28 +1278,11 @@ class SnipeIT:
         Returns:
             The list of all the users.
         """
-        page = 1
-        users = []
-
-        while True:
-            success, data = self._request_get(
-                f"{self.cfg_api_url}/users",
-                params={"limit": 50, "offset": (page - 1) * 50},
-            )
-            if success:
-                users.extend(data["rows"])
-                if "total" not in data or data["total"] <= page:
-                    break
-                page += 1
-            else:
-                print(f"Error retrieving users: {data}")
-                break
-
-            return users
+        return list(self._get_reference("users").values())
 
     def get_user_id(self, username):
         """
-        Retrieve the ID of a user by calling get_users() and searching for a user with the specified username.
+        Retrieve the ID of a user by looking up the specified username in the cached users.
 
         Args:
             username (str): The username of the user to search for.
@@ -610,12 +1290,10 @@ class SnipeIT:
         Returns:
             str or None: The user ID if the user is found, otherwise None if the user doesn't exist.
         """
-        users = self.get_users()
-        if users:
-            for user in users:
-                if user["username"] == username:
-                    return user["id"]
+        users = self._get_reference("users")
+        if username not in users:
             return None
+        return users[username]["id"]
 
     def user_add(self, first_name, last_name, company_name):
         """
@@ -639,12 +1317,9 @@ class SnipeIT:
         )
         password = self.generate_password()
 
-        users = self.get_users()
-        if users:
-            for user in users:
-                if user["username"] == username:
-                    print(f"User with username '{username}' already exists.")
-                    return
+        if self.get_user_id(username) is not None:
+            print(f"User with username '{username}' already exists.")
+            return
 
         group_id = self.get_group_id("Users")
         if group_id is None:
@@ -676,6 +1351,7 @@ class SnipeIT:
             json=data,
         )
         if success:
+            self._invalidate_reference("users")
             user_info = response["payload"]
             user_id = user_info["id"]
             print(f"User created successfully!")
@@ -713,6 +1389,7 @@ class SnipeIT:
             "DELETE", f"{self.cfg_api_url}/users/{user_id}"
         )
         if success:
+            self._invalidate_reference("users")
             print(f"User {username} deleted successfully!")
         else:
             print(f"Failed to delete user {username}: {response}")
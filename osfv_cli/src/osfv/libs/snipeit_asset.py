@@ -0,0 +1,124 @@
+import json
+
+from osfv.libs.snipeit_index import AssetIPIndex
+
+
+class AssetRecord:
+    """
+    Compact in-memory form of a Snipe-IT hardware asset.
+
+    Only the fields used for lookups are kept as attributes: ID, tag, name,
+    model name, assignee, last update time and the IP custom fields. The
+    full asset is kept as its compact JSON encoding, and decoded each time
+    another field is read (see `decode()`). A record can be read like the
+    asset dictionary it was made of, e.g. `record["id"]` or
+    `record["model"]["name"]`, so it can be passed wherever an asset
+    dictionary is expected.
+    """
+
+    __slots__ = (
+        "id",
+        "asset_tag",
+        "name",
+        "model_name",
+        "assigned_to",
+        "updated_at",
+        "ip_values",
+        "raw",
+    )
+
+    # Dictionary keys served from the attributes, without decoding
+    ATTRIBUTE_KEYS = ("id", "asset_tag", "name", "assigned_to")
+
+    def __init__(self, raw, asset=None):
+        """
+        Initializes the record.
+
+        Args:
+            raw (bytes): The asset encoded as JSON.
+            asset (dict, optional): The decoded asset, if already available.
+        """
+        if asset is None:
+            asset = json.loads(raw)
+        self.raw = raw
+        self.id = asset["id"]
+        self.asset_tag = asset.get("asset_tag")
+        self.name = asset.get("name")
+        self.model_name = (asset.get("model") or {}).get("name")
+        self.assigned_to = asset.get("assigned_to")
+        self.updated_at = (asset.get("updated_at") or {}).get("datetime")
+        self.ip_values = tuple(
+            AssetIPIndex.field_value(asset, field)
+            for field in AssetIPIndex.IP_FIELDS
+        )
+
+    @classmethod
+    def from_asset(cls, asset):
+        """
+        Creates a record from an asset dictionary.
+
+        Args:
+            asset (dict or AssetRecord): Asset as returned by the server. A
+                record is returned as is.
+
+        Returns:
+            AssetRecord: The record.
+        """
+        if isinstance(asset, cls):
+            return asset
+        raw = json.dumps(asset, separators=(",", ":")).encode()
+        return cls(raw, asset)
+
+    def to_dict(self):
+        """
+        Decodes the full asset.
+
+        Returns:
+            dict: A new asset dictionary, as returned by the server.
+        """
+        return json.loads(self.raw)
+
+    @classmethod
+    def decode(cls, asset):
+        """
+        Returns an asset as a dictionary. Code reading several fields which
+        are not attributes decodes the record once with it, instead of once
+        per field.
+
+        Args:
+            asset (dict or AssetRecord): Asset dictionary or record.
+
+        Returns:
+            dict: The asset dictionary, as is if it is not a record.
+        """
+        if isinstance(asset, cls):
+            return asset.to_dict()
+        return asset
+
+    def __getitem__(self, key):
+        if key in self.ATTRIBUTE_KEYS:
+            return getattr(self, key)
+        return self.to_dict()[key]
+
+    def get(self, key, default=None):
+        if key in self.ATTRIBUTE_KEYS:
+            return getattr(self, key)
+        return self.to_dict().get(key, default)
+
+    def __contains__(self, key):
+        return key in self.ATTRIBUTE_KEYS or key in self.to_dict()
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __repr__(self):
+        return f"AssetRecord(id={self.id!r}, name={self.name!r})"
+
+    @staticmethod
+    def json_default(value):
+        """
+        `default` hook for `json.dump()`, encoding records as dictionaries.
+        """
+        if isinstance(value, AssetRecord):
+            return value.to_dict()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from osfv.libs.snipeit_asset import AssetRecord
+
+
+class AssetSnapshotCache:
+    """
+    Persistent on-disk snapshot of the Snipe-IT hardware inventory.
+
+    The snapshot is shared by all osfv_cli invocations (and Robot suites) of
+    the same user, so back-to-back runs do not have to page through the whole
+    `/hardware` endpoint each time. A snapshot younger than `ttl` seconds is
+    used as is; an older one is brought up to date incrementally, starting
+    from its fingerprint (total count and the most recent `updated_at`).
+
+    The file holds a JSON header line followed by one asset per line, so the
+    assets are loaded as AssetRecord objects without encoding them again.
+    """
+
+    DEFAULT_DIR = os.path.expanduser("~/.osfv/cache")
+    DEFAULT_TTL = 300
+
+    def __init__(self, api_url, cache_dir=None, ttl=None):
+        """
+        Initializes the snapshot cache.
+
+        Args:
+            api_url (str): Snipe-IT API URL, used to keep snapshots of
+                different instances apart.
+            cache_dir (str, optional): Directory holding the snapshot files.
+                Defaults to ~/.osfv/cache.
+            ttl (int, optional): Number of seconds a snapshot is trusted
+                without syncing. Defaults to 300.
+        """
+        self.cache_dir = os.path.expanduser(cache_dir or self.DEFAULT_DIR)
+        self.ttl = self.DEFAULT_TTL if ttl is None else ttl
+        url_hash = hashlib.sha1(api_url.encode()).hexdigest()[:12]
+        self.path = os.path.join(self.cache_dir, f"assets-{url_hash}.jsonl")
+        # Socket of the asset cache daemon serving this snapshot
+        self.socket_path = os.path.join(
+            self.cache_dir, f"assets-{url_hash}.sock"
+        )
+        # Entries of the get_asset() disk cache, see DiskTTLCache
+        self.entries_dir = os.path.join(
+            self.cache_dir, f"asset-entries-{url_hash}"
+        )
+
+    def load(self):
+        """
+        Reads the snapshot from disk.
+
+        Returns:
+            dict or None: The snapshot with "fetched_at", "fingerprint" and
+            "assets" (a list of AssetRecord) keys, or None if there is no
+            usable snapshot.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                snapshot = json.loads(file.readline())
+                assets = [AssetRecord(line.rstrip(b"\n")) for line in file]
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("count") != len(
+            assets
+        ):
+            # Not a snapshot, or a truncated one
+            return None
+        snapshot["assets"] = assets
+        return snapshot
+
+    def is_fresh(self, snapshot):
+        """
+        Checks whether the snapshot can be used without syncing.
+
+        Args:
+            snapshot (dict): Snapshot returned by `load()`.
+
+        Returns:
+            bool: True if the snapshot is younger than the configured TTL.
+        """
+        return time.time() - snapshot.get("fetched_at", 0) < self.ttl
+
+    def save(self, assets, fingerprint, fetched_at=None):
+        """
+        Atomically writes a new snapshot to disk.
+
+        Args:
+            assets (list): List of asset dictionaries or AssetRecord objects.
+            fingerprint (dict): Inventory fingerprint, as returned by
+                `make_fingerprint()`.
+            fetched_at (float, optional): Snapshot creation time. Defaults to
+                the current time.
+
+        Returns:
+            None.
+        """
+        header = {
+            "fetched_at": fetched_at or time.time(),
+            "fingerprint": fingerprint,
+            "count": len(assets),
+        }
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(header).encode() + b"\n")
+                for asset in assets:
+                    file.write(AssetRecord.from_asset(asset).raw + b"\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # The cache is an optimization only, never fail the command
+            print(f"Failed to write Snipe-IT asset cache: {e}")
+
+    def invalidate(self):
+        """
+        Removes the snapshot from disk.
+
+        Returns:
+            None.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def make_fingerprint(total, latest_asset):
+        """
+        Builds an inventory fingerprint.
+
+        Args:
+            total (int): Number of assets reported by the server.
+            latest_asset (dict or None): The most recently updated asset.
+
+        Returns:
+            dict: Fingerprint comparable with `==`.
+        """
+        updated_at = None
+        if latest_asset:
+            updated_at = AssetSnapshotCache.get_updated_at(latest_asset)
+        return {"total": total, "updated_at": updated_at}
+
+    @staticmethod
+    def get_updated_at(asset):
+        """
+        Retrieves the last modification time of an asset.
+
+        Args:
+            asset (dict or AssetRecord): Asset dictionary or record.
+
+        Returns:
+            str or None: The `updated_at` timestamp, sortable as a string.
+        """
+        if isinstance(asset, AssetRecord):
+            return asset.updated_at
+        return (asset.get("updated_at") or {}).get("datetime")
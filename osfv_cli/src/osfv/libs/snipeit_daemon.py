@@ -0,0 +1,349 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+
+from osfv.libs.snipeit_asset import AssetRecord
+from osfv.libs.snipeit_index import AssetIPIndex
+
+# Assets sent in a single response to the "assets" request
+ASSETS_PAGE_SIZE = 500
+
+
+class CacheDaemonError(Exception):
+    pass
+
+
+class AssetCacheDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Local service holding one warm Snipe-IT asset store for all osfv_cli
+    processes and Robot suites of a user.
+
+    Clients talk to it over a Unix socket, one JSON request and one JSON
+    response per line (see `AssetCacheClient`). Lookups are answered from the
+    in-memory IP index. When the store is older than the snapshot TTL, it is
+    brought up to date before answering; concurrent refreshes are coalesced
+    into a single upstream sync, as they all wait for the same store lock.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, snipeit_api, socket_path):
+        """
+        Initializes the daemon.
+
+        Args:
+            snipeit_api (SnipeIT): Client used to fetch and sync the assets.
+                Must not use the daemon itself.
+            socket_path (str): Path of the Unix socket to listen on.
+        """
+        self.snipeit_api = snipeit_api
+        self.ttl = snipeit_api.snapshot_cache.ttl
+        os.makedirs(os.path.dirname(socket_path), mode=0o700, exist_ok=True)
+        super().__init__(socket_path, AssetCacheRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+    def ensure_fresh(self, requested_at=None):
+        """
+        Syncs the asset store if it is older than the TTL, or than the time a
+        refresh was requested at.
+
+        Args:
+            requested_at (float, optional): Time of an explicit refresh
+                request. Refreshes requested while a sync is running are
+                served by it.
+
+        Returns:
+            None.
+        """
+        api = self.snipeit_api
+        if api.all_assets is not None and self._is_fresh(requested_at):
+            return
+        with api.store_lock:
+            if api.all_assets is None:
+                api.get_all_assets()
+            elif not self._is_fresh(requested_at):
+                api.sync_assets()
+
+    def _is_fresh(self, requested_at):
+        synced_at = self.snipeit_api.synced_at or 0
+        if requested_at is not None:
+            return synced_at >= requested_at
+        return time.time() - synced_at < self.ttl
+
+    def status(self):
+        api = self.snipeit_api
+        return {
+            "assets": len(api.all_assets or []),
+            "sync_state": api.sync_state,
+            "synced_at": api.synced_at,
+        }
+
+    def assets_page(self, offset, limit, unassigned=False):
+        """
+        Returns a page of the stored assets.
+
+        Args:
+            offset (int): Index of the first asset of the page.
+            limit (int): Maximum number of assets in the page, capped at
+                `ASSETS_PAGE_SIZE`.
+            unassigned (bool): Only page through the assets not checked out.
+
+        Returns:
+            dict: The store status with the "rows" of the page, and "more"
+                set if there are assets past it.
+        """
+        api = self.snipeit_api
+        limit = min(limit, ASSETS_PAGE_SIZE)
+        with api.store_lock:
+            assets = api.all_assets
+            if unassigned:
+                assets = [
+                    asset for asset in assets if asset["assigned_to"] is None
+                ]
+            rows = assets[offset : offset + limit]
+            return dict(
+                self.status(), rows=rows, more=offset + limit < len(assets)
+            )
+
+    def handle_request_data(self, request):
+        """
+        Executes a single client request.
+
+        Args:
+            request (dict): Request with an "op" key and its arguments.
+
+        Returns:
+            The JSON-serializable result.
+        """
+        op = request.get("op")
+        api = self.snipeit_api
+        if op == "ping":
+            return self.status()
+        if op == "sync":
+            self.ensure_fresh(request.get("requested_at", time.time()))
+            return self.status()
+
+        self.ensure_fresh()
+        if op == "find":
+            with api.store_lock:
+                return api.ip_index.find(request["field"], request["value"])
+        if op == "first_duplicate":
+            with api.store_lock:
+                return api.ip_index.first_duplicate(request["expected"])
+        if op == "get_asset":
+            return api._get_stored_asset(request["id"])
+        if op == "assets":
+            return self.assets_page(
+                request.get("offset", 0),
+                request.get("limit", ASSETS_PAGE_SIZE),
+                request.get("unassigned", False),
+            )
+        if op == "store":
+            with api.store_lock:
+                api._store_asset(request["asset"])
+                api._save_snapshot()
+            return None
+        raise CacheDaemonError(f"Unknown request: {op}")
+
+
+class AssetCacheRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                result = self.server.handle_request_data(json.loads(line))
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(
+                json.dumps(response, default=AssetRecord.json_default).encode()
+                + b"\n"
+            )
+            self.wfile.flush()
+
+
+class AssetCacheClient:
+    """
+    Client of the asset cache daemon, keeping one connection open.
+    """
+
+    def __init__(self, socket_path, timeout=60):
+        """
+        Initializes the client. No connection is made until the first call.
+
+        Args:
+            socket_path (str): Path of the daemon Unix socket.
+            timeout (float): Socket timeout in seconds, long enough for the
+                daemon to sync with the server.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock = None
+        self.file = None
+
+    def _connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError:
+            self.close()
+            raise
+        self.file = self.sock.makefile("rb")
+
+    def close(self):
+        """
+        Closes the connection.
+
+        Returns:
+            None.
+        """
+        if self.file:
+            self.file.close()
+        if self.sock:
+            self.sock.close()
+        self.sock = None
+        self.file = None
+
+    def is_available(self):
+        """
+        Checks whether the daemon is running.
+
+        Returns:
+            bool: True if the daemon answered a ping.
+        """
+        try:
+            self.call("ping")
+        except (OSError, CacheDaemonError):
+            return False
+        return True
+
+    def call(self, op, **kwargs):
+        """
+        Sends a request to the daemon.
+
+        Args:
+            op (str): Request name.
+            **kwargs: Request arguments.
+
+        Returns:
+            The result of the request.
+
+        Raises:
+            OSError: If the daemon cannot be reached.
+            CacheDaemonError: If the request failed in the daemon.
+        """
+        request = json.dumps(dict(kwargs, op=op)).encode() + b"\n"
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self._connect()
+                    self.sock.sendall(request)
+                    line = self.file.readline()
+                    if line:
+                        break
+                    raise ConnectionResetError("Connection closed by daemon")
+                except OSError:
+                    # The daemon may have been restarted, reconnect once
+                    self.close()
+                    if attempt:
+                        raise
+
+        response = json.loads(line)
+        if not response["ok"]:
+            raise CacheDaemonError(response["error"])
+        return response["result"]
+
+
+class RemoteAssetIPIndex:
+    """
+    AssetIPIndex counterpart answering from the asset cache daemon.
+    """
+
+    IP_FIELDS = AssetIPIndex.IP_FIELDS
+
+    def __init__(self, client, fallback):
+        """
+        Initializes the index.
+
+        Args:
+            client (AssetCacheClient): Connection to the daemon.
+            fallback (callable): Returns a local AssetIPIndex to use if the
+                daemon cannot be reached.
+        """
+        self.client = client
+        self.fallback = fallback
+        self.local_index = None
+
+    def _call(self, method, op, **kwargs):
+        if self.local_index is None:
+            try:
+                return self.client.call(op, **kwargs)
+            except (OSError, CacheDaemonError) as e:
+                print(f"Asset cache daemon failed, using local cache: {e}")
+                self.local_index = self.fallback()
+        return getattr(self.local_index, method)(*kwargs.values())
+
+    def find(self, field_name, value):
+        if not value:
+            return []
+        return self._call("find", "find", field=field_name, value=value)
+
+    def count(self, field_name, value):
+        return len(self.find(field_name, value))
+
+    def first_duplicate(self, expected):
+        duplicate = self._call(
+            "first_duplicate", "first_duplicate", expected=expected
+        )
+        return tuple(duplicate) if duplicate else None
+
+
+def run_cache_daemon(snipeit_api, socket_path):
+    """
+    Runs the asset cache daemon in the foreground until interrupted.
+
+    Args:
+        snipeit_api (SnipeIT): Client used to fetch and sync the assets.
+        socket_path (str): Path of the Unix socket to listen on.
+
+    Returns:
+        bool: False if another daemon is already running, True otherwise.
+    """
+    if os.path.exists(socket_path):
+        if AssetCacheClient(socket_path, timeout=5).is_available():
+            print(f"Asset cache daemon is already running on {socket_path}")
+            return False
+        # Left behind by a daemon which did not exit cleanly
+        os.remove(socket_path)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    server = AssetCacheDaemon(snipeit_api, socket_path)
+    server.ensure_fresh()
+    print(
+        f"Serving {len(snipeit_api.all_assets)} Snipe-IT assets on "
+        f"{socket_path}",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
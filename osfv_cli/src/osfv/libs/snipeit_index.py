@@ -0,0 +1,152 @@
+class AssetIPIndex:
+    """
+    Hash index over the IP-type custom fields of an asset snapshot.
+
+    For every IP field and value, the index keeps the positions of the assets
+    carrying it, in snapshot order. Lookups and duplicate checks are then
+    dictionary hits instead of scans over the whole inventory.
+    """
+
+    IP_FIELDS = ("IP", "RTE IP", "Sonoff IP", "PiKVM IP")
+
+    def __init__(self, assets):
+        """
+        Builds the index.
+
+        Args:
+            assets (list): List of asset dictionaries, as returned by the
+                `/hardware` endpoint.
+        """
+        self.assets = assets
+        self.positions = {}
+        self.values = {field: {} for field in self.IP_FIELDS}
+        for position, asset in enumerate(assets):
+            self._add(position, asset)
+
+    @staticmethod
+    def field_value(asset, field_name):
+        """
+        Retrieves the value of a custom field of an asset.
+
+        Args:
+            asset (dict or AssetRecord): Asset dictionary or record.
+            field_name (str): Name of the custom field.
+
+        Returns:
+            str or None: The field value, or None if the field is missing or
+            empty.
+        """
+        ip_values = getattr(asset, "ip_values", None)
+        if ip_values is not None and field_name in AssetIPIndex.IP_FIELDS:
+            # AssetRecord keeps the IP fields decoded
+            return ip_values[AssetIPIndex.IP_FIELDS.index(field_name)]
+
+        custom_fields = asset.get("custom_fields") or {}
+        field_data = custom_fields.get(field_name)
+        if not field_data:
+            return None
+        return field_data.get("value") or None
+
+    def _add(self, position, asset):
+        self.positions[asset["id"]] = position
+        for field in self.IP_FIELDS:
+            value = self.field_value(asset, field)
+            if value:
+                self.values[field].setdefault(value, []).append(position)
+
+    def _remove(self, position, asset):
+        for field in self.IP_FIELDS:
+            value = self.field_value(asset, field)
+            positions = self.values[field].get(value)
+            if positions and position in positions:
+                positions.remove(position)
+                if not positions:
+                    del self.values[field][value]
+
+    def update(self, old_asset, new_asset):
+        """
+        Re-indexes a single asset after it has been replaced or appended in
+        the snapshot list.
+
+        Args:
+            old_asset (dict or None): The asset as previously indexed, or None
+                if it was not part of the snapshot.
+            new_asset (dict): The asset now stored in the snapshot.
+
+        Returns:
+            None.
+        """
+        position = self.positions.get(new_asset["id"])
+        if old_asset is not None and position is not None:
+            self._remove(position, old_asset)
+        else:
+            # Appended: the snapshot may list an asset twice (offset paging
+            # over a changing inventory), so count list entries, not ids
+            position = len(self.assets) - 1
+        self.positions[new_asset["id"]] = position
+        for field in self.IP_FIELDS:
+            value = self.field_value(new_asset, field)
+            if value:
+                positions = self.values[field].setdefault(value, [])
+                positions.append(position)
+                positions.sort()
+
+    def find(self, field_name, value):
+        """
+        Finds assets by the value of an IP field.
+
+        Args:
+            field_name (str): One of `IP_FIELDS`.
+            value (str): The IP address to search for.
+
+        Returns:
+            list: Matching assets, in snapshot order.
+        """
+        if not value:
+            return []
+        positions = self.values[field_name].get(value, [])
+        return [self.assets[position] for position in positions]
+
+    def count(self, field_name, value):
+        """
+        Returns how many assets carry the given value in an IP field.
+
+        Args:
+            field_name (str): One of `IP_FIELDS`.
+            value (str): The IP address to count.
+
+        Returns:
+            int: Number of assets with that value.
+        """
+        if not value:
+            return 0
+        return len(self.values[field_name].get(value, []))
+
+    def first_duplicate(self, expected):
+        """
+        Finds the first non-exclusive IP among the expected values.
+
+        The result matches a scan over the snapshot that stops at the second
+        occurrence of any of the expected values.
+
+        Args:
+            expected (dict): Maps IP field names to the expected IP values.
+                Empty values are ignored.
+
+        Returns:
+            tuple or None: (field name, value, count) of the first duplicate,
+            or None if all the values are exclusive.
+        """
+        duplicate = None
+        for order, field in enumerate(self.IP_FIELDS):
+            value = expected.get(field)
+            if not value:
+                continue
+            positions = self.values[field].get(value, [])
+            if len(positions) > 1:
+                key = (positions[1], order)
+                if duplicate is None or key < duplicate[0]:
+                    duplicate = (key, field, value, len(positions))
+        if duplicate is None:
+            return None
+        return duplicate[1:]
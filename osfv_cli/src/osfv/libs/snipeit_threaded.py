@@ -0,0 +1,146 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from osfv.libs.snipeit_api import SnipeIT
+
+
+class ThreadedSnipeIT:
+    """
+    asyncio front end of the SnipeIT client, for tooling that works on many
+    assets at once.
+
+    There is no asynchronous HTTP transport: every call is executed by the
+    wrapped SnipeIT client on a bounded pool of worker threads, so it goes
+    through the same pooled `requests` session, and the same `_request()`
+    retry, rate limiting and caching as the synchronous client. Concurrency
+    is therefore capped by the number of threads, `max_connections`, the
+    other calls wait for a free worker. The coroutines can be scheduled
+    together with `asyncio.gather`:
+
+        async with ThreadedSnipeIT() as snipeit_api:
+            results = await asyncio.gather(
+                *(snipeit_api.check_out_asset(id) for id in asset_ids)
+            )
+    """
+
+    def __init__(self, snipeit_api=None, max_connections=None):
+        """
+        Initializes the client.
+
+        Args:
+            snipeit_api (SnipeIT, optional): Synchronous client to wrap. A new
+                one is created from the Snipe-IT config file by default.
+            max_connections (int, optional): Maximum number of concurrent
+                requests. Defaults to `max_workers` from the config file.
+        """
+        self.snipeit_api = snipeit_api or SnipeIT()
+        self.max_connections = (
+            max_connections or self.snipeit_api.cfg_max_workers
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_connections,
+            thread_name_prefix="snipeit",
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Waits for the pending requests and releases the worker threads.
+
+        Returns:
+            None.
+        """
+        self.executor.shutdown(wait=True)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def request(self, method, url, **kwargs):
+        """
+        Sends a request to the Snipe-IT API.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            **kwargs: Passed to `SnipeIT._request()`.
+
+        Returns:
+            success status with a response object from server.
+        """
+        return await self._run(
+            self.snipeit_api._request, method, url, **kwargs
+        )
+
+    async def get_all_assets(self):
+        """
+        Retrieves all hardware assets, see `SnipeIT.get_all_assets()`.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an asset.
+        """
+        return await self._run(self.snipeit_api.get_all_assets)
+
+    async def get_asset(self, asset_id):
+        """
+        Retrieves a single asset, see `SnipeIT.get_asset()`.
+
+        Args:
+            asset_id (int): The unique identifier of the asset.
+
+        Returns:
+            success status with a response object from server.
+        """
+        return await self._run(self.snipeit_api.get_asset, asset_id)
+
+    async def get_asset_id_by_rte_ip(self, rte_ip):
+        """
+        Retrieves the asset ID associated with a given RTE IP, see
+        `SnipeIT.get_asset_id_by_rte_ip()`.
+
+        Args:
+            rte_ip (str): The RTE IP address to search for.
+
+        Returns:
+            str or None: The asset ID if found, otherwise None.
+
+        Raises:
+            DuplicatedIpException: If the RTE IP is not exclusive.
+        """
+        return await self._run(self.snipeit_api.get_asset_id_by_rte_ip, rte_ip)
+
+    async def check_out_asset(self, asset_id):
+        """
+        Checks out an asset to the current user, see
+        `SnipeIT.check_out_asset()`.
+
+        Args:
+            asset_id (int): The unique identifier of the asset.
+
+        Returns:
+            tuple: (success, response, already checked out to the user).
+
+        Raises:
+            DuplicatedIpException: If any IP of the asset is not exclusive.
+        """
+        return await self._run(self.snipeit_api.check_out_asset, asset_id)
+
+    async def check_in_asset(self, asset_id):
+        """
+        Checks in an asset, see `SnipeIT.check_in_asset()`.
+
+        Args:
+            asset_id (int): The unique identifier of the asset.
+
+        Returns:
+            success status with a response object from server.
+        """
+        return await self._run(self.snipeit_api.check_in_asset, asset_id)
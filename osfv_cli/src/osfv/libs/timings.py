@@ -0,0 +1,206 @@
+import json
+import math
+import os
+import statistics
+import time
+
+# Environment variable with the path of the file the timing profile is
+# appended to
+PROFILE_ENV = "OSFV_TIMING_PROFILE"
+
+# Minimum and maximum duration of the waiting steps of the power and SPI
+# sequences, in seconds. A step ends as soon as its condition holds, but not
+# before its minimum time; steps without an observable condition last their
+# maximum time. The minimum time of such steps is the settling time the
+# hardware needs, the fixed sleep the sequences used before. Can be
+# overridden per model in the `timings` section of the model config.
+DEFAULT_TIMINGS = {
+    # Main power supply connected, before the power button is used
+    "psu_on": {"min": 5, "max": 5},
+    # Main power supply disconnected
+    "psu_off": {"min": 2, "max": 2},
+    # Power button released after forcing the DUT off, until the power LED
+    # is off
+    "s5_entry": {"min": 1, "max": 10},
+    # Power button pushed repeatedly to dissipate the charge of the PSU
+    "discharge": {"min": 15, "max": 15},
+    # SPI voltage selected
+    "spi_voltage": {"min": 2, "max": 2},
+    # SPI VCC enabled
+    "spi_vcc": {"min": 2, "max": 2},
+    # SPI lines enabled, until flashrom detects the flash chip
+    "spi_on": {"min": 1, "max": 13},
+    # Power button released, until the power LED turns on or off
+    "pwr_led_on": {"min": 0, "max": 10},
+    "pwr_led_off": {"min": 0, "max": 10},
+}
+
+
+def load_timings(dut_data):
+    """
+    Merges the timings from a model config with the default ones.
+
+    Args:
+        dut_data (dict): The model config.
+
+    Returns:
+        dict: Step names mapped to their "min" and "max" times in seconds.
+    """
+    timings = {step: dict(limits) for step, limits in DEFAULT_TIMINGS.items()}
+    for step, limits in (dut_data.get("timings") or {}).items():
+        timings[step].update(limits)
+    return timings
+
+
+def wait_until(condition, min_time, max_time, interval=0.25, max_interval=2):
+    """
+    Waits until a condition holds, for at least `min_time` and at most
+    `max_time` seconds. The condition is checked at growing intervals,
+    starting at `interval` and doubled up to `max_interval` seconds. A
+    condition raising an exception counts as not holding.
+
+    Args:
+        condition (callable): Returns True once the step is complete. If
+            None, the step waits for `max_time`.
+        min_time (float): Minimum wait time in seconds.
+        max_time (float): Maximum wait time in seconds.
+        interval (float, optional): First interval between checks.
+        max_interval (float, optional): Longest interval between checks.
+
+    Returns:
+        tuple: Whether the condition holds (False on timeout), and the wait
+            time in seconds.
+    """
+    start = time.monotonic()
+    if condition is None:
+        time.sleep(max_time)
+        return True, time.monotonic() - start
+
+    while True:
+        try:
+            satisfied = bool(condition())
+        except Exception:
+            satisfied = False
+        elapsed = time.monotonic() - start
+        if satisfied and elapsed >= min_time:
+            return True, elapsed
+        if elapsed >= max_time:
+            return False, elapsed
+        if satisfied:
+            # Check again once the minimum time has passed
+            delay = min_time - elapsed
+        else:
+            delay = interval
+            interval = min(interval * 2, max_interval)
+        time.sleep(min(delay, max_time - elapsed))
+
+
+class TimingProfile:
+    """
+    Durations of the waiting steps run by an RTE, used to tune the timings in
+    the model configs. If the OSFV_TIMING_PROFILE environment variable is
+    set, each record is also appended to that file as a JSON line.
+    """
+
+    def __init__(self, model, rte_ip=None, path=None):
+        """
+        Initializes the profile.
+
+        Args:
+            model (str): DUT model name.
+            rte_ip (str, optional): IP address of the RTE.
+            path (str, optional): File to append the records to. Defaults to
+                the value of the OSFV_TIMING_PROFILE environment variable.
+        """
+        self.model = model
+        self.rte_ip = rte_ip
+        self.path = path if path is not None else os.environ.get(PROFILE_ENV)
+        self.records = []
+
+    def record(self, step, elapsed, satisfied, limits):
+        """
+        Records the duration of a step.
+
+        Args:
+            step (str): Step name, see `DEFAULT_TIMINGS`.
+            elapsed (float): Duration of the step in seconds.
+            satisfied (bool): False if the step timed out.
+            limits (dict): The "min" and "max" times of the step.
+
+        Returns:
+            dict: The record.
+        """
+        record = {
+            "time": time.time(),
+            "model": self.model,
+            "rte_ip": self.rte_ip,
+            "step": step,
+            "elapsed": round(elapsed, 3),
+            "satisfied": satisfied,
+            "min": limits["min"],
+            "max": limits["max"],
+        }
+        self.records.append(record)
+        if self.path:
+            try:
+                with open(self.path, "a") as file:
+                    file.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print(f"Failed to write the timing profile: {e}")
+        return record
+
+
+def read_profile(path):
+    """
+    Reads the records of a timing profile file.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        list: The records, see `TimingProfile.record()`.
+    """
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def summarize_profile(records):
+    """
+    Computes the duration statistics of each step of each model, and
+    suggests a maximum time for it: the longest completed run, with a 50%
+    margin.
+
+    Args:
+        records (list): The records of a timing profile.
+
+    Returns:
+        dict: Model names mapped to step names mapped to statistics.
+    """
+    grouped = {}
+    for record in records:
+        steps = grouped.setdefault(record["model"], {})
+        steps.setdefault(record["step"], []).append(record)
+
+    summary = {}
+    for model, steps in grouped.items():
+        summary[model] = {}
+        for step, step_records in steps.items():
+            durations = [record["elapsed"] for record in step_records]
+            completed = [
+                record["elapsed"]
+                for record in step_records
+                if record["satisfied"]
+            ]
+            stats = {
+                "runs": len(step_records),
+                "timeouts": len(step_records) - len(completed),
+                "min": min(durations),
+                "median": statistics.median(durations),
+                "max": max(durations),
+                "limit_min": step_records[-1]["min"],
+                "limit_max": step_records[-1]["max"],
+            }
+            if completed:
+                stats["suggested_max"] = math.ceil(max(completed) * 15) / 10
+            summary[model][step] = stats
+    return summary
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with expiring entries.
+
+    Entries expire after their time to live. When the cache is full, the
+    least recently used entry is evicted to make room for a new one. Any
+    value can be cached, including None, so `get()` reports hits and misses
+    separately from the value.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries.
+            ttl (float, optional): Default time to live of the entries in
+                seconds. Entries do not expire if None.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Looks up an entry, marking it as recently used.
+
+        Args:
+            key: Key of the entry.
+
+        Returns:
+            tuple:
+                bool: True if a live entry was found.
+                The cached value, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores an entry, evicting the least recently used ones if the cache
+        is full.
+
+        Args:
+            key: Key of the entry.
+            value: Value to cache.
+            ttl (float, optional): Time to live in seconds, overriding the
+                default one.
+
+        Returns:
+            None.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes an entry, if present.
+
+        Args:
+            key: Key of the entry.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all entries.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DiskTTLCache:
+    """
+    On-disk counterpart of TTLCache, shared by all processes of the user.
+
+    Every entry is a small JSON file holding the value and its expiry time.
+    Reading an entry updates the file modification time, which orders the
+    entries for least recently used eviction. Values must be JSON
+    serializable; tuples are read back as lists.
+    """
+
+    def __init__(self, directory, maxsize=1024, ttl=None, json_default=None):
+        """
+        Initializes the cache.
+
+        Args:
+            directory (str): Directory holding the entry files.
+            maxsize (int): Maximum number of entries.
+            ttl (float, optional): Default time to live of the entries in
+                seconds. Entries do not expire if None.
+            json_default (callable, optional): `default` hook of
+                `json.dumps()`, for values which are not plain JSON.
+        """
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.json_default = json_default
+
+    def _path(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def get(self, key):
+        """
+        Looks up an entry, marking it as recently used.
+
+        Args:
+            key: Key of the entry, identified by its `repr()`.
+
+        Returns:
+            tuple:
+                bool: True if a live entry was found.
+                The cached value, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = json.load(file)
+            expires_at = entry["expires_at"]
+            if expires_at is not None and time.time() >= expires_at:
+                os.remove(path)
+                return False, None
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False, None
+        return True, entry["value"]
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores an entry, evicting the least recently used ones if the cache
+        is full.
+
+        Args:
+            key: Key of the entry, identified by its `repr()`.
+            value: Value to cache.
+            ttl (float, optional): Time to live in seconds, overriding the
+                default one.
+
+        Returns:
+            None.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        entry = {
+            "expires_at": None if ttl is None else time.time() + ttl,
+            "value": value,
+        }
+        try:
+            data = json.dumps(entry, default=self.json_default)
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as file:
+                file.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            # The cache is an optimization only, never fail the command
+            print(f"Failed to write cache entry: {e}")
+
+    def _evict(self):
+        with os.scandir(self.directory) as entries:
+            files = [
+                entry
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+        if len(files) <= self.maxsize:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[: len(files) - self.maxsize]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, key):
+        """
+        Removes an entry, if present.
+
+        Args:
+            key: Key of the entry.
+
+        Returns:
+            None.
+        """
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Removes all entries.
+
+        Returns:
+            None.
+        """
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json"):
+                        os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return sum(entry.name.endswith(".json") for entry in entries)
+        except FileNotFoundError:
+            return 0
@@ -1,7 +1,6 @@
 import os
 
 from osfv.libs.flash_image import FlashImage
-from osfv.libs.sonoff_api import SonoffDevice
 
 
 def init_sonoff(init_sonoff_ip, rte_ip, snipeit_api=None):
@@ -20,6 +19,9 @@ def init_sonoff(init_sonoff_ip, rte_ip, snipeit_api=None):
             - sonoff (SonoffDevice): The Sonoff device instance initialized with the Sonoff IP.
             - sonoff_ip (str): The IP address of the Sonoff device.
     """
+    # Imported here, the flash image helpers do not need requests
+    from osfv.libs.sonoff_api import SonoffDevice
+
     sonoff_ip = ""
     sonoff = None
     if not snipeit_api:
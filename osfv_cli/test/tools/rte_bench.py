@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+RTE micro-benchmark for osfv_cli.
+
+Starts the local RTE stand-ins (`rte_mock.py` and `rte_ssh_mock.py`) and
+measures the per-call latency of the RTE clients against them, with pooled
+connections and with a new connection per call, and of firmware uploads with
+and without the image cache, as osfv_cli did before:
+
+    gpio_get_unpooled       gpio_get(), a new HTTP connection per call
+    gpio_get_pooled         gpio_get() over the pooled session
+    gpio_set_unpooled       gpio_set(), a new HTTP connection per call
+    gpio_set_pooled         gpio_set() over the pooled session
+    flash_probe_unpooled    flashrom probe, a new SSH connection per call
+    flash_probe_pooled      flashrom probe over the persistent SSH connection
+    fw_upload_uncached      SFTP upload of the same firmware image every time
+    fw_upload_cached        upload through the image cache on the RTE
+
+The mocks count the new connections, SSH handshakes and uploaded bytes of
+every scenario. The benchmark fails if a pooled or cached scenario opens
+connections or uploads the image, or if the baseline scenario does not, as
+these counts do not depend on the load of the machine. The latencies are
+only reported. The connection latency of a remote RTE is simulated by the
+mocks, e.g.:
+
+    python3 rte_bench.py --iterations 200 --connect-latency 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+MOCK_PATH = os.path.join(TOOLS_DIR, "rte_mock.py")
+SSH_MOCK_PATH = os.path.join(TOOLS_DIR, "rte_ssh_mock.py")
+# Operations mapped to the modes they are run in: before and after
+OPERATIONS = {
+    "gpio_get": ("unpooled", "pooled"),
+    "gpio_set": ("unpooled", "pooled"),
+    "flash_probe": ("unpooled", "pooled"),
+    "fw_upload": ("uncached", "cached"),
+}
+SCENARIOS = [
+    f"{operation}_{mode}"
+    for operation, modes in OPERATIONS.items()
+    for mode in modes
+]
+# Scenarios mapped to the mock counter they are checked with, and to its
+# expected value per call: new HTTP connections, SSH handshakes, or uploaded
+# images
+EXPECTED_COUNTS = {
+    "gpio_get_unpooled": ("connections", 1),
+    "gpio_get_pooled": ("connections", 0),
+    "gpio_set_unpooled": ("connections", 1),
+    "gpio_set_pooled": ("connections", 0),
+    "flash_probe_unpooled": ("handshakes", 1),
+    "flash_probe_pooled": ("handshakes", 0),
+    "fw_upload_uncached": ("upload_bytes", 1),
+    "fw_upload_cached": ("upload_bytes", 0),
+}
+COUNTERS = ("connections", "handshakes", "upload_bytes")
+PROBE_COMMAND = "flashrom -p linux_spi:dev=/dev/spidev1.0,spispeed=16000"
+# Regular GPIO, driven high and low
+GPIO_NO = 13
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name, samples, elapsed, errors, counts):
+    """
+    Computes latency percentiles (in ms) and the throughput of a scenario.
+    """
+    return {
+        "scenario": name,
+        "ops": len(samples),
+        "errors": errors,
+        **counts,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p90_ms": percentile(samples, 0.9) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+        "ops_per_s": len(samples) / elapsed if elapsed else 0,
+    }
+
+
+def start_mock(path, *options):
+    command = [sys.executable, path, "--port", "0", *options]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    banner = process.stdout.readline()
+    if "listening on" not in banner:
+        process.kill()
+        sys.exit(f"Failed to start {os.path.basename(path)}: {banner}")
+    return process, banner.split("listening on ")[1].split(",")[0].strip()
+
+
+def mock_call(api_url, method, path):
+    import requests
+
+    base_url = api_url.rsplit("/api/v1", 1)[0]
+    return requests.request(method, f"{base_url}{path}", timeout=5).json()
+
+
+def make_clients(port):
+    import requests
+    from osfv.libs import rtectrl_api
+
+    class UnpooledRtectrl(rtectrl_api.rtectrl):
+        """
+        rtectrl opening a new connection for every request.
+        """
+
+        def _get_request(self, endpoint):
+            response = requests.get(
+                self._url(endpoint), headers=rtectrl_api.headers
+            )
+            response.raise_for_status()
+            return response
+
+        def _patch_request(self, endpoint, data):
+            response = requests.patch(
+                self._url(endpoint), json=data, headers=rtectrl_api.headers
+            )
+            response.raise_for_status()
+            return response
+
+    clients = {}
+    for pooled, cls in ((False, UnpooledRtectrl), (True, rtectrl_api.rtectrl)):
+        client = cls("127.0.0.1")
+        client.API_PORT = port
+        clients[pooled] = client
+    return clients
+
+
+def make_ssh_clients(port):
+    import paramiko
+    from osfv.libs import rte_ssh
+
+    def unpooled_probe():
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh.connect(
+                "127.0.0.1",
+                port=port,
+                username="root",
+                password="meta-rte",
+                look_for_keys=False,
+                allow_agent=False,
+            )
+            _, stdout, _ = ssh.exec_command(PROBE_COMMAND)
+            return stdout.channel.recv_exit_status()
+        finally:
+            ssh.close()
+
+    pooled = rte_ssh.RTESSH("127.0.0.1", "root", "meta-rte", port)
+    return {
+        False: unpooled_probe,
+        True: lambda: pooled.run(PROBE_COMMAND)[0],
+    }, pooled
+
+
+def make_uploads(ssh, image):
+    from osfv.libs.fw_cache import FirmwareCache
+
+    cache = FirmwareCache(ssh, "/data/fw_cache", 4)
+
+    def uncached():
+        ssh.sftp().put(image, "/data/upload.rom")
+
+    def cached():
+        cache.upload(image, "/data/write.rom")
+
+    return {"uncached": uncached, "cached": cached}
+
+
+def ssh_stats(ssh):
+    return json.loads(ssh.run("mock-stats")[1])
+
+
+def ssh_counts(before, after):
+    return {counter: after[counter] - before[counter] for counter in COUNTERS}
+
+
+def check_counts(result, image_bytes):
+    """
+    Checks the mock counters of a scenario, see `EXPECTED_COUNTS`.
+
+    Returns:
+        str or None: Why the check failed, None if it passed.
+    """
+    counter, per_call = EXPECTED_COUNTS[result["scenario"]]
+    expected = per_call * result["ops"]
+    if counter == "upload_bytes":
+        expected *= image_bytes
+    if result[counter] != expected:
+        return (
+            f"{result['scenario']}: {counter} is {result[counter]}, "
+            f"expected {expected}"
+        )
+    return None
+
+
+def bench(call, iterations):
+    samples = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            if call(i):
+                errors += 1
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - t0)
+    return samples, time.perf_counter() - start, errors
+
+
+def print_report(results, speedups):
+    columns = ["ops", "errors", *COUNTERS, "p50_ms", "p90_ms", "p99_ms"]
+    columns += ["max_ms", "ops_per_s"]
+    print(f"{'scenario':<22}" + "".join(f"{c:>13}" for c in columns))
+    for result in results:
+        cells = []
+        for column in columns:
+            value = result.get(column, "-")
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            cells.append(f"{value:>13}")
+        print(f"{result['scenario']:<22}" + "".join(cells))
+    for operation, speedup in speedups.items():
+        mode = OPERATIONS[operation][1]
+        print(f"{operation}: {mode} p50 is {speedup:.1f}x faster")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="Calls per scenario"
+    )
+    parser.add_argument(
+        "--ssh-iterations",
+        type=int,
+        default=20,
+        help="Calls per SSH scenario",
+    )
+    parser.add_argument(
+        "--uploads", type=int, default=5, help="Calls per upload scenario"
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        default=16,
+        help="Size of the uploaded firmware image in MiB",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Server delay in ms"
+    )
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0,
+        help="Delay of every new connection in ms",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    latency = ["--connect-latency", str(args.connect_latency)]
+    mock, api_url = start_mock(
+        MOCK_PATH, "--latency", str(args.latency), *latency
+    )
+    ssh_mock, ssh_address = start_mock(SSH_MOCK_PATH, *latency)
+    states = ["high", "low"]
+    image = tempfile.NamedTemporaryFile(suffix=".rom")
+    image.write(os.urandom(args.image_size * 1024 * 1024))
+    image.flush()
+    try:
+        port = int(api_url.split(":")[2].split("/")[0])
+        clients = make_clients(port)
+        probes, stats_ssh = make_ssh_clients(int(ssh_address.split(":")[1]))
+        uploads = make_uploads(stats_ssh, image.name)
+        results = []
+        for scenario in SCENARIOS:
+            operation, mode = scenario.rsplit("_", 1)
+            pooled = mode == "pooled"
+            if operation == "fw_upload":
+                upload = uploads[mode]
+                # Warm up, the first upload fills the cache
+                upload()
+                before = ssh_stats(stats_ssh)
+                samples, elapsed, errors = bench(
+                    lambda i: upload(), args.uploads
+                )
+                counts = ssh_counts(before, ssh_stats(stats_ssh))
+            elif operation == "flash_probe":
+                probe = probes[pooled]
+                # Warm up, the pooled connection connects on the first call
+                probe()
+                before = ssh_stats(stats_ssh)
+                samples, elapsed, errors = bench(
+                    lambda i: probe(), args.ssh_iterations
+                )
+                counts = ssh_counts(before, ssh_stats(stats_ssh))
+            else:
+                client = clients[pooled]
+                client.gpio_get(GPIO_NO)
+                mock_call(api_url, "POST", "/mock/reset")
+                if operation == "gpio_get":
+                    call = lambda i: client.gpio_get(GPIO_NO) and None
+                else:
+                    call = lambda i: client.gpio_set(GPIO_NO, states[i % 2])
+                samples, elapsed, errors = bench(call, args.iterations)
+                stats = mock_call(api_url, "GET", "/mock/stats")
+                # Not counting the connection of the stats request
+                counts = {"connections": stats["connections"] - 1}
+            results.append(
+                summarize(scenario, samples, elapsed, errors, counts)
+            )
+    finally:
+        image.close()
+        stats_ssh.close()
+        for process in (mock, ssh_mock):
+            process.terminate()
+            process.wait()
+
+    by_name = {result["scenario"]: result for result in results}
+    speedups = {
+        operation: by_name[f"{operation}_{before}"]["p50_ms"]
+        / by_name[f"{operation}_{after}"]["p50_ms"]
+        for operation, (before, after) in OPERATIONS.items()
+    }
+    if args.json:
+        print(json.dumps({"results": results, "speedup": speedups}, indent=2))
+    else:
+        print_report(results, speedups)
+
+    failed = any(result["errors"] for result in results)
+    for result in results:
+        failure = check_counts(result, args.image_size * 1024 * 1024)
+        if failure:
+            print(f"FAIL: {failure}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
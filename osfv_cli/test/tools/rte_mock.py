@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the RTE REST API, used to test and benchmark
+osfv_cli without an RTE.
+
+Only the GPIO endpoints used by `osfv.libs.rtectrl_api` are implemented:
+
+    GET    /api/v1/gpio
+    GET    /api/v1/gpio/<gpio_no>
+    PATCH  /api/v1/gpio/<gpio_no>    (state, direction, time)
+
+A GPIO set with a non-zero `time` is pulsed: it returns to its previous
+state after `time` seconds, as on the RTE. Latency can be added to every
+request and to every new connection, the latter standing for the TCP
+handshake to a remote RTE. Request and connection counters are available
+at `GET /mock/stats` and are cleared by `POST /mock/reset`.
+
+Example:
+
+    python3 rte_mock.py --port 8000 --latency 2 --connect-latency 5
+"""
+
+import argparse
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GPIO_COUNT = 20
+
+
+class GPIOBank:
+    """
+    GPIO states of the stand-in, shared by all request handler threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.gpios = [
+            {"id": gpio_no, "direction": "out", "state": 0, "time": 0}
+            for gpio_no in range(GPIO_COUNT)
+        ]
+        # Incremented on every set, so that a pulse only reverts its own set
+        self.generations = [0] * GPIO_COUNT
+
+    def list(self):
+        with self.lock:
+            return [dict(gpio) for gpio in self.gpios]
+
+    def get(self, gpio_no):
+        with self.lock:
+            return dict(self.gpios[gpio_no])
+
+    def set(self, gpio_no, state, direction="out", pulse=0):
+        with self.lock:
+            gpio = self.gpios[gpio_no]
+            previous = gpio["state"]
+            gpio.update(state=state, direction=direction, time=pulse)
+            self.generations[gpio_no] += 1
+            generation = self.generations[gpio_no]
+        if pulse:
+            timer = threading.Timer(
+                pulse, self._revert, (gpio_no, previous, generation)
+            )
+            timer.daemon = True
+            timer.start()
+
+    def _revert(self, gpio_no, state, generation):
+        with self.lock:
+            if self.generations[gpio_no] == generation:
+                self.gpios[gpio_no].update(state=state, time=0)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+    def setup(self):
+        super().setup()
+        # Headers and body are sent separately, do not wait for the ACK of
+        # the headers on kept-alive connections
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count_connection()
+        if self.server.options.connect_latency:
+            time.sleep(self.server.options.connect_latency / 1000)
+
+    def do_GET(self):
+        self.handle_api("GET")
+
+    def do_PATCH(self):
+        self.handle_api("PATCH")
+
+    def do_POST(self):
+        self.handle_api("POST")
+
+    def handle_api(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if self.path.startswith("/mock/"):
+            return self.handle_mock(method, self.path)
+
+        self.server.count(method, self.path)
+        if self.server.options.latency:
+            time.sleep(self.server.options.latency / 1000)
+
+        bank = self.server.gpios
+        if method == "GET" and self.path == "/api/v1/gpio":
+            return self.reply(200, bank.list())
+        match = re.fullmatch(r"/api/v1/gpio/(\d+)", self.path)
+        if not match or int(match.group(1)) >= GPIO_COUNT:
+            return self.reply(404, {"message": "Not found"})
+        gpio_no = int(match.group(1))
+        if method == "GET":
+            return self.reply(200, bank.get(gpio_no))
+        if method == "PATCH":
+            try:
+                data = json.loads(body)
+                bank.set(
+                    gpio_no,
+                    int(data["state"]),
+                    data.get("direction", "out"),
+                    float(data.get("time") or 0),
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                return self.reply(400, {"message": f"Bad request: {e}"})
+            return self.reply(200, bank.get(gpio_no))
+        return self.reply(405, {"message": "Method not allowed"})
+
+    def handle_mock(self, method, path):
+        if method == "GET" and path == "/mock/stats":
+            return self.reply(200, self.server.stats())
+        if method == "POST" and path == "/mock/reset":
+            self.server.reset_stats()
+            return self.reply(200, {"status": "success"})
+        return self.reply(404, {"message": "Not found"})
+
+    def reply(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, options):
+        super().__init__((options.host, options.port), MockHandler)
+        self.options = options
+        self.gpios = GPIOBank()
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def count(self, method, path):
+        endpoint = re.sub(r"/\d+", "/<id>", path)
+        with self.stats_lock:
+            self.requests += 1
+            key = f"{method} {endpoint}"
+            self.endpoints[key] = self.endpoints.get(key, 0) + 1
+
+    def count_connection(self):
+        with self.stats_lock:
+            self.connections += 1
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "endpoints": dict(self.endpoints),
+            }
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.requests = 0
+            self.connections = 0
+            self.endpoints = {}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Response delay in ms"
+    )
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0,
+        help="Delay of every new connection in ms",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    server = MockServer(options)
+    print(
+        f"RTE mock listening on http://{options.host}:{server.server_port}"
+        "/api/v1",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SSH server of an RTE, used to test and benchmark the
+flash operations of osfv_cli without an RTE.
+
+Accepts the RTE credentials (root / meta-rte) and serves exec and SFTP
+channels. The file system of the RTE is a temporary directory: `/data` and
+`/tmp` in command lines and SFTP paths are mapped into it. Commands are run
+by the local shell, with a fake `flashrom` first in PATH, which keeps the
+content of the flash chip in a file. The `mock-stats` command prints the
+number of connections, completed SSH handshakes, commands and SFTP sessions,
+and of bytes uploaded over SFTP, as JSON.
+
+Example:
+
+    python3 rte_ssh_mock.py --port 2222 --connect-latency 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import paramiko
+
+USERNAME = "root"
+PASSWORD = "meta-rte"
+CHIP_SIZE = 8 * 1024 * 1024
+EXEC_REPLY_DELAY = 0.005
+
+FLASHROM_SCRIPT = """#!/bin/sh
+# Stand-in for flashrom, the content of the flash chip is kept in a file
+chip="$MOCK_ROOT/chip.bin"
+echo "flashrom (RTE SSH mock)"
+echo 'Found Winbond flash chip "W25Q64JV-.Q" (8192 kB, SPI) on linux_spi.'
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -r) cp "$chip" "$2" && echo "Reading flash... done." || exit 1
+            shift ;;
+        -w) cp "$2" "$chip" && echo "Verifying flash... VERIFIED." || exit 1
+            shift ;;
+        -E) head -c %(size)d /dev/zero > "$chip" && echo "Erase done." ;;
+        -p|-c|-i|--layout|--wp-range) shift ;;
+    esac
+    shift
+done
+"""
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(
+            (
+                "connections",
+                "handshakes",
+                "commands",
+                "sftp_sessions",
+                "upload_bytes",
+            ),
+            0,
+        )
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counts[name] += amount
+
+    def to_dict(self):
+        with self.lock:
+            return dict(self.counts)
+
+
+class MockFileSystem:
+    """
+    The file system of the stand-in, rooted in a local directory.
+    """
+
+    REMOTE_DIRS = ("data", "tmp")
+
+    def __init__(self, root):
+        self.root = root
+        for directory in self.REMOTE_DIRS + ("bin",):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+        flashrom = os.path.join(root, "bin", "flashrom")
+        with open(flashrom, "w") as file:
+            file.write(FLASHROM_SCRIPT % {"size": CHIP_SIZE})
+        os.chmod(flashrom, 0o755)
+        with open(os.path.join(root, "chip.bin"), "wb") as file:
+            file.write(b"\xff" * CHIP_SIZE)
+
+    def local_path(self, path):
+        path = os.path.normpath("/" + path).lstrip("/")
+        return os.path.join(self.root, path)
+
+    def translate_command(self, command):
+        pattern = r"(?<![\w./-])/(%s)(?=/|\s|$|;)" % "|".join(self.REMOTE_DIRS)
+        return re.sub(pattern, lambda m: self.local_path(m.group(0)), command)
+
+
+class MockSFTPHandle(paramiko.SFTPHandle):
+    def __init__(self, flags, stats):
+        super().__init__(flags)
+        self.stats = stats
+
+    def write(self, offset, data):
+        self.stats.count("upload_bytes", len(data))
+        return super().write(offset, data)
+
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(
+                os.fstat(self.readfile.fileno())
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def chattr(self, attr):
+        return paramiko.SFTP_OK
+
+
+class MockSFTPServer(paramiko.SFTPServerInterface):
+    def __init__(self, server, fs, stats, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.fs = fs
+        self.stats = stats
+        stats.count("sftp_sessions")
+
+    def canonicalize(self, path):
+        return os.path.normpath("/" + path)
+
+    def list_folder(self, path):
+        local = self.fs.local_path(path)
+        try:
+            return [
+                paramiko.SFTPAttributes.from_stat(
+                    os.stat(os.path.join(local, name)), name
+                )
+                for name in os.listdir(local)
+            ]
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(
+                os.stat(self.fs.local_path(path))
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        local = self.fs.local_path(path)
+        try:
+            fd = os.open(local, flags | getattr(os, "O_BINARY", 0), 0o644)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        file = os.fdopen(fd, mode)
+        handle = MockSFTPHandle(flags, self.stats)
+        handle.filename = local
+        handle.readfile = file
+        handle.writefile = file
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self.fs.local_path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.replace(
+                self.fs.local_path(oldpath), self.fs.local_path(newpath)
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self.fs.local_path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def chattr(self, path, attr):
+        return paramiko.SFTP_OK
+
+
+class MockServer(paramiko.ServerInterface):
+    def __init__(self, fs, stats):
+        self.fs = fs
+        self.stats = stats
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if username == USERNAME and password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OR_UNKNOWN
+
+    def check_channel_exec_request(self, channel, command):
+        self.stats.count("commands")
+        thread = threading.Thread(
+            target=self.run_command,
+            args=(channel, command.decode()),
+            daemon=True,
+        )
+        thread.start()
+        return True
+
+    def run_command(self, channel, command):
+        # The reply to the exec request is sent after
+        # check_channel_exec_request() returns, the output must not be sent
+        # before it
+        time.sleep(EXEC_REPLY_DELAY)
+        if command.strip() == "mock-stats":
+            output, rc = json.dumps(self.stats.to_dict()).encode() + b"\n", 0
+        else:
+            env = dict(os.environ, MOCK_ROOT=self.fs.root)
+            env["PATH"] = os.path.join(self.fs.root, "bin") + ":" + env["PATH"]
+            result = subprocess.run(
+                ["sh", "-c", self.fs.translate_command(command)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=env,
+            )
+            output, rc = result.stdout, result.returncode
+        try:
+            channel.sendall(output)
+            channel.send_exit_status(rc)
+        finally:
+            channel.close()
+
+
+def handle_connection(client, host_key, fs, stats, options):
+    stats.count("connections")
+    if options.connect_latency:
+        time.sleep(options.connect_latency / 1000)
+    transport = paramiko.Transport(client)
+    transport.add_server_key(host_key)
+    transport.set_subsystem_handler(
+        "sftp", paramiko.SFTPServer, MockSFTPServer, fs, stats
+    )
+    try:
+        transport.start_server(server=MockServer(fs, stats))
+    except (paramiko.SSHException, EOFError):
+        return
+    stats.count("handshakes")
+    while transport.is_active():
+        time.sleep(0.5)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0,
+        help="Delay of every new connection in ms",
+    )
+    parser.add_argument(
+        "--root", help="Directory of the RTE file system (default: temporary)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    # Clients closing their connections are not errors
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+    root = options.root or tempfile.mkdtemp(prefix="rte-ssh-mock-")
+    fs = MockFileSystem(root)
+    stats = Stats()
+    host_key = paramiko.RSAKey.generate(2048)
+    # Clean up when terminated, e.g. by a benchmark
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((options.host, options.port))
+    sock.listen(64)
+    print(
+        f"RTE SSH mock listening on {options.host}:{sock.getsockname()[1]}, "
+        f"root {root}",
+        flush=True,
+    )
+    try:
+        while True:
+            client, _ = sock.accept()
+            # As OpenSSH does, do not delay small packets
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(
+                target=handle_connection,
+                args=(client, host_key, fs, stats, options),
+                daemon=True,
+            ).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        if not options.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
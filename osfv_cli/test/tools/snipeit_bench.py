@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Snipe-IT load benchmark for osfv_cli.
+
+Starts the local Snipe-IT stand-in (`snipeit_mock.py`) and measures the
+`osfv.libs.snipeit_api` client against it. For every scenario the latency
+percentiles and the throughput are reported:
+
+    get_all_assets_cold  fetching the inventory with an empty cache
+    get_all_assets_warm  loading the inventory from the local snapshot
+    rte_ip_lookup        resolving RTE IPs to asset IDs
+    checkout_checkin     checking an asset out and back in
+    cli_parallel         `osfv_cli snipeit list_my` run by many processes
+                         at once
+
+The server latency, errors and rate limiting are passed to the mock, e.g.:
+
+    python3 snipeit_bench.py --assets 2000 --latency 20 --processes 50
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MOCK_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "snipeit_mock.py"
+)
+SCENARIOS = [
+    "get_all_assets_cold",
+    "get_all_assets_warm",
+    "rte_ip_lookup",
+    "checkout_checkin",
+    "cli_parallel",
+]
+USER_ID = 1
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name, samples, elapsed, errors=0):
+    """
+    Computes latency percentiles (in ms) and the throughput of a scenario.
+    """
+    if not samples:
+        return {"scenario": name, "ops": 0, "errors": errors}
+    return {
+        "scenario": name,
+        "ops": len(samples),
+        "errors": errors,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p90_ms": percentile(samples, 0.9) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+        "ops_per_s": len(samples) / elapsed if elapsed else 0,
+    }
+
+
+def start_mock(args):
+    command = [
+        sys.executable,
+        MOCK_PATH,
+        "--port",
+        "0",
+        "--assets",
+        str(args.assets),
+        "--latency",
+        str(args.latency),
+        "--jitter",
+        str(args.jitter),
+        "--error-rate",
+        str(args.error_rate),
+        "--rate-limit",
+        str(args.rate_limit),
+        "--rate-window",
+        str(args.rate_window),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    banner = process.stdout.readline()
+    if "listening on" not in banner:
+        process.kill()
+        sys.exit(f"Failed to start the Snipe-IT mock: {banner}")
+    return process, banner.split("listening on ")[1].strip()
+
+
+def write_config(path, api_url, cache_dir, max_workers):
+    with open(path, "w") as file:
+        file.write(
+            "---\n"
+            f"api_url: '{api_url}'\n"
+            "api_token: 'benchmark-token'\n"
+            f"user_id: {USER_ID}\n"
+            f"max_workers: {max_workers}\n"
+            "cache:\n"
+            "  enabled: true\n"
+            f"  dir: '{cache_dir}'\n"
+            "  snapshot_ttl: 300\n"
+        )
+
+
+def mock_stats(api_url):
+    import requests
+
+    base_url = api_url.rsplit("/api/v1", 1)[0]
+    return requests.get(f"{base_url}/mock/stats", timeout=5).json()
+
+
+def bench_get_all_assets(SnipeIT, cache_dir, iterations, cold):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if cold:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        t0 = time.perf_counter()
+        SnipeIT().get_all_assets()
+        samples.append(time.perf_counter() - t0)
+    name = "get_all_assets_cold" if cold else "get_all_assets_warm"
+    return summarize(name, samples, time.perf_counter() - start)
+
+
+def bench_rte_ip_lookup(SnipeIT, iterations):
+    snipeit_api = SnipeIT()
+    assets = snipeit_api.get_all_assets()
+    rte_ips = [
+        asset["custom_fields"]["RTE IP"]["value"]
+        for asset in assets
+        if asset["custom_fields"]["RTE IP"]["value"]
+    ]
+    samples = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        rte_ip = random.choice(rte_ips)
+        t0 = time.perf_counter()
+        if snipeit_api.get_asset_id_by_rte_ip(rte_ip) is None:
+            errors += 1
+        samples.append(time.perf_counter() - t0)
+    return summarize(
+        "rte_ip_lookup", samples, time.perf_counter() - start, errors
+    )
+
+
+def bench_checkout_checkin(SnipeIT, iterations):
+    snipeit_api = SnipeIT()
+    candidates = [
+        asset["id"]
+        for asset in snipeit_api.get_all_assets()
+        if not asset["assigned_to"]
+    ]
+    samples = []
+    errors = 0
+    start = time.perf_counter()
+    for asset_id in random.sample(
+        candidates, min(iterations, len(candidates))
+    ):
+        t0 = time.perf_counter()
+        success, _, _ = snipeit_api.check_out_asset(asset_id)
+        success_in, _ = snipeit_api.check_in_asset(asset_id)
+        samples.append(time.perf_counter() - t0)
+        errors += (not success) + (not success_in)
+    return summarize(
+        "checkout_checkin", samples, time.perf_counter() - start, errors
+    )
+
+
+def bench_cli_parallel(processes, env):
+    def run(_):
+        t0 = time.perf_counter()
+        result = subprocess.run(
+            ["osfv_cli", "snipeit", "list_my"],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        failed = result.returncode != 0 or bool(result.stderr.strip())
+        return time.perf_counter() - t0, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(run, range(processes)))
+    elapsed = time.perf_counter() - start
+    return summarize(
+        "cli_parallel",
+        [duration for duration, _ in results],
+        elapsed,
+        sum(failed for _, failed in results),
+    )
+
+
+def print_report(results, stats):
+    columns = ["ops", "errors", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+    columns.append("ops_per_s")
+    print(f"{'scenario':<20}" + "".join(f"{c:>10}" for c in columns))
+    for result in results:
+        cells = []
+        for column in columns:
+            value = result.get(column, "-")
+            if isinstance(value, float):
+                value = f"{value:.1f}"
+            cells.append(f"{value:>10}")
+        print(f"{result['scenario']:<20}" + "".join(cells))
+    print(
+        f"Server: {stats['requests']} requests, "
+        f"events: {stats['events'] or 'none'}"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Server delay in ms"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="Server delay jitter in ms"
+    )
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--rate-window", type=float, default=60)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="Repetitions of the in-process scenarios",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=20,
+        help="Number of parallel osfv_cli invocations",
+    )
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = args.scenario or SCENARIOS
+
+    workdir = tempfile.mkdtemp(prefix="snipeit-bench-")
+    cache_dir = os.path.join(workdir, "cache")
+    config_path = os.path.join(workdir, "snipeit.yml")
+    mock, api_url = start_mock(args)
+    try:
+        write_config(config_path, api_url, cache_dir, args.max_workers)
+        # Must be set before importing the client, which reads it on import
+        os.environ["SNIPEIT_CONFIG_FILE_PATH"] = config_path
+        from osfv.libs.snipeit_api import SnipeIT
+
+        results = []
+        for scenario in scenarios:
+            if scenario == "get_all_assets_cold":
+                result = bench_get_all_assets(
+                    SnipeIT, cache_dir, args.iterations, cold=True
+                )
+            elif scenario == "get_all_assets_warm":
+                SnipeIT().get_all_assets()
+                result = bench_get_all_assets(
+                    SnipeIT, cache_dir, args.iterations, cold=False
+                )
+            elif scenario == "rte_ip_lookup":
+                result = bench_rte_ip_lookup(SnipeIT, args.iterations * 50)
+            elif scenario == "checkout_checkin":
+                result = bench_checkout_checkin(SnipeIT, args.iterations)
+            else:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                result = bench_cli_parallel(args.processes, dict(os.environ))
+            results.append(result)
+        stats = mock_stats(api_url)
+    finally:
+        mock.terminate()
+        mock.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"results": results, "server": stats}, indent=2))
+    else:
+        print_report(results, stats)
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Snipe-IT REST API, used to test and benchmark
+osfv_cli without the lab instance.
+
+Only the endpoints used by `osfv.libs.snipeit_api` are implemented:
+
+    GET    /api/v1/hardware                  (limit, offset, sort, order,
+                                              status, category_id, search)
+    GET    /api/v1/hardware/<id>
+    POST   /api/v1/hardware/<id>/checkout
+    POST   /api/v1/hardware/<id>/checkin
+    GET    /api/v1/users                     (limit, offset, search)
+    POST   /api/v1/users
+    DELETE /api/v1/users/<id>
+    GET    /api/v1/users/<id>/assets
+    GET    /api/v1/companies
+    GET    /api/v1/groups
+
+The inventory is generated from a seed, so the same arguments always give
+the same data. Latency, random server errors and per-token rate limiting
+(HTTP 429 with `Retry-After` and `X-RateLimit-*` headers, as returned by
+Snipe-IT) can be enabled from the command line. Request counters are
+available at `GET /mock/stats` and are cleared by `POST /mock/reset`.
+
+Example:
+
+    python3 snipeit_mock.py --port 8080 --assets 2000 --latency 20
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MODELS = ["APU2", "APU4", "V1410", "VP4630", "Z690", "FW4C", "OptiPlex 7010"]
+CATEGORIES = {1: "DUT", 2: "RTE", 3: "Employee Laptop"}
+STATUS_LABELS = {
+    "RTD": {"id": 2, "name": "Ready to Deploy", "status_meta": "deployable"},
+    "Deployed": {"id": 4, "name": "Deployed", "status_meta": "deployed"},
+}
+COMPANIES = ["3mdeb", "Dasharo"]
+GROUPS = ["Users", "Admins"]
+MAX_PAGE_SIZE = 500
+
+
+def timestamp(value):
+    return {
+        "datetime": value.strftime("%Y-%m-%d %H:%M:%S"),
+        "formatted": value.strftime("%Y-%m-%d %I:%M %p"),
+    }
+
+
+def ip_field(name, value):
+    return {
+        "field": "_snipeit_" + name.lower().replace(" ", "_"),
+        "value": value,
+        "field_format": "IP",
+        "element": "text",
+    }
+
+
+class Inventory:
+    """
+    In-memory Snipe-IT data set, shared by all request handler threads.
+    """
+
+    def __init__(self, assets, users, seed, duplicates, rte_network="10.2"):
+        self.lock = threading.Lock()
+        rng = random.Random(seed)
+        self.clock = datetime(2024, 1, 1)
+
+        self.companies = [
+            {"id": i, "name": name} for i, name in enumerate(COMPANIES, 1)
+        ]
+        self.groups = [
+            {"id": i, "name": name} for i, name in enumerate(GROUPS, 1)
+        ]
+        self.users = {}
+        for user_id in range(1, users + 1):
+            self.users[user_id] = {
+                "id": user_id,
+                "username": f"user{user_id}",
+                "name": f"User {user_id}",
+                "first_name": "User",
+                "last_name": str(user_id),
+                "email": f"user{user_id}@example.com",
+            }
+        self.next_user_id = users + 1
+
+        self.assets = {}
+        for asset_id in range(1, assets + 1):
+            category_id = 1 if asset_id % 10 else rng.choice([2, 3])
+            model = rng.choice(MODELS)
+            host = (asset_id // 250, asset_id % 250 + 1)
+            asset = {
+                "id": asset_id,
+                "name": f"{model} #{asset_id}",
+                "asset_tag": f"{asset_id:08d}",
+                "serial": f"SN{rng.getrandbits(32):08X}",
+                "model": {"id": MODELS.index(model) + 1, "name": model},
+                "category": {
+                    "id": category_id,
+                    "name": CATEGORIES[category_id],
+                },
+                "company": self.companies[0],
+                "status_label": dict(STATUS_LABELS["RTD"]),
+                "assigned_to": None,
+                "created_at": timestamp(self.clock),
+                "updated_at": None,
+                "custom_fields": {
+                    "IP": ip_field("IP", "10.1.%d.%d" % host),
+                    "RTE IP": ip_field(
+                        "RTE IP", f"{rte_network}.%d.%d" % host
+                    ),
+                    "Sonoff IP": ip_field("Sonoff IP", "10.3.%d.%d" % host),
+                    "PiKVM IP": ip_field("PiKVM IP", ""),
+                },
+            }
+            self._touch(asset)
+            if users and rng.random() < 0.3:
+                self._assign(asset, rng.randint(1, users))
+            self.assets[asset_id] = asset
+
+        # Non-exclusive RTE IPs, to exercise the duplicate checks
+        for asset_id in range(2, min(duplicates, assets) + 1, 2):
+            self.assets[asset_id]["custom_fields"]["RTE IP"]["value"] = (
+                self.assets[asset_id - 1]["custom_fields"]["RTE IP"]["value"]
+            )
+
+    def _touch(self, asset):
+        self.clock += timedelta(seconds=1)
+        asset["updated_at"] = timestamp(self.clock)
+
+    def _assign(self, asset, user_id):
+        user = self.users[user_id]
+        asset["assigned_to"] = {
+            "id": user_id,
+            "username": user["username"],
+            "name": user["name"],
+            "type": "user",
+        }
+        asset["status_label"] = dict(STATUS_LABELS["Deployed"])
+
+    def list_assets(self, query):
+        with self.lock:
+            rows = list(self.assets.values())
+
+        status = query.get("status")
+        if status == "RTD":
+            rows = [asset for asset in rows if not asset["assigned_to"]]
+        elif status == "Deployed":
+            rows = [asset for asset in rows if asset["assigned_to"]]
+        if query.get("category_id"):
+            category_id = int(query["category_id"])
+            rows = [a for a in rows if a["category"]["id"] == category_id]
+        if query.get("search"):
+            search = query["search"].lower()
+            rows = [a for a in rows if search in json.dumps(a).lower()]
+
+        sort = query.get("sort", "created_at")
+        reverse = query.get("order", "desc") == "desc"
+        if sort == "updated_at":
+            rows.sort(
+                key=lambda a: a["updated_at"]["datetime"], reverse=reverse
+            )
+        elif sort == "name":
+            rows.sort(key=lambda a: a["name"], reverse=reverse)
+        else:
+            rows.sort(key=lambda a: a["id"], reverse=reverse)
+        return rows
+
+    def get_asset(self, asset_id):
+        with self.lock:
+            return self.assets.get(asset_id)
+
+    def check_out(self, asset_id, user_id):
+        with self.lock:
+            asset = self.assets.get(asset_id)
+            if asset is None:
+                return error("Asset does not exist.")
+            if user_id not in self.users:
+                return error("User does not exist.")
+            if asset["assigned_to"]:
+                return error("That asset is not available for checkout!")
+            self._assign(asset, user_id)
+            self._touch(asset)
+            return success("Asset checked out successfully.", asset)
+
+    def check_in(self, asset_id):
+        with self.lock:
+            asset = self.assets.get(asset_id)
+            if asset is None:
+                return error("Asset does not exist.")
+            if not asset["assigned_to"]:
+                return error("That asset is already checked in.")
+            asset["assigned_to"] = None
+            asset["status_label"] = dict(STATUS_LABELS["RTD"])
+            self._touch(asset)
+            return success("Asset checked in successfully.", asset)
+
+    def user_assets(self, user_id):
+        with self.lock:
+            return [
+                asset
+                for asset in self.assets.values()
+                if asset["assigned_to"]
+                and asset["assigned_to"]["id"] == user_id
+            ]
+
+    def list_users(self, query):
+        with self.lock:
+            rows = list(self.users.values())
+        if query.get("search"):
+            search = query["search"].lower()
+            rows = [u for u in rows if search in json.dumps(u).lower()]
+        return rows
+
+    def add_user(self, data):
+        with self.lock:
+            for user in self.users.values():
+                if user["username"] == data.get("username"):
+                    return error("The username has already been taken.")
+            user_id = self.next_user_id
+            self.next_user_id += 1
+            user = {
+                "id": user_id,
+                "username": data.get("username"),
+                "name": f"{data.get('first_name')} {data.get('last_name')}",
+                "first_name": data.get("first_name"),
+                "last_name": data.get("last_name"),
+                "email": data.get("email"),
+            }
+            self.users[user_id] = user
+            return success("User created.", user)
+
+    def delete_user(self, user_id):
+        with self.lock:
+            if self.users.pop(user_id, None) is None:
+                return error("User not found.")
+            return success("User deleted.", None)
+
+
+def success(message, payload):
+    return {"status": "success", "messages": message, "payload": payload}
+
+
+def error(message):
+    return {"status": "error", "messages": message, "payload": None}
+
+
+def page(rows, query):
+    limit = min(int(query.get("limit", 50)), MAX_PAGE_SIZE)
+    offset = int(query.get("offset", 0))
+    return {"total": len(rows), "rows": rows[offset : offset + limit]}
+
+
+class RateLimiter:
+    """
+    Fixed window request limiter per API token, like the Laravel throttle
+    middleware used by Snipe-IT.
+    """
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.lock = threading.Lock()
+        self.windows = {}
+
+    def hit(self, key):
+        """
+        Counts a request.
+
+        Returns:
+            tuple: (allowed, remaining requests, seconds until the reset).
+        """
+        now = time.monotonic()
+        with self.lock:
+            start, count = self.windows.get(key, (now, 0))
+            if now - start >= self.window:
+                start, count = now, 0
+            count += 1
+            self.windows[key] = (start, count)
+        reset = max(1, int(round(start + self.window - now)))
+        return count <= self.limit, max(self.limit - count, 0), reset
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.handle_api("GET")
+
+    def do_POST(self):
+        self.handle_api("POST")
+
+    def do_DELETE(self):
+        self.handle_api("DELETE")
+
+    def handle_api(self, method):
+        options = self.server.options
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if url.path.startswith("/mock/"):
+            return self.handle_mock(method, url.path)
+
+        self.server.count(method, url.path)
+        headers = {}
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self.reply(
+                401, {"status": "error", "messages": "Unauthorized"}
+            )
+
+        if self.server.limiter:
+            allowed, remaining, reset = self.server.limiter.hit(
+                self.headers["Authorization"]
+            )
+            headers["X-RateLimit-Limit"] = str(options.rate_limit)
+            headers["X-RateLimit-Remaining"] = str(remaining)
+            if not allowed:
+                self.server.count_event("rate_limited")
+                headers["Retry-After"] = str(reset)
+                headers["X-RateLimit-Reset"] = str(int(time.time()) + reset)
+                return self.reply(
+                    429,
+                    {"status": "error", "messages": "Too Many Requests"},
+                    headers,
+                )
+
+        if options.latency or options.jitter:
+            time.sleep(
+                (options.latency + random.uniform(0, options.jitter)) / 1000
+            )
+
+        if options.error_rate and random.random() < options.error_rate:
+            self.server.count_event("injected_errors")
+            return self.reply(500, {"message": "Server Error"}, headers)
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            data = {}
+        path = re.sub(r"^/api/v1", "", url.path).rstrip("/")
+        result = self.route(method, path, query, data)
+        if result is None:
+            return self.reply(
+                404,
+                {"status": "error", "messages": "404 endpoint not found"},
+                headers,
+            )
+        self.reply(200, result, headers)
+
+    def route(self, method, path, query, data):
+        inventory = self.server.inventory
+
+        if method == "GET" and path == "/hardware":
+            return page(inventory.list_assets(query), query)
+
+        match = re.fullmatch(r"/hardware/(\d+)(/checkout|/checkin)?", path)
+        if match:
+            asset_id = int(match.group(1))
+            if method == "GET" and not match.group(2):
+                asset = inventory.get_asset(asset_id)
+                return asset if asset else error("Asset does not exist.")
+            if method == "POST" and match.group(2) == "/checkout":
+                return inventory.check_out(
+                    asset_id, int(data.get("assigned_user", 0))
+                )
+            if method == "POST" and match.group(2) == "/checkin":
+                return inventory.check_in(asset_id)
+
+        if method == "GET" and path == "/users":
+            return page(inventory.list_users(query), query)
+        if method == "POST" and path == "/users":
+            return inventory.add_user(data)
+        match = re.fullmatch(r"/users/(\d+)(/assets)?", path)
+        if match:
+            user_id = int(match.group(1))
+            if method == "GET" and match.group(2):
+                rows = inventory.user_assets(user_id)
+                return {"total": len(rows), "rows": rows}
+            if method == "DELETE" and not match.group(2):
+                return inventory.delete_user(user_id)
+
+        if method == "GET" and path == "/companies":
+            return page(inventory.companies, query)
+        if method == "GET" and path == "/groups":
+            return page(inventory.groups, query)
+        return None
+
+    def handle_mock(self, method, path):
+        if method == "GET" and path == "/mock/stats":
+            return self.reply(200, self.server.stats())
+        if method == "POST" and path == "/mock/reset":
+            self.server.reset_stats()
+            return self.reply(200, {"status": "success"})
+        return self.reply(404, {"status": "error", "messages": "Not found"})
+
+    def reply(self, code, data, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, options):
+        super().__init__((options.host, options.port), MockHandler)
+        self.options = options
+        self.inventory = Inventory(
+            options.assets,
+            options.users,
+            options.seed,
+            options.duplicates,
+            options.rte_network,
+        )
+        self.limiter = None
+        if options.rate_limit:
+            self.limiter = RateLimiter(options.rate_limit, options.rate_window)
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def count(self, method, path):
+        endpoint = re.sub(r"/\d+", "/<id>", path)
+        with self.stats_lock:
+            self.requests += 1
+            key = f"{method} {endpoint}"
+            self.endpoints[key] = self.endpoints.get(key, 0) + 1
+
+    def count_event(self, name):
+        with self.stats_lock:
+            self.events[name] = self.events.get(name, 0) + 1
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "requests": self.requests,
+                "endpoints": dict(self.endpoints),
+                "events": dict(self.events),
+            }
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.requests = 0
+            self.endpoints = {}
+            self.events = {}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--assets", type=int, default=1000, help="Number of hardware assets"
+    )
+    parser.add_argument(
+        "--users", type=int, default=20, help="Number of users"
+    )
+    parser.add_argument(
+        "--duplicates",
+        type=int,
+        default=0,
+        help="Make the RTE IPs of the first N assets non-exclusive",
+    )
+    parser.add_argument(
+        "--rte-network",
+        default="10.2",
+        help="First two octets of the RTE IPs, e.g. 127.2 to reach a local "
+        "RTE stand-in listening on all addresses",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Response delay in ms"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0,
+        help="Random extra response delay of up to this many ms",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0,
+        help="Fraction of requests answered with HTTP 500",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=0,
+        help="Requests allowed per token and window, 0 disables limiting",
+    )
+    parser.add_argument(
+        "--rate-window",
+        type=float,
+        default=60,
+        help="Rate limit window in seconds",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    server = MockServer(options)
+    print(
+        f"Snipe-IT mock with {options.assets} assets listening on "
+        f"http://{options.host}:{server.server_port}/api/v1",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
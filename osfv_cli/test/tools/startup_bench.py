@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark for osfv_cli.
+
+Measures, in fresh interpreters, how long importing `osfv.cli.cli` takes
+and how long offline commands run, and checks that the heavy dependencies
+are not imported up front:
+
+    import               `import osfv.cli.cli`, as reported by -X importtime
+    help                 `osfv_cli --help`
+    list_models          `osfv_cli list_models`
+    flash_image_check    `osfv_cli flash_image_check --rom /dev/null --list`
+
+Exits with a non-zero status if the median import time is above
+`--max-import-ms`, or if one of the heavy modules is imported, e.g.:
+
+    python3 startup_bench.py --runs 10 --max-import-ms 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Imported by the commands which need them only, see osfv.cli.cli
+HEAVY_MODULES = [
+    "asyncio",
+    "paramiko",
+    "pexpect",
+    "requests",
+    "voluptuous",
+    "yaml",
+]
+COMMANDS = {
+    "help": ["--help"],
+    "list_models": ["list_models"],
+    "flash_image_check": ["flash_image_check", "--rom", os.devnull, "--list"],
+}
+
+
+def measure_import(env):
+    """
+    Imports osfv.cli.cli in a fresh interpreter.
+
+    Returns:
+        tuple:
+            float: Cumulative import time of osfv.cli.cli in seconds.
+            list: Heavy modules imported along with it.
+    """
+    code = (
+        "import json, sys, osfv.cli.cli; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} "
+        "if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == "osfv.cli.cli":
+            return int(fields[1]) / 1e6, json.loads(result.stdout)
+    sys.exit(f"osfv.cli.cli not found in the import times:\n{result.stderr}")
+
+
+def measure_command(arguments, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "osfv.cli.cli", *arguments],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return time.perf_counter() - start, result.returncode != 0
+
+
+def summarize(name, samples, errors=0):
+    return {
+        "scenario": name,
+        "runs": len(samples),
+        "errors": errors,
+        "median_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--runs", type=int, default=10, help="Runs of every scenario"
+    )
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=100,
+        help="Maximum median import time of osfv.cli.cli",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Offline commands must not need the Snipe-IT configuration
+    env = dict(os.environ, SNIPEIT_CONFIG_FILE_PATH=os.devnull)
+
+    import_samples = []
+    heavy_modules = set()
+    for _ in range(args.runs):
+        duration, imported = measure_import(env)
+        import_samples.append(duration)
+        heavy_modules.update(imported)
+    results = [summarize("import", import_samples, len(heavy_modules))]
+
+    for name, arguments in COMMANDS.items():
+        samples = []
+        errors = 0
+        for _ in range(args.runs):
+            duration, failed = measure_command(arguments, env)
+            samples.append(duration)
+            errors += failed
+        results.append(summarize(name, samples, errors))
+
+    failures = []
+    if heavy_modules:
+        failures.append(
+            f"heavy modules imported: {', '.join(sorted(heavy_modules))}"
+        )
+    if results[0]["median_ms"] > args.max_import_ms:
+        failures.append(
+            f"import takes {results[0]['median_ms']:.1f} ms, more than "
+            f"{args.max_import_ms:.0f} ms"
+        )
+    failures.extend(
+        f"{result['scenario']} failed {result['errors']} times"
+        for result in results[1:]
+        if result["errors"]
+    )
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        columns = ["runs", "errors", "median_ms", "max_ms"]
+        print(f"{'scenario':<20}" + "".join(f"{c:>10}" for c in columns))
+        for result in results:
+            cells = []
+            for column in columns:
+                value = result[column]
+                if isinstance(value, float):
+                    value = f"{value:.1f}"
+                cells.append(f"{value:>10}")
+            print(f"{result['scenario']:<20}" + "".join(cells))
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())